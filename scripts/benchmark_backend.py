@@ -0,0 +1,80 @@
+"""Benchmark for building wheels with `chakra.backend`.
+
+Builds a wheel of a generated project with many modules and large data files, at a few
+compression levels, and compares it with staging the files in a temporary directory
+before zipping them (as backends that copy and then zip do). Also rebuilds the wheel
+after changing one module, which reuses the rest of the previous wheel.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_backend.py
+    $ python scripts/benchmark_backend.py --modules 2000 --data-size 200
+"""
+
+
+import argparse
+import hashlib
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+parser = argparse.ArgumentParser(description='Wheel build benchmark.')
+parser.add_argument(
+    '--modules', type=int, default=500, help='number of modules in the project')
+parser.add_argument(
+    '--data-size', type=int, default=50, help='size of the data files in MiB')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append(os.path.abspath('src'))
+
+from chakra import backend
+
+
+def bench(name, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:>24}: {elapsed * 1e3:9.2f} ms')
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    root = pathlib.Path(tmp)
+    os.environ['CHAKRA_CACHE_DIR'] = str(root / 'cache')
+    (root / 'pyproject.toml').write_text('[project]\nname = "big"\nversion = "1.0"\n')
+    package = root / 'src' / 'big'
+    (package / 'data').mkdir(parents=True)
+    for i in range(args.modules):
+        (package / f'module{i}.py').write_text(f'def f{i}():\n    return {i}\n' * 50)
+    # half random (incompressible) and half repetitive data.
+    chunk = 2 ** 20
+    for i in range(args.data_size):
+        data = os.urandom(chunk) if i % 2 else bytes(range(256)) * (chunk // 256)
+        (package / 'data' / f'blob{i}.bin').write_bytes(data)
+    os.chdir(root)
+
+    for level in (0, 1, 6):
+        shutil.rmtree(root / 'dist', ignore_errors=True)
+        bench(f'build_wheel (level {level})', lambda: backend.build_wheel(
+            str(root / 'dist'), {'compression-level': str(level)}))
+
+    (package / 'module0.py').write_text('def f():\n    return 0\n')
+    bench('rebuild (level 6)', lambda: backend.build_wheel(
+        str(root / 'dist'), {'compression-level': '6'}))
+
+    def copy_then_zip():
+        staging = root / 'staging'
+        shutil.copytree(package, staging / 'big')
+        with zipfile.ZipFile(root / 'staged.whl', 'w', zipfile.ZIP_DEFLATED) as zf:
+            for path in sorted(staging.rglob('*')):
+                if path.is_file():
+                    zf.write(path, path.relative_to(staging).as_posix())
+                    # hashed for RECORD in a second read.
+                    hashlib.sha256(path.read_bytes()).hexdigest()
+        shutil.rmtree(staging)
+
+    bench('copy then zip (level 6)', copy_then_zip)
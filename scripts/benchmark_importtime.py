@@ -0,0 +1,66 @@
+"""Import-time benchmark for the Chakra CLI.
+
+Runs `python -X importtime -m chakra` (and `--help` of each subcommand) a number of times,
+and reports the median time spent on imports beyond those of the interpreter's own
+startup (measured with `python -X importtime -c pass`), along with the imports that take
+the longest. Exits with a non-zero status if the median exceeds the budget for any of the
+commands, so that it can be used to catch regressions in startup time.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_importtime.py
+    $ python scripts/benchmark_importtime.py --budget 40 --repeat 20
+"""
+
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+parser = argparse.ArgumentParser(description='Import-time benchmark.')
+parser.add_argument(
+    '--budget', type=float, default=50.0, help='budget for imports, in milliseconds')
+parser.add_argument(
+    '-n', '--repeat', type=int, default=10, help='number of runs of each command')
+parser.add_argument(
+    '--top', type=int, default=5, help='number of slowest imports to show')
+args = parser.parse_args()
+
+commands = [[], ['hooks', '--help'], ['cache', '--help']]
+env = dict(os.environ, PYTHONPATH='src')
+
+
+def importtime(args_):
+    # the total time spent on imports (in ms), and the self time of each module (in ms).
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args_, env=env, capture_output=True,
+        text=True)
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us) / 1e3
+        if not name.startswith('  '):          # imported at the top level
+            total += int(cumulative_us) / 1e3
+    return total, modules
+
+
+baseline = statistics.median(
+    importtime(['-c', 'pass'])[0] for _ in range(args.repeat))
+print(f'interpreter startup: {baseline:.2f} ms')
+
+failed = False
+for argv in commands:
+    runs = [importtime(['-m', 'chakra'] + argv) for _ in range(args.repeat)]
+    median = statistics.median(total for total, modules in runs) - baseline
+    slowest = sorted(runs[-1][1].items(), key=lambda m: m[1], reverse=True)[:args.top]
+    status = 'ok' if median <= args.budget else 'OVER BUDGET'
+    print(f"chakra {' '.join(argv)}: {median:.2f} ms ({status})")
+    for name, ms in slowest:
+        print(f'    {ms:7.2f} ms  {name}')
+    failed |= median > args.budget
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,85 @@
+"""Benchmark for installing wheels without pip.
+
+Builds a wheel of a generated project with many modules, and installs it into a fresh
+site-packages a number of times: with `pip install --no-deps --target`, with
+`chakra.core.install_wheel()` (which extracts the wheel across a pool of threads), and
+from `chakra.core.WheelCache`, which unpacks the wheel once and then hardlinks its files.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_install.py
+    $ python scripts/benchmark_install.py --modules 2000 --repeat 10
+"""
+
+
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description='Wheel install benchmark.')
+parser.add_argument(
+    '--modules', type=int, default=1000, help='number of modules in the wheel')
+parser.add_argument(
+    '--repeat', type=int, default=5, help='number of environments installed into')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append(os.path.abspath('src'))
+
+from chakra import backend
+from chakra.core import Environment, WheelCache, install_wheel
+
+
+def bench(name, func):
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        func(i)
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f'{name:>26}: {elapsed * 1e3:9.2f} ms per install')
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    root = pathlib.Path(tmp)
+    os.environ['CHAKRA_CACHE_DIR'] = str(root / 'cache')
+    project = root / 'project'
+    (project / 'big').mkdir(parents=True)
+    (project / 'pyproject.toml').write_text('[project]\nname = "big"\nversion = "1.0"\n')
+    for i in range(args.modules):
+        (project / 'big' / f'module{i}.py').write_text(
+            f'def f{i}():\n    return {i}\n' * 50)
+    os.chdir(project)
+    wheel = root / 'dist' / backend.build_wheel(str(root / 'dist'))
+    os.chdir(root)
+
+    def pip(i):
+        subprocess.run(
+            [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-deps',
+             '--no-index', '--no-compile', '--target', str(root / f'pip{i}'), str(wheel)],
+            check=True)
+
+    cache = WheelCache(root / 'wheels')
+    cache.add(wheel)
+    start = time.perf_counter()
+    cache.unpacked(cache.find('big'))
+    print(f'{"unpack (once)":>26}: {(time.perf_counter() - start) * 1e3:9.2f} ms')
+
+    def chakra(i):
+        env = Environment(root / f'env{i}')
+        env.site_packages.mkdir(parents=True)
+        env.install_cached(['big==1.0'], cache=cache)
+
+    def direct(max_workers):
+        def install(i):
+            env = Environment(root / f'direct{max_workers}-{i}')
+            env.site_packages.mkdir(parents=True)
+            install_wheel(env, wheel, max_workers=max_workers)
+        return install
+
+    bench('pip install', pip)
+    bench('install_wheel (1 thread)', direct(1))
+    bench('install_wheel (8 threads)', direct(8))
+    bench('WheelCache', chakra)
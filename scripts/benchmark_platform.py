@@ -0,0 +1,48 @@
+"""Benchmark for platform detection at startup.
+
+`OpSystem.find()` and `Arch.find()` run once in every Chakra process. This script compares
+the cost of finding the operating system and architecture from within the interpreter with
+the cost of forking `uname -s` and `uname -m` (which remains as the fallback).
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_platform.py
+    $ python scripts/benchmark_platform.py --repeat 50
+"""
+
+
+import argparse
+import statistics
+import sys
+import time
+
+parser = argparse.ArgumentParser(description='Platform detection benchmark.')
+parser.add_argument(
+    '-n', '--repeat', type=int, default=20, help='number of runs of each method')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append('src')
+
+from chakra.core import platform
+
+
+def in_process():
+    opsys = platform._find_os()
+    platform._find_arch(platform.OpSystem(opsys))
+
+
+def forked():
+    platform._uname('-s')
+    platform._uname('-m')
+
+
+for name, func in (('in-process', in_process), ('uname', forked)):
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    print(
+        f'{name:>10}: median {statistics.median(timings) * 1e3:8.3f} ms, '
+        f'min {min(timings) * 1e3:8.3f} ms  ({args.repeat} runs)')
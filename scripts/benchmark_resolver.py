@@ -0,0 +1,89 @@
+"""Benchmark for resolving requirements against a directory of wheels.
+
+Generates a find-links directory of wheels with many distributions and versions, each
+depending on a few others, and resolves a set of top-level requirements against it with
+`chakra.core.resolve()`: once with an empty metadata cache, and then a number of times
+with a warm one. Optionally times `pip install --dry-run` against the same directory.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_resolver.py
+    $ python scripts/benchmark_resolver.py --packages 500 --versions 20 --pip
+"""
+
+
+import argparse
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+parser = argparse.ArgumentParser(description='Resolver benchmark.')
+parser.add_argument(
+    '--packages', type=int, default=300, help='number of distributions')
+parser.add_argument(
+    '--versions', type=int, default=10, help='number of versions of each distribution')
+parser.add_argument(
+    '--repeat', type=int, default=5, help='number of warm resolutions')
+parser.add_argument(
+    '--pip', action='store_true', help='also time `pip install --dry-run`')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append(os.path.abspath('src'))
+
+from chakra.core import resolve
+
+
+def write_wheel(root, name, version, requires):
+    lines = ['Metadata-Version: 2.1', f'Name: {name}', f'Version: {version}']
+    lines += [f'Requires-Dist: {r}' for r in requires]
+    with zipfile.ZipFile(root / f'{name}-{version}-py3-none-any.whl', 'w') as zf:
+        zf.writestr(f'{name}-{version}.dist-info/METADATA', '\n'.join(lines) + '\n')
+        zf.writestr(f'{name}-{version}.dist-info/WHEEL', 'Wheel-Version: 1.0\n')
+        zf.writestr(f'{name}-{version}.dist-info/RECORD', '')
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    root = pathlib.Path(tmp)
+    os.environ['CHAKRA_CACHE_DIR'] = str(root / 'cache')
+    links = root / 'links'
+    links.mkdir()
+
+    # each distribution depends only on distributions after it, so that there are no
+    # cycles; the older versions have looser requirements, so that some backtracking
+    # is needed.
+    rng = random.Random(0)
+    for i in range(args.packages):
+        for v in range(args.versions):
+            requires = []
+            for j in rng.sample(range(i + 1, args.packages),
+                                min(3, args.packages - i - 1)):
+                low = rng.randrange(args.versions) if v > args.versions // 2 else 0
+                requires.append(f'pkg{j}>={low}.0')
+            write_wheel(links, f'pkg{i}', f'{v}.0', requires)
+    top = [f'pkg{i}' for i in range(0, args.packages, max(1, args.packages // 10))]
+
+    start = time.perf_counter()
+    pins = resolve(top, links)
+    print(f'{"cold":>14}: {(time.perf_counter() - start) * 1e3:9.2f} ms '
+          f'({len(pins)} distributions)')
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        resolve(top, links)
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f'{"warm":>14}: {elapsed * 1e3:9.2f} ms')
+
+    if args.pip:
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-m', 'pip', 'install', '--quiet', '--dry-run',
+             '--no-index', '--find-links', str(links), '--target', str(root / 'pip'),
+             *top],
+            check=True)
+        print(f'{"pip --dry-run":>14}: {(time.perf_counter() - start) * 1e3:9.2f} ms')
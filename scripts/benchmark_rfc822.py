@@ -0,0 +1,83 @@
+"""Microbenchmark for `chakra.utils.rfc822`.
+
+Measures writing and reading metadata with a long description as its body and many
+multi-line headers, as in the METADATA files of wheels, both to and from strings and
+files, and to a member of a zip file.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_rfc822.py
+    $ python scripts/benchmark_rfc822.py --body-size 10000000 --headers 1000
+"""
+
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+parser = argparse.ArgumentParser(description='RFC 822 microbenchmark.')
+parser.add_argument(
+    '--body-size', type=int, default=1000000, help='size of the body in characters')
+parser.add_argument(
+    '--headers', type=int, default=200, help='number of (multi-line) headers')
+parser.add_argument(
+    '-n', '--repeat', type=int, default=20, help='number of times to repeat each run')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append('src')
+
+from chakra.utils import rfc822
+
+line = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod.\n'
+body = (line * (args.body_size // len(line) + 1))[:args.body_size]
+headers = {
+    'Metadata-Version': ['2.1'],
+    'Name': ['foo'],
+    'Version': ['1.0'],
+    'Classifier': [
+        f'Topic :: Software Development\nLicense :: {i}\nOperating System :: {i}'
+        for i in range(args.headers)],
+}
+
+
+def bench(name, func):
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / args.repeat
+    print(f'{name:>12}: {elapsed * 1e3:9.2f} ms')
+
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    path = os.path.join(tmpdir, 'METADATA')
+
+    def dumps():
+        rfc822.dumps(headers, body)
+
+    def dump():
+        with open(path, 'w') as fp:
+            rfc822.dump(headers, body, fp)
+
+    def dump_zip():
+        with zipfile.ZipFile(io.BytesIO(), 'w') as zf:
+            with zf.open('foo-1.0.dist-info/METADATA', 'w') as fp:
+                rfc822.dump(headers, body, fp)
+
+    def load():
+        with open(path) as fp:
+            rfc822.load(fp)
+
+    def load_headers():
+        with open(path) as fp:
+            rfc822.load_headers(fp)
+
+    bench('dumps', dumps)
+    bench('dump', dump)
+    bench('dump (zip)', dump_zip)
+    bench('load', load)
+    bench('load_headers', load_headers)
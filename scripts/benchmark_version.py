@@ -0,0 +1,119 @@
+"""Microbenchmark for `Version`, `VersionArray` and `SpecifierSet`.
+
+Measures the throughput of parsing version strings, comparing versions, sorting lists of
+versions and filtering them with a specifier set, which is what resolving dependencies
+spends much of its time on. The same is measured in bulk with `VersionArray`, which
+doesn't make a `Version` for each version string.
+
+Run it from the root of the repository:
+
+    $ python scripts/benchmark_version.py
+    $ python scripts/benchmark_version.py --count 50000
+"""
+
+
+import argparse
+import random
+import sys
+import time
+
+parser = argparse.ArgumentParser(description='Version microbenchmark.')
+parser.add_argument(
+    '-n', '--count', type=int, default=10000, help='number of versions to work with')
+args = parser.parse_args()
+
+# add the source code directory to path.
+sys.path.append('src')
+
+from chakra.utils import SpecifierSet, Version, VersionArray
+
+random.seed(0)
+tags = ['', '', '', 'a1', 'b2', 'rc1']
+verstrs = [
+    f'{random.randint(0, 20)}.{random.randint(0, 30)}.{random.randint(0, 50)}'
+    f'{random.choice(tags)}'
+    for _ in range(args.count)]
+
+
+def bench(name, func):
+    start = time.perf_counter()
+    ops = func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:>8}: {elapsed * 1e3:9.2f} ms, {ops / elapsed:12,.0f} ops/s')
+
+
+versions = [Version.parse(v) for v in verstrs]
+pairs = list(zip(versions, reversed(versions)))
+
+
+def parse():
+    for v in verstrs:
+        Version.parse(v)
+    return len(verstrs)
+
+
+def compare():
+    for a, b in pairs:
+        a < b
+        a == b
+        a >= b
+    return 3 * len(pairs)
+
+
+def sort():
+    sorted(versions)
+    return len(versions)
+
+
+specset = SpecifierSet.parse('>=2.5,<15,!=7.*,!=9.3.1')
+ordered = sorted(versions)
+keys = [v._key for v in ordered]
+
+
+def filter_():
+    for _ in range(100):
+        specset.filter(versions)
+    return 100 * len(versions)
+
+
+def filter_sorted():
+    for _ in range(100):
+        specset.filter_sorted(ordered, keys=keys)
+    return 100 * len(versions)
+
+
+def batch_parse():
+    VersionArray.parse(verstrs)
+    return len(verstrs)
+
+
+array = VersionArray.parse(verstrs)
+
+
+def batch_sort():
+    array._sorted = None
+    array.sort()
+    return len(verstrs)
+
+
+def max_satisfying():
+    for _ in range(100):
+        max(specset.filter(versions))
+    return 100
+
+
+def batch_max_satisfying():
+    for _ in range(100):
+        array.max_satisfying(specset)
+    return 100
+
+
+bench('parse', parse)
+bench('compare', compare)
+bench('sort', sort)
+bench('filter', filter_)
+bench('bisect', filter_sorted)
+bench('bparse', batch_parse)
+bench('bsort', batch_sort)
+bench('max', max_satisfying)
+bench('bmax', batch_max_satisfying)
@@ -1,9 +1,6 @@
-import argparse
+import sys
 
-def cli():
-    # DUMMY.
-    parser = argparse.ArgumentParser('chakra', description='Chakra CLI.')
-    args = parser.parse_args()
+from .cli import cli
 
 if __name__ == '__main__':
-    cli()
+    sys.exit(cli())
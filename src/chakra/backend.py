@@ -0,0 +1,429 @@
+import base64
+import calendar
+import copy
+import gzip
+import hashlib
+import io
+import json
+import os
+import pathlib
+import re
+import shutil
+import stat
+import struct
+import tarfile
+import time
+import zipfile
+
+from .errors import NotSupportedError
+from .utils import ini, pyproject, rfc822
+from .utils.version import Version
+
+# build backend hooks as in PEP 517 and PEP 660.
+__all__ = [
+    'build_sdist', 'build_wheel', 'build_editable', 'get_requires_for_build_sdist',
+    'get_requires_for_build_wheel', 'get_requires_for_build_editable',
+]
+
+_CHUNK = 2 ** 20
+
+# the wheels built are pure Python ones.
+_TAG = 'py3-none-any'
+
+# content types of READMEs, by their extensions.
+_README_TYPES = {'.md': 'text/markdown', '.rst': 'text/x-rst', '.txt': 'text/plain'}
+
+class _RecordingWriter(io.RawIOBase):
+    # passes what is written on to a member of a wheel, hashing it on the way for RECORD;
+    # `on_close(digest, size)` is called once the member is written.
+
+    def __init__(self, fp, on_close):
+        self._fp = fp
+        self._on_close = on_close
+        self._hash = hashlib.sha256()
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._hash.update(data)
+        self._size += len(data)
+        return self._fp.write(data)
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+            digest = base64.urlsafe_b64encode(self._hash.digest()).rstrip(b'=').decode()
+            self._on_close(f'sha256={digest}', self._size)
+        super().close()
+
+class WheelWriter(object):
+    # writes a wheel file, streaming each file into the archive while hashing it, so that
+    # files are read once and never staged in a temporary directory. RECORD is written
+    # last, when the wheel is closed.
+
+    def __init__(self, path, dist_info, compresslevel=None, date_time=None):
+        self.path = pathlib.Path(path)
+        self.dist_info = dist_info
+        compression = zipfile.ZIP_STORED if compresslevel == 0 else zipfile.ZIP_DEFLATED
+        self._zf = zipfile.ZipFile(
+            self.path, 'w', compression=compression, compresslevel=compresslevel)
+        self.date_time = date_time
+        self.records = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zf.close()
+            self.path.unlink(missing_ok=True)
+
+    def _zinfo(self, arcname, mode=0o644, size=0):
+        zinfo = zipfile.ZipInfo(arcname, self.date_time or time.localtime()[:6])
+        zinfo.external_attr = (stat.S_IFREG | mode) << 16
+        zinfo.compress_type = self._zf.compression
+        zinfo._compresslevel = self._zf.compresslevel
+        zinfo.file_size = size           # only to tell whether ZIP64 is needed
+        return zinfo
+
+    def open(self, arcname, mode=0o644, size=0):
+        # a binary stream to write a member into; it is recorded when closed.
+        zinfo = self._zinfo(arcname, mode=mode, size=size)
+        return _RecordingWriter(
+            self._zf.open(zinfo, 'w'),
+            lambda hash_, size: self.records.append((arcname, hash_, size)))
+
+    def write_file(self, path, arcname):
+        st = os.stat(path)
+        with open(path, 'rb') as src, \
+                self.open(arcname, mode=stat.S_IMODE(st.st_mode), size=st.st_size) as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+
+    def copy(self, source, arcname, hash_, size):
+        # copies a member of another wheel (a `zipfile.ZipFile` open for reading) with its
+        # compressed bytes as they are, rather than decompressing and compressing them
+        # again. `hash_` and `size` are those of the member's RECORD entry. there is no
+        # public API for this in `zipfile`, hence this writes what `ZipFile.open()` would.
+        old = source.getinfo(arcname)
+        source.fp.seek(old.header_offset)
+        header = struct.unpack(
+            zipfile.structFileHeader, source.fp.read(zipfile.sizeFileHeader))
+        source.fp.seek(  # past the name and the extra field, to the data
+            header[zipfile._FH_FILENAME_LENGTH] +
+            header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+
+        zf = self._zf
+        zinfo = copy.copy(old)
+        zinfo.flag_bits &= ~0x08         # sizes are in the header, not a data descriptor
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader())
+        remaining = old.compress_size
+        while remaining > 0:
+            chunk = source.fp.read(min(_CHUNK, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(
+                    f'truncated member {arcname} in {source.filename}')
+            zf.fp.write(chunk)
+            remaining -= len(chunk)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[arcname] = zinfo
+        zf._didModify = True
+        self.records.append((arcname, hash_, size))
+
+    def write_text(self, arcname, text):
+        with self.open(arcname) as dst:
+            dst.write(text.encode())
+
+    def close(self):
+        record = f'{self.dist_info}/RECORD'
+        lines = [f'{name},{hash_},{size}' for name, hash_, size in self.records]
+        lines.append(f'{record},,')
+        self._zf.writestr(self._zinfo(record), '\n'.join(lines) + '\n')
+        self._zf.close()
+
+def _distname(name):
+    # the name of a project as in the names of wheels, i.e. normalized with underscores.
+    return re.sub(r'[-_.]+', '_', name).lower()
+
+def _people(people):
+    # `Author` and `Author-email` (or the same for maintainers) from a list of tables.
+    names, emails = [], []
+    for person in people:
+        if 'email' in person:
+            name = person.get('name')
+            emails.append(f'{name} <{person["email"]}>' if name else person['email'])
+        elif 'name' in person:
+            names.append(person['name'])
+    return names, emails
+
+def _readme(readme, root):
+    # the body and the content type of the README.
+    if readme is None:
+        return '', None
+    if isinstance(readme, str):
+        readme = {'file': readme}
+    if 'text' in readme:
+        return readme['text'], readme.get('content-type', 'text/plain')
+    path = root / readme['file']
+    content_type = readme.get('content-type') or \
+        _README_TYPES.get(path.suffix.lower(), 'text/plain')
+    return path.read_text(encoding=readme.get('charset', 'utf-8')), content_type
+
+def _metadata(project, root):
+    # headers and body of METADATA, from the `[project]` table (PEP 621).
+    if 'version' not in project:
+        raise NotSupportedError('dynamic versions are not supported')
+    headers = {
+        'Metadata-Version': ['2.1'],
+        'Name': [project['name']],
+        'Version': [str(Version.parse(project['version']))],
+    }
+
+    def add(name, *values):
+        values = [value for value in values if value]
+        if values:
+            headers.setdefault(name, []).extend(values)
+
+    add('Summary', project.get('description'))
+    for field, key in (('Author', 'authors'), ('Maintainer', 'maintainers')):
+        names, emails = _people(project.get(key, []))
+        add(field, ', '.join(names))
+        add(f'{field}-email', ', '.join(emails))
+    add('Keywords', ','.join(project.get('keywords', [])))
+    license_ = project.get('license', {})
+    add('License', license_ if isinstance(license_, str) else license_.get('text'))
+    add('Classifier', *project.get('classifiers', []))
+    urls = project.get('urls', {})
+    add('Project-URL', *(f'{label}, {url}' for label, url in urls.items()))
+    add('Requires-Python', project.get('requires-python'))
+    add('Requires-Dist', *project.get('dependencies', []))
+    for extra, deps in project.get('optional-dependencies', {}).items():
+        add('Provides-Extra', extra)
+        for dep in deps:
+            req, _, marker = dep.partition(';')
+            marker = f'({marker.strip()}) and ' if marker.strip() else ''
+            add('Requires-Dist', f'{req.strip()}; {marker}extra == "{extra}"')
+
+    body, content_type = _readme(project.get('readme'), root)
+    add('Description-Content-Type', content_type)
+    return headers, body
+
+def _entry_points(project):
+    groups = {}
+    if project.get('scripts'):
+        groups['console_scripts'] = project['scripts']
+    if project.get('gui-scripts'):
+        groups['gui_scripts'] = project['gui-scripts']
+    groups.update(project.get('entry-points', {}))
+    return groups
+
+def _package(project, root):
+    # the directory that the package is imported from (`src` or the root of the
+    # project), and the package (or module) itself.
+    name = _distname(project['name'])
+    for base in (root / 'src', root):
+        for path in (base / name, base / f'{name}.py'):
+            if path.exists():
+                return base, path
+    raise RuntimeError(f'could not find the package {name} in {root}')
+
+def _files(path):
+    # the files of a package, leaving out bytecode and hidden files.
+    if path.is_file():
+        yield path
+        return
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(
+            d for d in dirnames if d != '__pycache__' and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if not filename.endswith('.pyc') and not filename.startswith('.'):
+                yield pathlib.Path(dirpath) / filename
+
+def _compresslevel(config_settings, chakra):
+    # `compression-level` can be given in the config settings (e.g. `--config-setting
+    # compression-level=0` with `pip wheel`), or in the `[tool.chakra.build]` table.
+    level = (config_settings or {}).get(
+        'compression-level', chakra.get('build', {}).get('compression-level'))
+    if level is None:
+        return None
+    level = int(level)
+    if not 0 <= level <= 9:
+        raise ValueError(f'invalid compression level {level}')
+    return level
+
+def _date_time():
+    # timestamps of the files in the wheel; fixed by `SOURCE_DATE_EPOCH` for
+    # reproducible builds.
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch is None:
+        return None
+    return time.gmtime(max(int(epoch), 315532800))[:6]    # not before 1980
+
+def _manifest_path(wheel_path):
+    return wheel_path.with_name(f'.{wheel_path.name}.manifest')
+
+def _previous(wheel_path, settings):
+    # the previous build of a wheel, if it was made with the same settings and hasn't
+    # been replaced since, along with the manifest of the files of the package in it: a
+    # mapping from their names in the wheel to `[mtime, size, mode, hash]`.
+    try:
+        with open(_manifest_path(wheel_path)) as f:
+            manifest = json.load(f)
+        st = os.stat(wheel_path)
+        if manifest['settings'] != settings or \
+                manifest['wheel'] != [st.st_mtime_ns, st.st_size]:
+            return None, {}
+        return zipfile.ZipFile(wheel_path), manifest['files']
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None, {}
+
+def _write_manifest(wheel_path, settings, files):
+    st = os.stat(wheel_path)
+    manifest = {
+        'settings': settings, 'wheel': [st.st_mtime_ns, st.st_size], 'files': files}
+    tmp = _manifest_path(wheel_path).with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, _manifest_path(wheel_path))
+
+def _load():
+    # the project in the current directory: its root, the `[project]` and
+    # `[tool.chakra]` tables of its `pyproject.toml`, and its metadata.
+    root = pathlib.Path.cwd()
+    config = pyproject.load(root / 'pyproject.toml')
+    project = config.get('project', {})
+    chakra = config.get('tool', {}).get('chakra', {})
+    return root, project, chakra, _metadata(project, root)
+
+def _build(wheel_directory, config_settings, editable):
+    root, project, chakra, (headers, body) = _load()
+    distname = _distname(project['name'])
+    version = headers['Version'][0]
+    dist_info = f'{distname}-{version}.dist-info'
+    wheel_name = f'{distname}-{version}-{_TAG}.whl'
+    base, package = _package(project, root)
+    compresslevel, date_time = _compresslevel(config_settings, chakra), _date_time()
+
+    # files that are unchanged since the previous build (by their modification times,
+    # sizes and modes) are copied over from the previous wheel as they are.
+    wheel_path = pathlib.Path(wheel_directory) / wheel_name
+    wheel_path.parent.mkdir(parents=True, exist_ok=True)
+    settings = [compresslevel, list(date_time) if date_time else None]
+    previous, manifest = (None, {}) if editable else _previous(wheel_path, settings)
+    files = {}
+
+    tmp = wheel_path.with_name(f'.{wheel_name}.tmp')
+    try:
+        with WheelWriter(tmp, dist_info, compresslevel=compresslevel,
+                         date_time=date_time) as wheel:
+            if editable:
+                # the package is imported from the source tree, through a path file.
+                wheel.write_text(f'{distname}.pth', f'{base}\n')
+            else:
+                for path in _files(package):
+                    arcname = path.relative_to(base).as_posix()
+                    st = os.stat(path)
+                    ident = [st.st_mtime_ns, st.st_size, st.st_mode]
+                    entry = manifest.get(arcname)
+                    if entry is not None and entry[:3] == ident and \
+                            arcname in previous.NameToInfo:
+                        wheel.copy(previous, arcname, entry[3], st.st_size)
+                    else:
+                        wheel.write_file(path, arcname)
+                    files[arcname] = ident + [wheel.records[-1][1]]
+
+            with wheel.open(f'{dist_info}/METADATA') as fp:
+                rfc822.dump(headers, body, fp)
+            wheel.write_text(f'{dist_info}/WHEEL', rfc822.dumps({
+                'Wheel-Version': ['1.0'],
+                'Generator': ['chakra'],
+                'Root-Is-Purelib': ['true'],
+                'Tag': [_TAG],
+            }, ''))
+            entry_points = _entry_points(project)
+            if entry_points:
+                wheel.write_text(
+                    f'{dist_info}/entry_points.txt', ini.dumps(entry_points) + '\n')
+            license_ = project.get('license')
+            if isinstance(license_, dict) and 'file' in license_:
+                wheel.write_file(
+                    root / license_['file'], f'{dist_info}/{license_["file"]}')
+    finally:
+        if previous is not None:
+            previous.close()
+
+    os.replace(tmp, wheel_path)
+    if not editable:
+        _write_manifest(wheel_path, settings, files)
+    return wheel_name
+
+def _sdist_files(root, project, package):
+    # the files that go into an sdist besides PKG-INFO: enough to build the wheel again.
+    yield root / 'pyproject.toml'
+    readme = project.get('readme')
+    if isinstance(readme, dict):
+        readme = readme.get('file')
+    if readme is not None:
+        yield root / readme
+    license_ = project.get('license')
+    if isinstance(license_, dict) and 'file' in license_:
+        yield root / license_['file']
+    yield from _files(package)
+
+def _build_sdist(sdist_directory, config_settings):
+    root, project, chakra, (headers, body) = _load()
+    name = f'{_distname(project["name"])}-{headers["Version"][0]}'
+    _, package = _package(project, root)
+    compresslevel = _compresslevel(config_settings, chakra)
+    date_time = _date_time()
+    mtime = calendar.timegm(date_time) if date_time else None
+    compresslevel = 9 if compresslevel is None else compresslevel
+
+    def add(tar, arcname, fileobj, size, mode=0o644, mtime_=None):
+        tarinfo = tarfile.TarInfo(f'{name}/{arcname}')
+        tarinfo.size, tarinfo.mode = size, mode
+        tarinfo.mtime = mtime if mtime is not None else (mtime_ or time.time())
+        tar.addfile(tarinfo, fileobj)    # read from `fileobj` in chunks
+
+    sdist_path = pathlib.Path(sdist_directory) / f'{name}.tar.gz'
+    sdist_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = sdist_path.with_name(f'.{sdist_path.name}.tmp')
+    try:
+        with open(tmp, 'wb') as f, \
+                gzip.GzipFile('', mode='wb', fileobj=f, mtime=mtime,
+                              compresslevel=compresslevel) as gz, \
+                tarfile.open(fileobj=gz, mode='w', format=tarfile.PAX_FORMAT) as tar:
+            pkg_info = rfc822.dumps(headers, body).encode()
+            add(tar, 'PKG-INFO', io.BytesIO(pkg_info), len(pkg_info))
+            for path in _sdist_files(root, project, package):
+                st = os.stat(path)
+                with open(path, 'rb') as src:
+                    add(tar, path.relative_to(root).as_posix(), src, st.st_size,
+                        mode=stat.S_IMODE(st.st_mode), mtime_=st.st_mtime)
+        os.replace(tmp, sdist_path)
+    finally:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+    return sdist_path.name
+
+def get_requires_for_build_wheel(config_settings=None):
+    return []
+
+def get_requires_for_build_editable(config_settings=None):
+    return []
+
+def get_requires_for_build_sdist(config_settings=None):
+    return []
+
+def build_sdist(sdist_directory, config_settings=None):
+    return _build_sdist(sdist_directory, config_settings)
+
+def build_wheel(wheel_directory, config_settings=None, metadata_directory=None):
+    return _build(wheel_directory, config_settings, editable=False)
+
+def build_editable(wheel_directory, config_settings=None, metadata_directory=None):
+    return _build(wheel_directory, config_settings, editable=True)
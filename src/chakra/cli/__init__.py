@@ -0,0 +1,36 @@
+import argparse
+import importlib
+import sys
+
+__all__ = ['cli']
+
+# subcommands, as a mapping from their names to the modules implementing them and their
+# help. each module defines `add_arguments(parser)` and `run(args)`, and is imported only
+# when its subcommand is run, so that no subcommand pays for the imports of the others.
+# the modules themselves import what `run()` needs within it, so that `--help` is quick.
+_subcommands = {
+    'hooks': ('.hooks', 'run the hooks of a project'),
+    'build': ('.build', 'build the sdists and wheels of the projects under a directory'),
+    'cache': ('.cache', 'show or clear the caches'),
+}
+
+def cli(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser('chakra', description='Chakra CLI.')
+    subparsers = parser.add_subparsers(dest='subcommand', metavar='<command>')
+
+    # the subcommand is the first argument that is not an option, since `chakra` itself
+    # takes no options (besides `--help`).
+    chosen = next((arg for arg in argv if not arg.startswith('-')), None)
+    for name, (module, help_) in _subcommands.items():
+        subparser = subparsers.add_parser(name, help=help_, description=help_)
+        if name == chosen:
+            module = importlib.import_module(module, __name__)
+            module.add_arguments(subparser)
+            subparser.set_defaults(run=module.run)
+
+    args = parser.parse_args(argv)
+    if args.subcommand is None:
+        parser.print_help()
+        return 0
+    return args.run(args)
@@ -0,0 +1,33 @@
+import sys
+
+def add_arguments(parser):
+    parser.add_argument(
+        'directory', nargs='?', default='.', help='directory to look for projects under')
+    parser.add_argument(
+        '-o', '--outdir', default='dist', help='directory to build into')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None, help='number of projects built at once')
+
+def run(args):
+    from ..core.build import build_many, discover
+
+    projects = discover(args.directory)
+    if not projects:
+        print(f'no projects found under {args.directory}', file=sys.stderr)
+        return 1
+
+    def on_result(result):
+        if result.ok:
+            print(f'[{result.project}] {result.sdist}, {result.wheel} '
+                  f'({result.seconds:.2f}s)')
+        else:
+            print(f'[{result.project}] failed ({result.seconds:.2f}s): {result.error}',
+                  file=sys.stderr)
+
+    results = build_many(
+        projects, args.outdir, max_workers=args.jobs, on_result=on_result)
+    failed = [str(result.project) for result in results if not result.ok]
+    if failed:
+        print(f'builds failed: {", ".join(failed)}', file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,28 @@
+def add_arguments(parser):
+    parser.add_argument(
+        'action', nargs='?', choices=['info', 'clear'], default='info',
+        help='show the location and size of each cache, or clear them')
+
+def run(args):
+    import shutil
+
+    from ..core.results import ResultCache
+    from ..core.template import TemplateCache, _size
+    from ..core.wheels import WheelCache
+    from ..utils import cache_dir
+
+    templates, results, wheels = TemplateCache(), ResultCache(), WheelCache()
+    if args.action == 'clear':
+        templates.clear()
+        results.clear()
+        wheels.clear()
+        shutil.rmtree(cache_dir('pyproject'), ignore_errors=True)
+        return 0
+
+    for name, root, size in [
+            ('templates', templates.root, _size(templates.root)),
+            ('results', results.root, results.size()),
+            ('wheels', wheels.root, _size(wheels.root)),
+            ('pyproject', cache_dir('pyproject'), _size(cache_dir('pyproject')))]:
+        print(f'{name:<10} {size / 1024 ** 2:8.1f} MiB  {root}')
+    return 0
@@ -0,0 +1,29 @@
+import sys
+
+def add_arguments(parser):
+    parser.add_argument(
+        'directory', nargs='?', default='hooks', help='directory of the hooks')
+    parser.add_argument(
+        '--pyproject', default='pyproject.toml', help='path to pyproject.toml')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None, help='number of hooks run at once')
+
+def run(args):
+    from ..core.hook import HookScheduler
+
+    try:
+        scheduler = HookScheduler.from_pyproject(
+            args.directory, pyproject=args.pyproject, max_workers=args.jobs)
+    except FileNotFoundError as exc:
+        print(f'could not find {exc.filename}', file=sys.stderr)
+        return 1
+
+    def on_output(name, stream, line):
+        print(f'[{name}] {line}', file=sys.stderr if stream == 'stderr' else sys.stdout)
+
+    results = scheduler.run(capture_output=False, on_output=on_output)
+    failed = [name for name, result in results.items() if result.returncode != 0]
+    if failed or len(results) < len(scheduler.hooks):
+        print(f'hooks failed: {", ".join(failed)}', file=sys.stderr)
+        return 1
+    return 0
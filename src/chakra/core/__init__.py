@@ -1,4 +1,43 @@
-from .command import Command
-from .hook import Hook
-from .platform import Arch, OpSystem
-from .environment import Environment
+import importlib
+
+# the names exported by the package, and the modules they come from. a module is imported
+# only once one of its names is first used, so that e.g. running hooks doesn't import
+# what is needed to create environments.
+_exports = {
+    'Command': '.command',
+    'run_many': '.command',
+    'Hook': '.hook',
+    'HookScheduler': '.hook',
+    'scan_metadata': '.metadata',
+    'BuildResult': '.build',
+    'build_many': '.build',
+    'discover': '.build',
+    'Arch': '.platform',
+    'OpSystem': '.platform',
+    'Environment': '.environment',
+    'install_wheel': '.installer',
+    'uninstall': '.installer',
+    'Lock': '.lock',
+    'sync': '.lock',
+    'FindLinks': '.resolver',
+    'Resolver': '.resolver',
+    'resolve': '.resolver',
+    'TemplateCache': '.template',
+    'EnvironmentPool': '.pool',
+    'ResultCache': '.results',
+    'WheelCache': '.wheels',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,138 @@
+from concurrent import futures
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+from .command import Command
+from .environment import Environment
+from ..utils.pyproject import load as load_pyproject
+
+# directories that are never searched for projects.
+_SKIPPED = {'__pycache__', 'node_modules', 'build', 'dist'}
+
+# the backend and requirements assumed for a project with no `[build-system]` table, as
+# per PEP 517 and PEP 518.
+_DEFAULT_BACKEND = 'setuptools.build_meta:__legacy__'
+_DEFAULT_REQUIRES = ['setuptools>=40.8.0', 'wheel']
+
+# run in an isolated environment to build a project with its own backend; prints the
+# names of the sdist and wheel built, as JSON, on the last line of its output.
+_HOOKS = '''
+import importlib, json, os, sys
+project, backend, backend_path, outdir = sys.argv[1:]
+os.chdir(project)
+sys.path[:0] = [os.path.join(project, path) for path in json.loads(backend_path)]
+module, _, attrs = backend.partition(':')
+hooks = importlib.import_module(module)
+for attr in filter(None, attrs.split('.')):
+    hooks = getattr(hooks, attr)
+print(json.dumps([hooks.build_sdist(outdir), hooks.build_wheel(outdir)]))
+'''
+
+class BuildResult(object):
+
+    def __init__(self, project, sdist=None, wheel=None, seconds=0.0, error=None):
+        self.project = pathlib.Path(project)
+        self.sdist = sdist
+        self.wheel = wheel
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}({self.project!r}, sdist={self.sdist!r}, '
+            f'wheel={self.wheel!r}, seconds={self.seconds:.3f}, error={self.error!r})'
+        )
+
+    @property
+    def ok(self):
+        return self.error is None
+
+def discover(root):
+    # the directories under `root` (including `root` itself) that have a
+    # `pyproject.toml`, in sorted order. hidden directories, virtual environments and
+    # build outputs are not searched.
+    projects = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not d.startswith('.') and d not in _SKIPPED
+            and not os.path.exists(os.path.join(dirpath, d, 'pyvenv.cfg'))
+        )
+        if 'pyproject.toml' in filenames:
+            projects.append(pathlib.Path(dirpath))
+    return projects
+
+def _build_in_process(project, outdir):
+    # chakra's own backend is importable right here, so there is no need for an
+    # environment to build with it.
+    from .. import backend
+
+    cwd = os.getcwd()
+    os.chdir(project)
+    try:
+        return backend.build_sdist(outdir), backend.build_wheel(outdir)
+    finally:
+        os.chdir(cwd)
+
+def _build_isolated(project, outdir, build_system):
+    # builds in a fresh environment that has only the requirements of the backend.
+    with tempfile.TemporaryDirectory() as tmp:
+        env = Environment(pathlib.Path(tmp) / 'env', python=sys.executable)
+        env.create()
+        python = str(env.python_executable)
+        requires = build_system.get('requires', _DEFAULT_REQUIRES)
+        if requires:
+            result = Command([python, '-m', 'pip', 'install', '--quiet', *requires]).run()
+            if result.returncode != 0:
+                raise RuntimeError(f'could not install {requires}: {result.stderr}')
+        result = Command([
+            python, '-c', _HOOKS, str(project),
+            build_system.get('build-backend', _DEFAULT_BACKEND),
+            json.dumps(build_system.get('backend-path', [])), str(outdir),
+        ]).run()
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        return tuple(json.loads(result.stdout.splitlines()[-1]))
+
+def _build(project, outdir):
+    # run in a worker process; any error is reported through the result rather than
+    # raised, so that one failing project doesn't hide the results of the others.
+    project, outdir = pathlib.Path(project).resolve(), pathlib.Path(outdir).resolve()
+    start = time.perf_counter()
+    try:
+        config = load_pyproject(project / 'pyproject.toml')
+        build_system = config.get('build-system', {})
+        if build_system.get('build-backend') == 'chakra.backend':
+            sdist, wheel = _build_in_process(project, outdir)
+        else:
+            sdist, wheel = _build_isolated(project, outdir, build_system)
+    except Exception as exc:
+        return BuildResult(
+            project, seconds=time.perf_counter() - start,
+            error=f'{exc.__class__.__name__}: {exc}')
+    return BuildResult(
+        project, sdist=sdist, wheel=wheel, seconds=time.perf_counter() - start)
+
+def build_many(projects, outdir, max_workers=None, on_result=None):
+    # builds the sdists and wheels of the given projects into `outdir`, each in a
+    # separate process, returning their results in the order of `projects`.
+    # `on_result(result)`, if given, is called as soon as each project is built.
+    projects = list(projects)
+    if not projects:
+        return []
+    results = {}
+    max_workers = min(max_workers or os.cpu_count() or 1, len(projects))
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running = {
+            executor.submit(_build, project, outdir): index
+            for index, project in enumerate(projects)
+        }
+        for future in futures.as_completed(running):
+            result = results[running[future]] = future.result()
+            if on_result is not None:
+                on_result(result)
+    return [results[index] for index in range(len(projects))]
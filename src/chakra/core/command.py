@@ -1,6 +1,24 @@
+import asyncio
+import codecs
+from concurrent import futures
+import locale
 import os
 import shlex
 import subprocess
+import sys
+
+# the size of the chunks in which an over-long line of output is read.
+_STREAM_LIMIT = 2 ** 16
+
+def _not_found(args, exc, capture_output):
+    err = f'command not found: {exc.filename}'
+    if not capture_output:
+        print(err, file=sys.stderr)
+        stdout, stderr = None, None
+    else:
+        stdout, stderr = '', err
+    return subprocess.CompletedProcess(
+        args=args, returncode=127, stdout=stdout, stderr=stderr)
 
 def _subprocess_run(args, capture_output=True, env=None):
     try:
@@ -8,14 +26,7 @@ def _subprocess_run(args, capture_output=True, env=None):
             args, shell=False, check=False, text=True, capture_output=capture_output,
             env=env)
     except FileNotFoundError as exc:         # normalize this error
-        err = f'command not found: {exc.filename}'
-        if not capture_output:
-            print(err, file=sys.stderr)
-            stdout, stderr = None, None
-        else:
-            stdout, stderr = '', err
-        result = subprocess.CompletedProcess(
-            args=args, returncode=127, stdout=stdout, stderr=stderr)
+        result = _not_found(args, exc, capture_output)
     else:
         if capture_output:
             result.stdout, result.stderr = result.stdout.strip(), result.stderr.strip()
@@ -37,7 +48,100 @@ class Command(object):
     def __eq__(self, other):
         return self.tokens == other.tokens and self.env_vars == other.env_vars
 
-    def run(self, capture_output=True):
+    def _env(self):
         env_vars = self.env_vars.copy()
         env_vars['PATH'] = os.environ['PATH']    # pass the current PATH
-        return _subprocess_run(self.tokens, capture_output=capture_output, env=env_vars)
+        return env_vars
+
+    def run(self, capture_output=True):
+        return _subprocess_run(
+            self.tokens, capture_output=capture_output, env=self._env())
+
+    async def run_async(self, capture_output=True, on_output=None):
+        # `on_output(name, line)` is called for each line of output as soon as it
+        # arrives, `name` being either 'stdout' or 'stderr'. lines are held on to for the
+        # returned result only if `capture_output` is set, so a long-running command can
+        # be followed through `on_output` without buffering all of its output.
+        streamed = capture_output or on_output is not None
+        pipe = asyncio.subprocess.PIPE if streamed else None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.tokens, stdout=pipe, stderr=pipe, env=self._env(),
+                limit=_STREAM_LIMIT)
+        except FileNotFoundError as exc:     # normalize this error, as in `run()`
+            return _not_found(self.tokens, exc, capture_output)
+
+        captured = {'stdout': [], 'stderr': []}
+        encoding = locale.getpreferredencoding(False)
+
+        async def follow(name, stream):
+            decoder = codecs.getincrementaldecoder(encoding)()
+            parts = []
+            while True:
+                try:
+                    data = await stream.readuntil(b'\n')
+                except asyncio.IncompleteReadError as exc:   # end of stream
+                    data = exc.partial
+                except asyncio.LimitOverrunError as exc:
+                    # an over-long line, read in parts which are joined back together;
+                    # a character may be split across two parts.
+                    parts.append(decoder.decode(await stream.readexactly(exc.consumed)))
+                    continue
+                if not data and not parts:
+                    break
+                parts.append(decoder.decode(data, final=True))
+                line = ''.join(parts).rstrip('\r\n')
+                parts = []
+                if on_output is not None:
+                    on_output(name, line)
+                if capture_output:
+                    captured[name].append(line)
+
+        try:
+            if streamed:
+                await asyncio.gather(
+                    follow('stdout', proc.stdout), follow('stderr', proc.stderr))
+            returncode = await proc.wait()
+        except BaseException:
+            # don't leave the process running behind a cancelled task, or one that
+            # failed (e.g. on output that can't be decoded).
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+
+        if capture_output:
+            stdout = '\n'.join(captured['stdout']).strip()
+            stderr = '\n'.join(captured['stderr']).strip()
+        else:
+            stdout, stderr = None, None
+        return subprocess.CompletedProcess(
+            args=self.tokens, returncode=returncode, stdout=stdout, stderr=stderr)
+
+def run_many(commands, max_workers=None, capture_output=True):
+    # run independent commands concurrently; the results are returned in the same order as
+    # the commands were passed in. threads (and not processes) suffice here since each
+    # worker spends its time blocked on a child process.
+    commands = list(commands)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if not commands:
+        return []
+
+    def run(command):
+        try:
+            return command.run(capture_output=capture_output)
+        except OSError as exc:
+            # one command failing to start (e.g. a script without execute permissions)
+            # should not take down the rest of the batch.
+            err = f'command failed to start: {exc}'
+            if not capture_output:
+                print(err, file=sys.stderr)
+                stdout, stderr = None, None
+            else:
+                stdout, stderr = '', err
+            return subprocess.CompletedProcess(
+                args=command.tokens, returncode=126, stdout=stdout, stderr=stderr)
+
+    with futures.ThreadPoolExecutor(max_workers=min(max_workers, len(commands))) as pool:
+        return list(pool.map(run, commands))
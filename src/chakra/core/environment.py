@@ -1,8 +1,14 @@
+import os
 import pathlib
 import shutil
 
 from .command import Command
+from .metadata import FIELDS, scan_metadata
+from .installer import install_wheel, uninstall
+from .lock import sync
 from .platform import OpSystem
+from .wheels import WheelCache
+from ..utils import names
 
 class Environment(object):
 
@@ -10,6 +16,7 @@ class Environment(object):
         self.path = pathlib.Path(path)
         self.python = pathlib.Path(shutil.which(python)).resolve()
         self.is_activated = False
+        self._index = None    # (mtime of site-packages, installed distributions)
 
     def __repr__(self):
         return (
@@ -39,35 +46,99 @@ class Environment(object):
     def pyvenv_cfg(self):
         return self.path / 'pyvenv.cfg'
 
-    def create(self, **kwargs):
-        # not using `virtualenv.cli_run([...])` here, since `virtualenv` turns out to be a
-        # time-consuming import and impacts chakra's startup time.
-        Command([
-            'virtualenv', str(self.path),
+    @property
+    def options(self):
+        # options passed to `virtualenv`, besides the path and the prompt.
+        return [
             '--download',
             '--activators', 'python',
             '--no-setuptools',
             '--no-wheel',
-            '--prompt', self.path.name,
             '--python', str(self.python),
-        ]).run(**kwargs)
+        ]
+
+    def _virtualenv(self, path, prompt, **kwargs):
+        # not using `virtualenv.cli_run([...])` here, since `virtualenv` turns out to be a
+        # time-consuming import and impacts chakra's startup time.
+        return Command(
+            ['virtualenv', str(path), '--prompt', prompt] + self.options).run(**kwargs)
+
+    def create(self, templates=None, **kwargs):
+        # with a `TemplateCache`, the environment is cloned from a template instead of
+        # being created from scratch. scripts on Windows are executables with the path to
+        # the environment embedded in them, hence templates are not used there.
+        if templates is not None and OpSystem.find() != OpSystem.WINDOWS:
+            templates.clone(self, **kwargs)
+        else:
+            self._virtualenv(self.path, self.path.name, **kwargs)
 
     def activate(self):
         self.is_activated = True
         exec(open(self.activate_script).read(), {'__file__': str(self.activate_script)})
 
+    def installed(self):
+        # the distributions installed in the environment, as a mapping from their names
+        # (normalized) to their versions. this is built from a single listing of
+        # site-packages, which is repeated only once site-packages is modified, i.e. once
+        # a distribution is added or removed.
+        try:
+            mtime = os.stat(self.site_packages).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if self._index is None or self._index[0] != mtime:
+            index = {}
+            with os.scandir(self.site_packages) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext not in ('.dist-info', '.egg-info'):
+                        continue
+                    # `{name}-{version}[-{tag}]`, with any `-` in the name escaped to `_`
+                    parts = stem.split('-')
+                    if len(parts) >= 2:
+                        index[names.normalize(parts[0])] = parts[1]
+            self._index = (mtime, index)
+        return self._index[1]
+
+    def metadata(self, fields=FIELDS, max_workers=1):
+        # the given header fields from the metadata of the installed distributions; refer
+        # `scan_metadata()`.
+        return scan_metadata(self.site_packages, fields=fields, max_workers=max_workers)
+
+    def install_wheel(self, wheel, max_workers=None):
+        # installs a wheel without pip; refer `install_wheel()`.
+        return install_wheel(self, wheel, max_workers=max_workers)
+
+    def install_cached(self, requirements, cache=None):
+        # installs pinned requirements from a `WheelCache` (the default one, unless
+        # given) rather than through pip; refer `WheelCache.install_requirements()`.
+        cache = WheelCache() if cache is None else cache
+        return cache.install_requirements(self, requirements)
+
+    def uninstall(self, name):
+        # refer `uninstall()`.
+        return uninstall(self, name)
+
+    def sync(self, lock, groups=None, cache=None):
+        # installs and removes only what differs from a lock; refer `sync()`.
+        return sync(self, lock, groups=groups, cache=cache)
+
     def has_installed(self, package, ver=None):
-        if (self.site_packages / package).exists() or (self.site_packages / f'{package}.py').exists():
-            if ver is None:
-                dist_info = self.site_packages.glob(f'{package}-*.dist-info')
-                dist_info = list(dist_info)
-                if len(dist_info) == 1:
-                    return True
-            else:
-                dist_info = self.site_packages / f'{package}-{ver}.dist-info'
-                if dist_info.exists():
-                    return True
-        return False
+        return self.has_installed_many({package: ver})[package]
+
+    def has_installed_many(self, packages):
+        # `packages` is either an iterable of names, or a mapping from names to versions
+        # (`None` standing for any version). returns a mapping from each name to whether
+        # it is installed.
+        if hasattr(packages, 'items'):
+            packages = packages.items()
+        else:
+            packages = ((package, None) for package in packages)
+        installed = self.installed()
+        result = {}
+        for package, ver in packages:
+            version = installed.get(names.normalize(package))
+            result[package] = version is not None and (ver is None or version == str(ver))
+        return result
 
     def remove(self):
         shutil.rmtree(self.path)
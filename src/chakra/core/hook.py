@@ -1,9 +1,13 @@
+import asyncio
 import enum
+import graphlib
+import os
 import pathlib
 
 from .command import Command
 from .platform import OpSystem
 from ..errors import NotSupportedError
+from ..utils.pyproject import load as load_pyproject
 
 class _HookType(enum.Enum):
     BASH = ('', '.sh')
@@ -41,8 +45,109 @@ class Hook(Command):
 
     def __init__(self, script):
         script = pathlib.Path(script)
+        self.script = script
         self._type = _HookType.identify(script)
         super().__init__(list(self._type.interpreter) + [str(script)])
 
     def is_compat(self, opsys):
         return self._type.is_compat(opsys)
+
+class HookScheduler(object):
+    # runs a set of hooks concurrently, each hook starting once the hooks it depends on
+    # have succeeded. as soon as a hook fails, the hooks still running are cancelled and
+    # no more hooks are started.
+
+    def __init__(self, hooks, deps={}, max_workers=None):
+        # `hooks` maps names to hooks, and `deps` maps names to lists of the names of the
+        # hooks they depend on. dependencies on hooks which aren't present (e.g. hooks
+        # meant for another operating system) are ignored.
+        self.hooks = hooks
+        self.deps = deps
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(hooks={self.hooks!r}, deps={self.deps!r}, '
+            f'max_workers={self.max_workers})'
+        )
+
+    @classmethod
+    def discover(cls, directory, deps={}, opsys=None, max_workers=None):
+        # the hooks in a directory are its scripts of a supported type which are
+        # compatible with the operating system; each hook is named by its script's name
+        # sans extension.
+        opsys = OpSystem.find() if opsys is None else opsys
+        hooks = {}
+        for path in sorted(pathlib.Path(directory).iterdir()):
+            if path.name.startswith('.') or not path.is_file():
+                continue
+            try:
+                hook = Hook(path)
+            except NotSupportedError:
+                continue
+            if not hook.is_compat(opsys):
+                continue
+            if path.stem in hooks:
+                raise ValueError(f'more than one hook named {path.stem!r} in {directory}')
+            hooks[path.stem] = hook
+        return cls(hooks, deps=deps, max_workers=max_workers)
+
+    @classmethod
+    def from_pyproject(cls, directory, pyproject='pyproject.toml', **kwargs):
+        # dependencies are declared in the `[tool.chakra.hook-deps]` table, e.g.
+        #
+        #     [tool.chakra.hook-deps]
+        #     build = ["codegen", "lint"]
+        config = load_pyproject(pyproject)
+        deps = config.get('tool', {}).get('chakra', {}).get('hook-deps', {})
+        return cls.discover(directory, deps=deps, **kwargs)
+
+    def _graph(self):
+        return {
+            name: [dep for dep in self.deps.get(name, []) if dep in self.hooks]
+            for name in self.hooks
+        }
+
+    async def run_async(self, capture_output=True, on_output=None):
+        # returns a mapping from names to results of the hooks that ran to completion;
+        # hooks that were cancelled or never started are left out. `on_output`, if given,
+        # is called as `on_output(name, stream, line)`.
+        sorter = graphlib.TopologicalSorter(self._graph())
+        sorter.prepare()                 # raises `graphlib.CycleError` on circular deps
+        semaphore = asyncio.Semaphore(self.max_workers)
+        results, running = {}, {}
+
+        async def run(name):
+            kwargs = {'capture_output': capture_output}
+            if on_output is not None:
+                kwargs['on_output'] = lambda stream, line: on_output(name, stream, line)
+            async with semaphore:
+                return await self.hooks[name].run_async(**kwargs)
+
+        failed = False
+        try:
+            while sorter.is_active() and not failed:
+                for name in sorter.get_ready():
+                    running[asyncio.ensure_future(run(name))] = name
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                    if results[name].returncode != 0:
+                        failed = True
+                    else:
+                        sorter.done(name)
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return results
+
+    def run(self, capture_output=True, on_output=None):
+        return asyncio.run(
+            self.run_async(capture_output=capture_output, on_output=on_output))
@@ -0,0 +1,297 @@
+from concurrent import futures
+import base64
+import csv
+import hashlib
+import io
+import os
+import pathlib
+import shutil
+import stat
+import threading
+import zipfile
+
+from .platform import OpSystem
+from ..errors import NotSupportedError
+from ..utils import ini, names
+
+# the size of the chunks in which members are streamed out of a wheel.
+_CHUNK = 2 ** 20
+
+_INSTALLER = b'chakra\n'
+
+_CONSOLE_SCRIPT = '''\
+#!{python}
+import sys
+from {module} import {head}
+if __name__ == '__main__':
+    sys.exit({attr}())
+'''
+
+def _record_hash(data):
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=')
+    return f'sha256={digest.decode()}'
+
+def _member_path(name):
+    # members with absolute paths, or which would be extracted outside of the target
+    # directory, are not accepted.
+    path = pathlib.PurePosixPath(name)
+    if path.is_absolute() or '..' in path.parts or ':' in path.parts[0]:
+        raise ValueError(f'unsafe path in wheel: {name}')
+    return path
+
+def _dist_info(names):
+    # the `.dist-info` directory of a wheel, from the names of its members.
+    dirs = {
+        name.split('/', 1)[0] for name in names
+        if name.split('/', 1)[0].endswith('.dist-info')
+    }
+    if len(dirs) != 1:
+        raise ValueError(f'expected one .dist-info directory in wheel, found {len(dirs)}')
+    return dirs.pop()
+
+def _parse_record(text):
+    # `RECORD` as a mapping from paths to their hashes and sizes.
+    return {row[0]: (row[1], row[2]) for row in csv.reader(io.StringIO(text)) if row}
+
+def _unsigned(dist_info):
+    # members that can't be listed in `RECORD` with a hash.
+    return {f'{dist_info}/RECORD', f'{dist_info}/RECORD.jws', f'{dist_info}/RECORD.p7s'}
+
+def _extract(wheel, destination, max_workers=None):
+    # extracts the members of a wheel, spread over a pool of threads, to the paths that
+    # `destination(name)` gives for them (members for which it gives `None` are left
+    # out). each member is hashed as it is streamed into a temporary file, which is
+    # renamed into place only if the hash matches the one in `RECORD`; hence a member
+    # that was tampered with (or a wheel that's cut short) never gets installed.
+    #
+    # each thread reads through its own handle to the wheel, since reads through a
+    # shared handle are serialized. returns the name of the `.dist-info` directory, its
+    # parsed `RECORD`, and the paths written as a mapping from the names of the members
+    # (all of which are removed again should extraction fail).
+    with zipfile.ZipFile(wheel) as zf:
+        infos = [info for info in zf.infolist() if not info.is_dir()]
+        dist_info = _dist_info(info.filename for info in infos)
+        record = _parse_record(zf.read(f'{dist_info}/RECORD').decode())
+    unsigned = _unsigned(dist_info)
+
+    jobs = []
+    for info in infos:
+        _member_path(info.filename)
+        path = destination(info.filename)
+        if path is None:
+            continue
+        if info.filename in unsigned:
+            expected = None
+        else:
+            hash_, _ = record.get(info.filename, ('', ''))
+            if '=' not in hash_:
+                raise ValueError(f'no hash for {info.filename} in RECORD of {wheel}')
+            expected = hash_
+        jobs.append((info, pathlib.Path(path), expected))
+    for _, path, _ in jobs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    local = threading.local()
+    handles, written = [], {}
+
+    def extract(job):
+        info, path, expected = job
+        if not hasattr(local, 'zf'):
+            local.zf = zipfile.ZipFile(wheel)
+            handles.append(local.zf)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+        algorithm, _, digest = (expected or 'sha256=').partition('=')
+        hash_ = hashlib.new(algorithm)
+        try:
+            with local.zf.open(info) as src, open(tmp, 'wb') as dst:
+                while chunk := src.read(_CHUNK):
+                    hash_.update(chunk)
+                    dst.write(chunk)
+            actual = base64.urlsafe_b64encode(hash_.digest()).rstrip(b'=').decode()
+            if expected is not None and actual != digest:
+                raise ValueError(
+                    f'hash of {info.filename} does not match RECORD of {wheel}')
+            mode = info.external_attr >> 16
+            if mode & 0o111:
+                os.chmod(tmp, stat.S_IMODE(mode) | 0o644)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        written[info.filename] = path
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(extract, jobs))
+    except BaseException:
+        for path in written.values():
+            path.unlink(missing_ok=True)
+        raise
+    finally:
+        for handle in handles:
+            handle.close()
+    return dist_info, record, written
+
+def _destination(name, env):
+    # where a file of a wheel goes, as per the `.data` scheme of PEP 427, and whether it
+    # is a script.
+    if not name.split('/', 1)[0].endswith('.data'):
+        return env.site_packages / name, False
+    _, scheme, path = name.split('/', 2)
+    if scheme in ('purelib', 'platlib'):
+        return env.site_packages / path, False
+    elif scheme == 'scripts':
+        return env.python_executable.parent / path, True
+    elif scheme == 'headers':
+        return env.path / 'include' / path, False
+    else:
+        return env.path / path, False
+
+def _script(content, env):
+    # scripts with a `#!python` line get the environment's interpreter instead.
+    if content.startswith(b'#!python'):
+        first, _, rest = content.partition(b'\n')
+        python = str(env.python_executable).encode()
+        content = b'#!' + python + first[8:] + b'\n' + rest
+    return content
+
+def _console_scripts(entry_points, env):
+    # writes the launchers of the console scripts in `entry_points.txt`, returning their
+    # paths. launchers on Windows are executables, which are not generated.
+    if not entry_points.exists() or OpSystem.find() == OpSystem.WINDOWS:
+        return []
+    written = []
+    with open(entry_points) as f:
+        console_scripts = ini.load(f).get('console_scripts', {})
+    for name, value in console_scripts.items():
+        module, _, attr = value.partition(':')
+        attr = attr.split('[')[0].strip()
+        path = env.python_executable.parent / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_CONSOLE_SCRIPT.format(
+            python=env.python_executable, module=module.strip(),
+            head=attr.split('.')[0], attr=attr))
+        os.chmod(path, 0o755)
+        written.append(path)
+    return written
+
+def _write_atomic(path, data):
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _finish(env, dist_info, records):
+    # writes `INSTALLER` and then `RECORD`, each atomically. `records` are rows of the
+    # installed files, with paths relative to site-packages.
+    site_packages = env.site_packages
+    _write_atomic(site_packages / dist_info / 'INSTALLER', _INSTALLER)
+    records = records + [
+        [f'{dist_info}/INSTALLER', _record_hash(_INSTALLER), str(len(_INSTALLER))],
+        [f'{dist_info}/RECORD', '', ''],
+    ]
+    with io.StringIO() as s:
+        csv.writer(s, lineterminator='\n').writerows(records)
+        _write_atomic(site_packages / dist_info / 'RECORD', s.getvalue().encode())
+
+def install_wheel(env, wheel, max_workers=None):
+    # installs a wheel into an environment without pip, extracting its members straight
+    # into place across a pool of `max_workers` threads and verifying them against its
+    # `RECORD`. returns the name of its `.dist-info` directory.
+    scripts = set()
+
+    def destination(name):
+        if name.endswith(('/RECORD', '/RECORD.jws', '/RECORD.p7s', '/INSTALLER')) \
+                and name.split('/', 1)[0].endswith('.dist-info'):
+            return None
+        path, is_script = _destination(name, env)
+        if is_script:
+            scripts.add(path)
+        return path
+
+    dist_info, record, written = _extract(wheel, destination, max_workers=max_workers)
+    try:
+        records = []
+        for name, path in sorted(written.items()):
+            if path in scripts:
+                content = _script(path.read_bytes(), env)
+                _write_atomic(path, content)
+                os.chmod(path, 0o755)
+                hash_, size = _record_hash(content), str(len(content))
+            else:
+                hash_, size = record[name]
+            records.append([os.path.relpath(path, env.site_packages), hash_, size])
+        entry_points = env.site_packages / dist_info / 'entry_points.txt'
+        for path in _console_scripts(entry_points, env):
+            written[path] = path
+            content = path.read_bytes()
+            records.append([
+                os.path.relpath(path, env.site_packages), _record_hash(content),
+                str(len(content))])
+        _finish(env, dist_info, records)
+    except BaseException:
+        for path in written.values():
+            path.unlink(missing_ok=True)
+        raise
+    return dist_info
+
+def _find_dist_info(site_packages, name):
+    # the `.dist-info` directory of an installed distribution, by its (any) name.
+    name = names.normalize(name)
+    with os.scandir(site_packages) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext == '.dist-info' and names.normalize(stem.split('-')[0]) == name:
+                return pathlib.Path(entry.path)
+    return None
+
+def _has_record(env, name):
+    # whether an installed distribution can be uninstalled, i.e. has a `.dist-info`
+    # directory with a `RECORD` (unlike a legacy `.egg-info` install).
+    dist_info = _find_dist_info(env.site_packages, name)
+    return dist_info is not None and (dist_info / 'RECORD').is_file()
+
+def uninstall(env, name):
+    # removes an installed distribution, i.e. the files listed in its `RECORD` (along
+    # with their bytecode) and then its `.dist-info` directory. directories left empty
+    # are removed too.
+    dist_info = _find_dist_info(env.site_packages, name)
+    if dist_info is None:
+        raise LookupError(f'{name} is not installed in {env.path}')
+    try:
+        record = (dist_info / 'RECORD').read_text()
+    except FileNotFoundError:
+        raise NotSupportedError(
+            f'cannot uninstall {name}: {dist_info.name} has no RECORD')
+
+    # nothing is removed if any of the paths is outside the environment, e.g. through
+    # `..` in a tampered RECORD.
+    site_packages = env.site_packages.resolve()
+    root = pathlib.Path(env.path).resolve()
+    record = [
+        pathlib.Path(os.path.normpath(site_packages / path))
+        for path in _parse_record(record)]
+    for path in record:
+        if root not in path.parents:
+            raise ValueError(f'cannot uninstall {name}: {path} is outside {env.path}')
+
+    dirs = set()
+    for path in record:
+        paths = [path]
+        if path.suffix == '.py':
+            paths.extend(path.parent.glob(f'__pycache__/{path.stem}.*.pyc'))
+        for p in paths:
+            p.unlink(missing_ok=True)
+            dirs.add(p.parent)
+    shutil.rmtree(dist_info, ignore_errors=True)
+
+    # deepest first, so that a directory is removed after the directories in it.
+    for path in sorted(dirs, key=lambda p: len(p.parts), reverse=True):
+        while path != site_packages and site_packages in path.parents:
+            try:
+                path.rmdir()
+            except OSError:              # not empty (or already removed)
+                if path.exists():
+                    break
+            path = path.parent
+    return dist_info.name
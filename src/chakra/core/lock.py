@@ -0,0 +1,198 @@
+import configparser
+import os
+import pathlib
+
+from .installer import _has_record, uninstall
+from .wheels import WheelCache
+from ..errors import NotSupportedError, ParseError
+from ..utils import ini, names
+from ..utils.pyproject import load as load_pyproject
+from ..utils.requirement import Requirement, default_environment
+from ..utils.version import Version
+
+# the format of lockfiles, which is checked when loading one.
+_FORMAT = 1
+
+# distributions which environments are created with, which syncing leaves alone.
+_SEED = ('pip', 'setuptools', 'wheel')
+
+def dependency_groups(config):
+    # the dependencies declared in a parsed `pyproject.toml`, as a mapping from groups to
+    # lists of requirements: `default` for `[project].dependencies`, and the tables of
+    # `[tool.chakra.dev-deps]` for the rest.
+    dependencies = config.get('project', {}).get('dependencies', [])
+    groups = {'default': [Requirement.parse(r) for r in dependencies]}
+    dev_deps = config.get('tool', {}).get('chakra', {}).get('dev-deps', {})
+    for group, requirements in dev_deps.items():
+        groups[group] = [Requirement.parse(r) for r in requirements]
+    return groups
+
+class Pin(object):
+    # a distribution pinned to a version, and the groups that (transitively) need it.
+
+    def __init__(self, name, version, groups=()):
+        self.name = names.normalize(name)
+        self.version = version
+        self.groups = set(groups)
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}({self.name!r}, {self.version!r}, '
+            f'groups={sorted(self.groups)!r})'
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Pin):
+            return NotImplemented
+        return (self.name, Version.parse(self.version), self.groups) == \
+            (other.name, Version.parse(other.version), other.groups)
+
+class Lock(object):
+    # the exact versions of all of a project's dependencies, direct and indirect, stored
+    # in INI format, e.g.
+    #
+    #     [chakra]
+    #     lock-version = 1
+    #
+    #     [package foo-bar]
+    #     version = 1.2.0
+    #     groups = default test
+
+    def __init__(self, pins=()):
+        self.pins = {pin.name: pin for pin in pins}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list(self.pins.values())!r})'
+
+    def __eq__(self, other):
+        if not isinstance(other, Lock):
+            return NotImplemented
+        return self.pins == other.pins
+
+    @classmethod
+    def loads(cls, text):
+        try:
+            data = ini.loads(text)
+            assert int(data.get('chakra', {}).get('lock-version', 0)) == _FORMAT, \
+                'unsupported lock-version'
+            pins = []
+            for section, values in data.items():
+                if section == 'chakra':
+                    continue
+                kind, _, name = section.partition(' ')
+                assert kind == 'package' and name, f'invalid section [{section}]'
+                Version.parse(values['version'])
+                pins.append(Pin(name, values['version'], values['groups'].split()))
+        except (AssertionError, KeyError, ValueError, configparser.Error) as exc:
+            raise ParseError(f'invalid lockfile: {exc}')
+        return cls(pins)
+
+    @classmethod
+    def load(cls, path='chakra.lock'):
+        with open(path) as f:
+            return cls.loads(f.read())
+
+    def dumps(self):
+        data = {'chakra': {'lock-version': str(_FORMAT)}}
+        for name in sorted(self.pins):
+            pin = self.pins[name]
+            data[f'package {name}'] = {
+                'version': pin.version, 'groups': ' '.join(sorted(pin.groups))}
+        return ini.dumps(data) + '\n'
+
+    def dump(self, path='chakra.lock'):
+        # written to a temporary file first, so that the lockfile is never left half
+        # written.
+        path = pathlib.Path(path)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}')
+        tmp.write_text(self.dumps())
+        os.replace(tmp, path)
+
+    def select(self, groups=None):
+        # the pinned versions needed by any of the given groups (or all of them), as a
+        # mapping from names to versions.
+        return {
+            name: pin.version for name, pin in self.pins.items()
+            if groups is None or pin.groups & set(groups)
+        }
+
+    @classmethod
+    def from_environment(cls, env, pyproject='pyproject.toml', environment=None):
+        # locks the dependencies of a project to the versions installed in an
+        # environment, following the `Requires-Dist` of the installed distributions.
+        # markers are evaluated for `environment` (refer `Marker.evaluate()`). raises
+        # `LookupError` if a dependency is not installed, or its installed version does
+        # not satisfy a requirement on it.
+        environment = dict(default_environment(), **(environment or {}))
+        metadata = env.metadata()
+        pins = {}
+
+        def applies(requirement, extras):
+            # whether a requirement applies when installing with any of `extras`, where
+            # '' stands for installing without extras.
+            if requirement.marker is None:
+                return '' in extras
+            return requirement.applies(environment, extras - {''})
+
+        for group, requirements in dependency_groups(load_pyproject(pyproject)).items():
+            expanded = {}                # name -> extras already followed
+            queue = [r for r in requirements if applies(r, {''})]
+            while queue:
+                requirement = queue.pop()
+                info = metadata.get(requirement.key)
+                if info is None or 'Version' not in info:
+                    raise LookupError(f'{requirement} is not installed in {env.path}')
+                version = info['Version'][0]
+                if not requirement.specifier.contains(version, prereleases=True):
+                    raise LookupError(
+                        f'{requirement} is not satisfied by {requirement.key} {version} '
+                        f'installed in {env.path}')
+                pin = pins.setdefault(requirement.key, Pin(requirement.key, version))
+                pin.groups.add(group)
+
+                extras = ({''} | set(requirement.extras)) - \
+                    expanded.setdefault(requirement.key, set())
+                expanded[requirement.key] |= extras
+                for dependency in info.get('Requires-Dist', []):
+                    dependency = Requirement.parse(dependency)
+                    if applies(dependency, extras):
+                        queue.append(dependency)
+        return cls(pins.values())
+
+def sync(env, lock, groups=None, cache=None, keep=_SEED):
+    # brings an environment in line with a lock, installing (from a `WheelCache`, the
+    # default one unless given) only the distributions which are missing or at another
+    # version, and uninstalling those at another version or not in the lock (besides
+    # those in `keep`). everything to install is looked up in the cache, and everything
+    # to uninstall is checked for a `RECORD` (raising `NotSupportedError` otherwise),
+    # before anything is changed. returns the `name==version` of what was installed and
+    # of what was removed.
+    cache = WheelCache() if cache is None else cache
+    wanted = lock.select(groups)
+    installed = env.installed()
+
+    def same(name):
+        try:
+            return Version.parse(installed[name]) == Version.parse(wanted[name])
+        except (KeyError, AssertionError):
+            return False
+
+    to_install = sorted(name for name in wanted if not same(name))
+    # `keep` spares what the lock leaves out, not what it pins to another version.
+    to_remove = sorted(
+        name for name in installed
+        if name in wanted and not same(name) or name not in wanted and name not in keep)
+    wheels = cache.find_requirements(f'{name}=={wanted[name]}' for name in to_install)
+    legacy = [name for name in to_remove if not _has_record(env, name)]
+    if legacy:
+        raise NotSupportedError(
+            f'cannot uninstall {", ".join(legacy)} from {env.path}: not installed with '
+            f'a RECORD (e.g. installed as .egg-info)')
+
+    for name in to_remove:
+        uninstall(env, name)
+    cache.install_many(env, wheels)
+    return (
+        [f'{name}=={wanted[name]}' for name in to_install],
+        [f'{name}=={installed[name]}' for name in to_remove],
+    )
@@ -0,0 +1,51 @@
+from concurrent import futures
+import mmap
+import os
+
+from ..utils import names, rfc822
+
+FIELDS = ('Name', 'Version', 'Requires-Dist')
+
+def _read_headers(path):
+    # maps the file into memory and decodes only the headers, leaving out the body,
+    # which is often a long description.
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # the end of the headers, in files written with either line ending.
+                ends = [
+                    end for end in (mm.find(b'\n\n'), mm.find(b'\r\n\r\n'))
+                    if end != -1]
+                data = mm[:min(ends)] if ends else mm[:]
+    except (FileNotFoundError, ValueError):      # missing, or empty and can't be mapped
+        return {}
+    return rfc822.loads(data.decode('utf-8', errors='replace').replace('\r\n', '\n'))[0]
+
+def scan_metadata(site_packages, fields=FIELDS, max_workers=1):
+    # the given header fields from the `METADATA` of every distribution installed in
+    # `site_packages`, as a mapping from the names of the distributions (normalized) to
+    # mappings from the fields to their values. the files are read in the current thread
+    # by default, which is the fastest once they are in the page cache; otherwise (e.g.
+    # on network filesystems) a pool of `max_workers` threads can read them instead.
+    paths = {}
+    try:
+        with os.scandir(site_packages) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                parts = stem.split('-')
+                if ext == '.dist-info' and len(parts) >= 2:
+                    paths[names.normalize(parts[0])] = \
+                        os.path.join(entry.path, 'METADATA')
+    except FileNotFoundError:
+        return {}
+
+    if max_workers == 1 or len(paths) < 2:
+        headers = map(_read_headers, paths.values())
+    else:
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            headers = list(executor.map(_read_headers, paths.values()))
+
+    return {
+        name: {field: h[field] for field in fields if field in h}
+        for name, h in zip(paths, headers)
+    }
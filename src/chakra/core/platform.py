@@ -2,12 +2,32 @@ import enum
 import functools
 import os
 import pathlib
+import platform
 import sys
 
 from .command import Command
 from ..errors import NotSupportedError
 from ..utils import Version
 
+def _uname(flag):
+    # fallback for when the information can't be found from within the interpreter.
+    return Command(['uname', flag]).run().stdout
+
+def _find_os():
+    if os.name == 'posix':
+        try:
+            return os.uname().sysname.lower()    # same as `uname -s`, without the fork
+        except (AttributeError, OSError):
+            return _uname('-s').lower()
+    return os.name
+
+def _find_arch(opsys):
+    if opsys == OpSystem.WINDOWS:
+        return os.environ['PROCESSOR_ARCHITECTURE'].lower()
+    # `platform.machine()` is `os.uname().machine` on POSIX systems, i.e. `uname -m`; it
+    # comes back empty if that can't be determined.
+    return platform.machine() or _uname('-m')
+
 class OpSystem(enum.Enum):
     WINDOWS = 'nt'
     LINUX = 'linux'
@@ -17,10 +37,7 @@ class OpSystem(enum.Enum):
     @functools.cache
     def find(cls):
         # plat_os = platform OS, cand_os = candidate OS
-        if os.name == 'posix':
-            plat_os = Command(['uname', '-s']).run().stdout.lower()
-        else:
-            plat_os = os.name
+        plat_os = _find_os()
         for cand_os in cls:
             if plat_os == cand_os.value:
                 return cand_os
@@ -35,10 +52,7 @@ class Arch(enum.Enum):
     @functools.cache
     def find(cls, opsys):
         # plat_ar = platform arch., cand_ar = candidate arch.
-        if opsys == OpSystem.WINDOWS:
-            plat_ar = os.environ['PROCESSOR_ARCHITECTURE'].lower()
-        else:
-            plat_ar = Command(['uname', '-m']).run().stdout
+        plat_ar = _find_arch(opsys)
         for cand_ar in cls:
             if plat_ar in cand_ar.value:
                 return cand_ar
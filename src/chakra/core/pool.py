@@ -0,0 +1,113 @@
+import collections
+from concurrent import futures
+import contextlib
+import itertools
+import pathlib
+import shutil
+import threading
+
+from .environment import Environment
+
+class EnvironmentPool(object):
+    # keeps `size` environments created ahead of time in the background, which are
+    # handed out by `acquire()`. an environment given back by `release()` is put back into
+    # the pool if nothing was installed into (or removed from) it, and removed otherwise.
+    #
+    # an environment that has been activated is never put back, since activation changes
+    # the state of the current interpreter rather than that of the environment.
+
+    def __init__(self, root, size=2, python='python', templates=None, max_workers=None):
+        if size < 1:
+            raise ValueError(f'pool size must be at least 1, not {size}')
+        self.root = pathlib.Path(root)
+        self.size = size
+        self.python = python
+        self.templates = templates
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers or size)
+        self._ready = collections.deque()      # futures of (environment, snapshot)
+        self._snapshots = {}                   # path of a handed out env. -> snapshot
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._fill()
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}({self.root!r}, size={self.size}, '
+            f'python={self.python!r}, templates={self.templates!r})'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def _create(self):
+        with self._lock:
+            path = self.root / f'env{next(self._counter)}'
+        env = Environment(path, python=self.python)
+        env.create(templates=self.templates)
+        if not env.python_executable.exists():
+            shutil.rmtree(path, ignore_errors=True)
+            raise RuntimeError(f'could not create environment {path}')
+        # the distributions in a fresh environment, to tell whether it is modified later.
+        return env, dict(env.installed())
+
+    def _fill(self):
+        while len(self._ready) < self.size:
+            self._ready.append(self._executor.submit(self._create))
+
+    def acquire(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('pool is closed')
+            future = self._ready.popleft() if self._ready else \
+                self._executor.submit(self._create)
+            self._fill()
+        env, snapshot = future.result()
+        with self._lock:
+            self._snapshots[env.path] = snapshot
+        return env
+
+    def release(self, env, recycle=True):
+        with self._lock:
+            snapshot = self._snapshots.pop(env.path, None)
+            if snapshot is None:
+                raise ValueError(f'{env.path} is not handed out by this pool')
+            if recycle and not self._closed and not env.is_activated and \
+                    env.installed() == snapshot:
+                future = futures.Future()
+                future.set_result((env, snapshot))
+                self._ready.appendleft(future)
+                # a recycled environment takes the place of one yet to be created.
+                if len(self._ready) > self.size and self._ready[-1].cancel():
+                    self._ready.pop()
+            elif self._closed:
+                shutil.rmtree(env.path, ignore_errors=True)
+            else:
+                self._executor.submit(shutil.rmtree, env.path, ignore_errors=True)
+
+    @contextlib.contextmanager
+    def environment(self, recycle=True):
+        env = self.acquire()
+        try:
+            yield env
+        finally:
+            self.release(env, recycle=recycle)
+
+    def close(self):
+        # removes the environments that are ready; those that are handed out are removed
+        # as and when they are released.
+        with self._lock:
+            self._closed = True
+            ready, self._ready = list(self._ready), collections.deque()
+        for future in ready:
+            future.cancel()
+        for future in ready:
+            if not future.cancelled() and future.exception() is None:
+                env, snapshot = future.result()
+                shutil.rmtree(env.path, ignore_errors=True)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,417 @@
+import collections
+import hashlib
+import io
+import itertools
+import os
+import pickle
+import platform
+import re
+import sys
+import zipfile
+
+from ..errors import ResolutionError
+from ..utils import cache_dir, names, rfc822
+from ..utils.requirement import Requirement, default_environment
+from ..utils.specifier import SpecifierSet
+from ..utils.version import Version
+
+# `{name}-{version}(-{build})?-{python}-{abi}-{platform}.whl`, as per PEP 427.
+_WHEEL_NAME = re.compile(
+    r'^(?P<name>[^-]+)-(?P<version>[^-]+)(-[^-]+)?'
+    r'-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<platform>[^-]+)\.whl$')
+
+# extras named in a marker, for metadata which doesn't list them in `Provides-Extra`.
+_EXTRA = re.compile(r'''extra\s*==\s*['"]([^'"]+)['"]''')
+
+# part of what the metadata cache is checked against, so that caches written in a
+# different format (by another version of chakra) are not used.
+_FORMAT = 1
+
+def _platform_compatible(tag):
+    if tag == 'any':
+        return True
+    machine = platform.machine().lower()
+    if sys.platform.startswith('linux'):
+        return tag.startswith(('linux', 'manylinux', 'musllinux')) and \
+            tag.endswith(machine)
+    elif sys.platform == 'darwin':
+        return tag.startswith('macosx') and (tag.endswith(machine) or 'universal' in tag)
+    elif sys.platform == 'win32':
+        return tag == {'amd64': 'win_amd64', 'arm64': 'win_arm64'}.get(machine, 'win32')
+    return False
+
+def _compatible(match_):
+    # whether a wheel can be installed for the running interpreter, by its tags. this is
+    # a simplification of the tags of PEP 425, which suffices for the usual pure Python,
+    # CPython and stable ABI wheels.
+    minor = sys.version_info[1]
+    pythons = match_['python'].split('.')
+    abis = match_['abi'].split('.')
+    cpython = [int(t[3:]) for t in pythons if re.fullmatch(r'cp3\d+', t)]
+    return (
+        any(t in ('py3', f'py3{minor}') for t in pythons) and 'none' in abis
+        or minor in cpython and (f'cp3{minor}' in abis or 'none' in abis)
+        or 'abi3' in abis and any(m <= minor for m in cpython)
+    ) and any(_platform_compatible(t) for t in match_['platform'].split('.'))
+
+def _read_metadata(path):
+    # the headers of the `METADATA` of a wheel that the resolver needs.
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            parts = name.split('/')
+            if len(parts) == 2 and parts[0].endswith('.dist-info') and \
+                    parts[1] == 'METADATA':
+                with io.TextIOWrapper(zf.open(name), encoding='utf-8') as fp:
+                    headers = rfc822.load_headers(fp)
+                break
+        else:
+            headers = {}
+    return (
+        headers.get('Requires-Python', [None])[0], headers.get('Requires-Dist', []),
+        headers.get('Provides-Extra', []))
+
+class FindLinks(object):
+    # a directory of wheels as a source of candidates for the resolver, like the
+    # `--find-links` option of pip. the metadata that the resolver needs is read from
+    # each wheel once, and kept on disk (unless `cache` is false) until the wheel is
+    # modified; the requirements of each candidate are parsed once and kept in memory.
+
+    def __init__(self, directory, environment=None, cache=True):
+        # `environment` overrides values of the marker variables (refer
+        # `default_environment()`), which also decide on `Requires-Python`.
+        self.directory = os.path.abspath(directory)
+        self.environment = dict(default_environment(), **(environment or {}))
+        self.cache = cache
+        self._wheels = collections.defaultdict(dict)     # name -> version -> path
+        self._metadata = {}                              # filename -> (ident, metadata)
+        self._dependencies = {}                          # (name, version) -> deps
+        self._candidates = {}                            # name -> versions
+        self._load()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.directory!r}, cache={self.cache})'
+
+    @property
+    def _cache_entry(self):
+        return cache_dir(
+            'resolver', hashlib.sha256(self.directory.encode()).hexdigest()[:32])
+
+    def _load(self):
+        cached = {}
+        if self.cache:
+            try:
+                with open(self._cache_entry, 'rb') as f:
+                    format_, cached = pickle.load(f)
+                if format_ != _FORMAT:
+                    cached = {}
+            except Exception:            # missing, or left corrupt by an earlier crash
+                cached = {}
+
+        modified = False
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                match_ = _WHEEL_NAME.match(entry.name)
+                if match_ is None or not _compatible(match_):
+                    continue
+                try:
+                    version = Version.parse(match_['version'])
+                except AssertionError:
+                    continue
+                stat = entry.stat()
+                ident = (stat.st_mtime_ns, stat.st_size)
+                if entry.name in cached and cached[entry.name][0] == ident:
+                    self._metadata[entry.name] = cached[entry.name]
+                else:
+                    self._metadata[entry.name] = (ident, _read_metadata(entry.path))
+                    modified = True
+                self._wheels[names.normalize(match_['name'])].setdefault(
+                    version, entry.path)
+
+        if self.cache and (modified or len(cached) != len(self._metadata)):
+            try:
+                entry = self._cache_entry
+                entry.parent.mkdir(parents=True, exist_ok=True)
+                tmp = entry.with_name(f'.{entry.name}.{os.getpid()}')
+                with open(tmp, 'wb') as f:
+                    pickle.dump(
+                        (_FORMAT, self._metadata), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, entry)
+            except OSError:              # not being able to cache is not an error
+                pass
+
+    def wheel(self, name, version):
+        return self._wheels[names.normalize(name)][version]
+
+    def candidates(self, name):
+        # the versions of a distribution that can be installed, from the highest.
+        name = names.normalize(name)
+        if name not in self._candidates:
+            python = self.environment['python_full_version']
+            versions = []
+            for version, path in self._wheels.get(name, {}).items():
+                requires_python = self._metadata[os.path.basename(path)][1][0]
+                try:
+                    if requires_python is not None and \
+                            not SpecifierSet.parse(requires_python).contains(python):
+                        continue
+                except AssertionError:   # unparseable, hence not to be relied upon
+                    continue
+                versions.append(version)
+            self._candidates[name] = sorted(versions, reverse=True)
+        return self._candidates[name]
+
+    def dependencies(self, name, version):
+        # the requirements of a candidate that apply in the environment, as a list of
+        # those that always apply, and a mapping from extras to those that apply only
+        # with an extra.
+        key = (names.normalize(name), version)
+        if key not in self._dependencies:
+            path = self.wheel(name, version)
+            _, requires_dist, provides_extra = \
+                self._metadata[os.path.basename(path)][1]
+            base, extras = [], collections.defaultdict(list)
+            for reqstr in requires_dist:
+                req = Requirement.parse(reqstr)
+                if req.marker is None:
+                    base.append(req)
+                    continue
+                env = self.environment
+                if req.marker.evaluate(dict(env, extra='')):
+                    base.append(req)
+                    continue
+                for extra in set(provides_extra) | set(_EXTRA.findall(str(req.marker))):
+                    extra = names.normalize(extra)
+                    if req.marker.evaluate(dict(env, extra=extra)):
+                        extras[extra].append(req)
+            self._dependencies[key] = (base, dict(extras))
+        return self._dependencies[key]
+
+class _Constraint(object):
+    # a requirement on a distribution, and the names of the pinned distributions which
+    # it is due to (none for the requirements being resolved).
+
+    __slots__ = ('requirement', 'reasons')
+
+    def __init__(self, requirement, reasons):
+        self.requirement = requirement
+        self.reasons = reasons
+
+class _Conflict(Exception):
+
+    def __init__(self, names):
+        self.names = frozenset(names)
+
+class _Frame(object):
+    # a distribution being pinned by the search: the versions left to try, the names of
+    # the pins to blame should none of them work, and the length of the undo log from
+    # before the version being tried was pinned.
+
+    __slots__ = ('name', 'viable', 'versions', 'conflict', 'length')
+
+    def __init__(self, name, viable, conflict):
+        self.name = name
+        self.viable = viable
+        self.versions = iter(viable)
+        self.conflict = conflict
+        self.length = None
+
+class Resolver(object):
+    # finds a version for each distribution needed by a set of requirements, such that
+    # all of the requirements on each distribution are satisfied, preferring the highest
+    # versions.
+    #
+    # this is a backtracking search which pins one distribution at a time, picking the
+    # one with the fewest candidates left. when a distribution can't be pinned, the
+    # search backjumps to the most recent pin among those responsible (the pins whose
+    # requirements ruled out its candidates, or brought it in), and remembers that set
+    # of pins as a "nogood", so that no other branch of the search tries the same
+    # combination again.
+
+    def __init__(self, source):
+        self.source = source
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.source!r})'
+
+    def resolve(self, requirements):
+        # returns a mapping from the names (normalized) of the distributions needed to
+        # their versions. raises `ResolutionError` if there is no such set of versions.
+        self._pins = {}
+        self._constraints = collections.defaultdict(list)
+        self._expanded = {}                                # name -> extras followed
+        self._undo = []
+        self._generation = collections.defaultdict(int)
+        self._counter = itertools.count(1)
+        self._viable = {}                                  # name -> (generation, ...)
+        self._nogoods = collections.defaultdict(list)      # (name, version) -> nogoods
+        self._failed = None
+
+        environment = self.source.environment
+        for requirement in requirements:
+            if isinstance(requirement, str):
+                requirement = Requirement.parse(requirement)
+            if requirement.applies(environment):
+                self._constrain(_Constraint(requirement, frozenset()))
+        try:
+            self._search()
+        except _Conflict:
+            raise ResolutionError(self._failed) from None
+        return dict(self._pins)
+
+    def _touch(self, name):
+        self._generation[name] = next(self._counter)
+
+    def _constrain(self, constraint):
+        # adds a constraint, following the dependencies of any extras it brings in for an
+        # already pinned distribution. raises `_Conflict` if the pinned version doesn't
+        # satisfy the constraint.
+        name = constraint.requirement.key
+        self._constraints[name].append(constraint)
+        self._undo.append(('constraint', name))
+        self._touch(name)
+        if name not in self._pins:
+            return
+        version = self._pins[name]
+        if not self._allows(constraint, version):
+            raise _Conflict(constraint.reasons | {name})
+        extras = set(constraint.requirement.extras) - self._expanded[name]
+        if extras:
+            self._expand(name, extras, constraint.reasons)
+
+    def _expand(self, name, extras, reasons):
+        self._expanded[name] = self._expanded[name] | extras
+        self._undo.append(('expanded', name, extras))
+        base, by_extra = self.source.dependencies(name, self._pins[name])
+        reasons = reasons | {name}
+        for extra in extras:
+            for requirement in (base if extra == '' else by_extra.get(extra, [])):
+                self._constrain(_Constraint(requirement, reasons))
+
+    def _rollback(self, length):
+        while len(self._undo) > length:
+            action = self._undo.pop()
+            if action[0] == 'constraint':
+                self._constraints[action[1]].pop()
+                self._touch(action[1])
+            elif action[0] == 'expanded':
+                self._expanded[action[1]] = self._expanded[action[1]] - action[2]
+            else:
+                del self._pins[action[1]]
+                del self._expanded[action[1]]
+
+    def _allows(self, constraint, version):
+        specifier = constraint.requirement.specifier
+        return specifier.contains(version, prereleases=True) and (
+            not version.is_prerelease or specifier.prereleases
+            or not self._has_finals(constraint.requirement.key))
+
+    def _has_finals(self, name):
+        return any(not v.is_prerelease for v in self.source.candidates(name))
+
+    def _options(self, name):
+        # the candidates of a distribution that satisfy its constraints, and the reasons
+        # for ruling out the rest.
+        cached = self._viable.get(name)
+        if cached is not None and cached[0] == self._generation[name]:
+            return cached[1], cached[2]
+        viable, reasons = [], set()
+        constraints = self._constraints[name]
+        for version in self.source.candidates(name):
+            for constraint in constraints:
+                if not self._allows(constraint, version):
+                    reasons |= constraint.reasons
+                    break
+            else:
+                viable.append(version)
+        self._viable[name] = (self._generation[name], viable, reasons)
+        return viable, reasons
+
+    def _pin(self, name, version):
+        # pins a distribution, raising `_Conflict` if the pin is part of a nogood or its
+        # dependencies conflict with other pins.
+        for nogood in self._nogoods[(name, version)]:
+            if all(self._pins.get(n) == v for n, v in nogood if n != name):
+                raise _Conflict(n for n, v in nogood)
+        self._pins[name] = version
+        self._expanded[name] = set()
+        self._undo.append(('pin', name))
+        # the dependencies of an extra are due to the pins that asked for the extra.
+        by_extra = {'': frozenset()}
+        for constraint in self._constraints[name]:
+            for extra in constraint.requirement.extras:
+                by_extra[extra] = by_extra.get(extra, frozenset()) | constraint.reasons
+        for extra, reasons in by_extra.items():
+            self._expand(name, {extra}, reasons)
+
+    def _frame(self):
+        # a frame for the next distribution to pin, the one with the fewest candidates
+        # left; `None` once every distribution needed is pinned.
+        pending = [
+            name for name, constraints in self._constraints.items()
+            if constraints and name not in self._pins
+        ]
+        if not pending:
+            return None
+        name = min(pending, key=lambda n: (len(self._options(n)[0]), n))
+        viable, conflict = self._options(name)
+        conflict = set(conflict)
+        for constraint in self._constraints[name]:
+            conflict |= constraint.reasons           # why it's needed at all
+        return _Frame(name, viable, conflict)
+
+    def _fail(self, frame):
+        # records the pins to blame for running out of versions of a distribution as a
+        # nogood, and returns the conflict to hand down to them.
+        if not frame.viable:
+            # the last distribution found with no candidates left, as the likeliest
+            # culprit to report should the resolution fail.
+            constraints = ', '.join(
+                str(c.requirement) for c in self._constraints[frame.name]) or frame.name
+            self._failed = f'no version of {frame.name} satisfies all of: {constraints}'
+        elif self._failed is None:
+            self._failed = \
+                f'no versions satisfying the requirements on {frame.name} found'
+        nogood = frozenset((n, self._pins[n]) for n in frame.conflict)
+        for pin in nogood:
+            self._nogoods[pin].append(nogood)
+        return _Conflict(frame.conflict)
+
+    def _search(self):
+        # a loop over a stack of frames rather than a recursion, since there is a frame
+        # for every distribution pinned.
+        stack = []
+        conflict = None
+        while True:
+            if conflict is None:
+                frame = self._frame()
+                if frame is None:
+                    return
+                stack.append(frame)
+            else:
+                # hand the conflict down the stack, backjumping over the frames whose
+                # pins aren't to blame.
+                if not stack:
+                    raise conflict
+                frame = stack[-1]
+                self._rollback(frame.length)
+                if frame.name not in conflict.names:
+                    stack.pop()
+                    continue
+                frame.conflict |= conflict.names - {frame.name}
+                conflict = None
+
+            for version in frame.versions:
+                frame.length = len(self._undo)
+                try:
+                    self._pin(frame.name, version)
+                except _Conflict as exc:
+                    conflict = exc
+                break
+            else:
+                stack.pop()
+                conflict = self._fail(frame)
+
+def resolve(requirements, find_links, environment=None, cache=True):
+    # resolves requirements against a directory of wheels; refer `Resolver.resolve()`.
+    return Resolver(FindLinks(find_links, environment=environment, cache=cache)) \
+        .resolve(requirements)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+from ..utils import cache_dir
+
+def _files(paths):
+    # the files among (and under) the given paths, in a stable order.
+    for path in sorted(set(os.fspath(path) for path in paths)):
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    yield os.path.join(dirpath, filename)
+        else:
+            yield path
+
+def _digest(path):
+    hash_ = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(2 ** 16), b''):
+                hash_.update(chunk)
+    except FileNotFoundError:
+        return b'missing'
+    return hash_.digest()
+
+class ResultCache(object):
+    # results of commands (or hooks), stored on disk as `<root>/<key>.json`. the key
+    # covers the command's tokens and environment variables, the current directory and the
+    # contents of the input files declared for the command (and the script of a hook).
+    # when none of these changed, the stored result is returned rather than running the
+    # command again.
+    #
+    # only results of successful runs are stored. the least recently used results are
+    # evicted once the cache grows beyond `max_size` bytes.
+
+    def __init__(self, root=None, max_size=64 * 1024 ** 2):
+        self.root = pathlib.Path(root) if root is not None else cache_dir('results')
+        self.max_size = max_size
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.root!r}, max_size={self.max_size})'
+
+    def key(self, command, inputs=()):
+        inputs = list(inputs)
+        script = getattr(command, 'script', None)
+        if script is not None:
+            inputs.append(script)
+
+        hash_ = hashlib.sha256()
+        hash_.update(json.dumps(
+            [command.tokens, sorted(command.env_vars.items()), os.getcwd()]).encode())
+        for path in _files(inputs):
+            hash_.update(path.encode())
+            hash_.update(_digest(path))
+        return hash_.hexdigest()
+
+    def run(self, command, inputs=(), capture_output=True):
+        # without `capture_output`, the output is still captured (in order to be stored)
+        # and is written out once the command is over.
+        entry = self.root / f'{self.key(command, inputs)}.json'
+        try:
+            data = json.loads(entry.read_text())
+        except (FileNotFoundError, ValueError):
+            result = command.run(capture_output=True)
+            if result.returncode == 0:
+                self._store(entry, result)
+        else:
+            os.utime(entry)              # mark as recently used
+            result = subprocess.CompletedProcess(
+                args=command.tokens, returncode=data['returncode'],
+                stdout=data['stdout'], stderr=data['stderr'])
+
+        if not capture_output:
+            if result.stdout:
+                print(result.stdout, file=sys.stdout)
+            if result.stderr:
+                print(result.stderr, file=sys.stderr)
+            result.stdout, result.stderr = None, None
+        return result
+
+    def _store(self, entry, result):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f'.{entry.name}.{os.getpid()}')
+        tmp.write_text(json.dumps({
+            'args': result.args,
+            'returncode': result.returncode,
+            'stdout': result.stdout,
+            'stderr': result.stderr,
+        }))
+        os.replace(tmp, entry)
+        self.evict()
+
+    def _stats(self):
+        # (key, size, last used) of every stored result, most recently used first.
+        stats = []
+        try:
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    key, ext = os.path.splitext(entry.name)
+                    if ext == '.json' and not key.startswith('.'):
+                        stat = entry.stat()
+                        stats.append((key, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return sorted(stats, key=lambda s: s[2], reverse=True)
+
+    def entries(self):
+        # (key, args, size, last used) of every stored result, most recently used first.
+        entries = []
+        for key, size, used in self._stats():
+            try:
+                args = json.loads((self.root / f'{key}.json').read_text())['args']
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+            entries.append((key, args, size, used))
+        return entries
+
+    def size(self):
+        return sum(size for key, size, used in self._stats())
+
+    def evict(self, max_size=None):
+        max_size = self.max_size if max_size is None else max_size
+        removed, total = [], 0
+        for key, size, used in self._stats():
+            total += size
+            if total > max_size:
+                (self.root / f'{key}.json').unlink(missing_ok=True)
+                removed.append(key)
+                total -= size
+        return removed
+
+    def clear(self):
+        for key, size, used in self._stats():
+            (self.root / f'{key}.json').unlink(missing_ok=True)
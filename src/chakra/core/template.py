@@ -0,0 +1,155 @@
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+
+from .command import Command
+from ..utils import cache_dir
+
+# the prompt that templates are created with; it is replaced by the prompt of each
+# environment cloned from a template.
+_PROMPT = 'chakra-template-prompt'
+
+@functools.cache
+def _python_version(python, mtime):
+    # `mtime` is only a part of the arguments so that an upgrade of the interpreter in
+    # place doesn't return a stale version.
+    return Command([str(python), '-c', 'import sys; print(sys.version)']).run().stdout
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:                  # e.g. across filesystems
+        shutil.copy2(src, dst)
+
+def _patch(path, replacements):
+    data = path.read_bytes()
+    patched = data
+    for old, new in replacements:
+        patched = patched.replace(old, new)
+    if patched != data:
+        # write to a new file instead of into the existing one, which may be a hard link
+        # into the template.
+        tmp = path.with_name(f'.{path.name}.tmp')
+        tmp.write_bytes(patched)
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+
+def _size(path):
+    size = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            size += os.lstat(os.path.join(dirpath, filename)).st_size
+    return size
+
+class TemplateCache(object):
+    # a cache of environments created by `virtualenv`, which are copied (or hard linked)
+    # to create new environments rather than running `virtualenv` each time.
+    #
+    # every template is a directory `<root>/<key>`, holding the environment itself in
+    # `env` and the path it was created at in `origin`. the modification time of `origin`
+    # is the time at which the template was created, and that of the directory is the
+    # time it was last used.
+
+    def __init__(self, root=None, max_age=7 * 24 * 60 * 60, max_size=1024 ** 3,
+                 hardlink=True):
+        self.root = pathlib.Path(root) if root is not None else cache_dir('templates')
+        self.max_age = max_age          # in seconds
+        self.max_size = max_size        # in bytes
+        self.hardlink = hardlink
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}({self.root!r}, max_age={self.max_age}, '
+            f'max_size={self.max_size}, hardlink={self.hardlink})'
+        )
+
+    def key(self, env):
+        python = env.python
+        version = _python_version(python, python.stat().st_mtime_ns)
+        ident = json.dumps([str(python), version, env.options])
+        return hashlib.sha256(ident.encode()).hexdigest()[:32]
+
+    def _expired(self, path):
+        return time.time() - (path / 'origin').stat().st_mtime > self.max_age
+
+    def template(self, env, **kwargs):
+        key = self.key(env)
+        path = self.root / key
+        if (path / 'origin').exists() and self.max_age is not None and \
+                self._expired(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+        if not (path / 'origin').exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = pathlib.Path(tempfile.mkdtemp(prefix=f'.{key}-', dir=self.root))
+            result = env._virtualenv(tmp / 'env', _PROMPT, **kwargs)
+            if result.returncode != 0:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise RuntimeError(f'could not create a template for {env.path}')
+            (tmp / 'origin').write_text(str(tmp / 'env'))
+            try:
+                os.rename(tmp, path)
+            except OSError:              # another process created the template first
+                shutil.rmtree(tmp, ignore_errors=True)
+            self.evict(keep=key)
+
+        return path
+
+    def clone(self, env, **kwargs):
+        template = self.template(env, **kwargs)
+        origin = (template / 'origin').read_text()
+        shutil.copytree(
+            template / 'env', env.path, symlinks=True, dirs_exist_ok=True,
+            copy_function=_link_or_copy if self.hardlink else shutil.copy2)
+
+        # the path and the prompt of the template show up in `pyvenv.cfg`, the activation
+        # script and the shebangs of the scripts installed in the environment.
+        replacements = [
+            (origin.encode(), str(env.path).encode()),
+            (_PROMPT.encode(), env.path.name.encode()),
+        ]
+        _patch(env.pyvenv_cfg, replacements)
+        for path in env.activate_script.parent.iterdir():
+            if path.is_file() and not path.is_symlink():
+                _patch(path, replacements)
+
+        os.utime(template)               # mark the template as used
+
+    def evict(self, max_age=None, max_size=None, keep=None):
+        # removes templates older than `max_age`, and then the least recently used
+        # templates until the cache fits within `max_size`. returns the keys of the
+        # removed templates.
+        max_age = self.max_age if max_age is None else max_age
+        max_size = self.max_size if max_size is None else max_size
+        if not self.root.exists():
+            return []
+
+        removed, templates = [], []
+        now = time.time()
+        for path in self.root.iterdir():
+            if not (path / 'origin').exists():     # not a template (yet)
+                continue
+            if path.name != keep and max_age is not None and \
+                    now - (path / 'origin').stat().st_mtime > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+            else:
+                templates.append((path.stat().st_mtime, _size(path), path))
+
+        total = 0
+        for used, size, path in sorted(templates, key=lambda t: t[0], reverse=True):
+            total += size
+            if path.name != keep and max_size is not None and total > max_size:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+                total -= size
+
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
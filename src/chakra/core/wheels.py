@@ -0,0 +1,192 @@
+from concurrent import futures
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import threading
+
+from .installer import (
+    _console_scripts, _destination, _dist_info, _extract, _finish, _parse_record,
+    _record_hash, _script, _unsigned)
+from ..utils import cache_dir, names
+from ..utils.version import Version
+
+# the size of the chunks in which wheels are read for hashing.
+_CHUNK = 2 ** 20
+
+# `{name}-{version}(-{build})?-{python}-{abi}-{platform}.whl`, as per PEP 427.
+_WHEEL_NAME = re.compile(
+    r'^(?P<name>[^-]+)-(?P<version>[^-]+)(-[^-]+)?-[^-]+-[^-]+-[^-]+\.whl$')
+
+# a requirement pinned to a version (`name==version`) or not pinned at all (`name`).
+_PINNED = re.compile(r'^\s*(?P<name>[A-Za-z0-9._-]+)\s*(==\s*(?P<version>[^\s;]+))?\s*$')
+
+def _sha256(path):
+    hash_ = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            hash_.update(chunk)
+    return hash_.hexdigest()
+
+def _link(src, dst):
+    # hardlinks a file, falling back to copying it when the filesystem (or a different
+    # device) doesn't allow the link. returns whether it was linked.
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        shutil.copy2(src, dst)
+        return False
+
+class WheelCache(object):
+    # a local store of wheels, addressed by the SHA-256 of their contents: a wheel is
+    # kept at `<root>/archives/<digest>/<filename>`, and is unpacked (once) into
+    # `<root>/unpacked/<digest>`. wheels are installed into an environment from their
+    # unpacked trees by hardlinking the files where possible, hence without pip, and
+    # without extracting the same wheel again for every environment.
+    #
+    # installed files are hardlinks to the files in the cache, so they must not be
+    # modified in place.
+
+    def __init__(self, root=None, max_workers=None):
+        self.root = pathlib.Path(root) if root is not None else cache_dir('wheels')
+        self.max_workers = max_workers
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.root!r}, max_workers={self.max_workers})'
+
+    def add(self, wheel):
+        # adds a wheel to the cache (if it isn't there already), returning its path in
+        # the cache.
+        wheel = pathlib.Path(wheel)
+        if not _WHEEL_NAME.match(wheel.name):
+            raise ValueError(f'invalid wheel filename: {wheel.name}')
+        entry = self.root / 'archives' / _sha256(wheel)
+        path = entry / wheel.name
+        if path.exists():
+            return path
+        entry.mkdir(parents=True, exist_ok=True)
+        tmp = entry / f'.{wheel.name}.{os.getpid()}'
+        shutil.copyfile(wheel, tmp)
+        os.replace(tmp, path)
+        return path
+
+    def wheels(self):
+        # the wheels in the cache, as `(name, version, path)` with the names normalized.
+        try:
+            entries = list(os.scandir(self.root / 'archives'))
+        except FileNotFoundError:
+            return []
+        result = []
+        for entry in entries:
+            for filename in os.listdir(entry.path):
+                match = _WHEEL_NAME.match(filename)
+                if match is not None:
+                    result.append((
+                        names.normalize(match['name']), Version.parse(match['version']),
+                        pathlib.Path(entry.path) / filename))
+        return result
+
+    def find(self, name, version=None):
+        # the cached wheel of a distribution with a given version, or with its highest
+        # version if `version` is `None`; `None` if there is no such wheel.
+        name = names.normalize(name)
+        version = Version.parse(str(version)) if version is not None else None
+        candidates = [
+            (ver, path) for n, ver, path in self.wheels()
+            if n == name and (version is None or ver == version)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda candidate: candidate[0])[1]
+
+    def unpacked(self, wheel):
+        # the directory into which a cached wheel is unpacked, unpacking it first if
+        # needed. wheels are unpacked (and verified against their `RECORD`) into a
+        # temporary directory which is then renamed, so that an interrupted unpacking
+        # leaves nothing behind.
+        wheel = pathlib.Path(wheel)
+        target = self.root / 'unpacked' / wheel.parent.name
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f'.{target.name}.{os.getpid()}.{threading.get_ident()}')
+        try:
+            _extract(wheel, lambda name: tmp / name, max_workers=self.max_workers)
+            try:
+                os.rename(tmp, target)
+            except OSError:                  # unpacked by someone else in the meantime
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return target
+
+    def install(self, env, wheel):
+        # installs a cached wheel into an environment, returning the name of its
+        # `.dist-info` directory.
+        unpacked = self.unpacked(wheel)
+        dist_info = _dist_info(os.listdir(unpacked))
+        with open(unpacked / dist_info / 'RECORD', newline='') as f:
+            record = _parse_record(f.read())
+
+        records = []
+        for dirpath, dirnames, filenames in os.walk(unpacked):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                src = pathlib.Path(dirpath) / filename
+                name = src.relative_to(unpacked).as_posix()
+                if name in _unsigned(dist_info) or name == f'{dist_info}/INSTALLER':
+                    continue
+                dst, is_script = _destination(name, env)
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                if is_script:
+                    content = _script(src.read_bytes(), env)
+                    dst.write_bytes(content)
+                    os.chmod(dst, 0o755)
+                    hash_, size = _record_hash(content), str(len(content))
+                else:
+                    _link(src, dst)
+                    hash_, size = record.get(name, ('', ''))
+                records.append([os.path.relpath(dst, env.site_packages), hash_, size])
+
+        for dst in _console_scripts(unpacked / dist_info / 'entry_points.txt', env):
+            content = dst.read_bytes()
+            records.append([
+                os.path.relpath(dst, env.site_packages), _record_hash(content),
+                str(len(content))])
+        _finish(env, dist_info, records)
+        return dist_info
+
+    def find_requirements(self, requirements):
+        # the cached wheels for pinned requirements (`name==version`, or just `name` for
+        # the highest cached version); raises `LookupError` if one of them is not cached.
+        wheels = []
+        for requirement in requirements:
+            match = _PINNED.match(requirement)
+            if match is None:
+                raise ValueError(f'requirement is not pinned: {requirement!r}')
+            wheel = self.find(match['name'], match['version'])
+            if wheel is None:
+                raise LookupError(f'no cached wheel for {requirement!r}')
+            wheels.append(wheel)
+        return wheels
+
+    def install_many(self, env, wheels):
+        # installs cached wheels, unpacking them concurrently first.
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self.unpacked, wheels))
+        return [self.install(env, wheel) for wheel in wheels]
+
+    def install_requirements(self, env, requirements):
+        # installs pinned requirements from the cache, e.g. those in
+        # `[tool.chakra.dev-deps]`; nothing is installed if one of them is not cached.
+        return self.install_many(env, self.find_requirements(requirements))
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
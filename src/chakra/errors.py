@@ -3,3 +3,6 @@ class NotSupportedError(Exception):
 
 class ParseError(Exception):
     pass
+
+class ResolutionError(Exception):
+    pass
@@ -1,7 +1,33 @@
-# import the monkey-patched modules.
-from .tempfile_patch import tempfile
-from .tomllib_patch import tomllib
+import importlib
 
-from .decorators import parseerror
-from .dirtree import HDirectory, HFile
-from .version import Version
+# the names exported by the package, and the modules they come from. a module is imported
+# only once one of its names is first used; in particular, the monkey-patched modules
+# `tempfile` and `tomllib` are patched only once they are imported from here.
+_exports = {
+    'tempfile': '.tempfile_patch',
+    'tomllib': '.tomllib_patch',
+    'cache_dir': '.cache',
+    'parseerror': '.decorators',
+    'HDirectory': '.dirtree',
+    'HFile': '.dirtree',
+    'Version': '.version',
+    'VersionArray': '.version',
+    'Specifier': '.specifier',
+    'SpecifierSet': '.specifier',
+    'Marker': '.requirement',
+    'Requirement': '.requirement',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
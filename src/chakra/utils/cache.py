@@ -0,0 +1,20 @@
+import os
+import pathlib
+import sys
+
+__all__ = ['cache_dir']
+
+def cache_dir(*parts):
+    # the root can be overridden with `CHAKRA_CACHE_DIR`; otherwise the platform's usual
+    # location for caches is used.
+    root = os.environ.get('CHAKRA_CACHE_DIR')
+    if root is None:
+        if os.name == 'nt':
+            base = os.environ.get(
+                'LOCALAPPDATA', pathlib.Path.home() / 'AppData' / 'Local')
+        elif sys.platform == 'darwin':
+            base = pathlib.Path.home() / 'Library' / 'Caches'
+        else:
+            base = os.environ.get('XDG_CACHE_HOME', pathlib.Path.home() / '.cache')
+        root = pathlib.Path(base) / 'chakra'
+    return pathlib.Path(root).joinpath(*parts)
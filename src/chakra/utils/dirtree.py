@@ -1,8 +1,20 @@
+import os
 import pathlib
 
 def _path(p):
     return pathlib.Path(p)
 
+def _scan(path):
+    # the entries of a directory by name, listing the directory only once.
+    with os.scandir(path) as entries:
+        return {entry.name: entry for entry in entries}
+
+def _check(parent, missing):
+    if missing:
+        paths = ', '.join(str(path.relative_to(parent)) for path in missing)
+        raise RuntimeError(
+            f'could not load {len(missing)} entries from {parent}: {paths}')
+
 class HFile(object):
 
     def __init__(self, name):
@@ -22,12 +34,16 @@ class HFile(object):
 
     def load(self, parent=pathlib.Path.cwd()):
         parent = _path(parent)
-        for item in parent.iterdir():
-            if item.name == str(self.name):
-                self.parent = parent
-                break
-        else:
-            raise RuntimeError(f'could not load file from {parent}')
+        missing = []
+        self._load(parent, _scan(parent), missing)
+        _check(parent, missing)
+
+    def _load(self, parent, entries, missing):
+        # `entries` are those of `parent`; the path is added to `missing` if not found.
+        if str(self.name) not in entries:
+            missing.append(parent / self.name)
+            return
+        self.parent = parent
 
 class HDirectory(object):
 
@@ -64,12 +80,20 @@ class HDirectory(object):
             subdir.create(parent=self.path)
 
     def load(self, parent=pathlib.Path.cwd()):
+        # every directory of the tree is listed once, and all the entries missing from
+        # the tree are reported together.
         parent = _path(parent)
-        for item in parent.iterdir():
-            if item.name == str(self.name):
-                self.parent = parent
-                break
-        else:
-            raise RuntimeError(f'could not load directory from {parent}')
+        missing = []
+        self._load(parent, _scan(parent), missing)
+        _check(parent, missing)
+
+    def _load(self, parent, entries, missing):
+        # a missing directory is reported by itself, without its contents.
+        entry = entries.get(str(self.name))
+        if entry is None or not entry.is_dir():
+            missing.append(parent / self.name)
+            return
+        self.parent = parent
+        entries = _scan(self.path)
         for item in self._files + self._subdirs:
-            item.load(parent=self.path)
+            item._load(self.path, entries, missing)
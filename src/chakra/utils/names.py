@@ -0,0 +1,9 @@
+import re
+
+__all__ = ['normalize']
+
+_separators = re.compile(r'[-_.]+')
+
+def normalize(name):
+    # normalized form of a project name, as per PEP 503.
+    return _separators.sub('-', name).lower()
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import pickle
+
+from .cache import cache_dir
+from .decorators import parseerror
+from .specifier import SpecifierSet
+from .tomllib_patch import tomllib
+from ..errors import ParseError
+
+__all__ = ['load']
+
+# part of what a cached entry is checked against, so that entries written in a different
+# format (by another version of chakra) are not used.
+_FORMAT = 1
+
+def _is_strings(value):
+    return isinstance(value, list) and all(isinstance(s, str) for s in value)
+
+def _validate(config, path):
+    project = config.get('project', {})
+    chakra = config.get('tool', {}).get('chakra', {})
+
+    @parseerror(f'invalid [project] table in {path}')
+    def validate_project():
+        assert isinstance(project, dict)
+        if not project:
+            return
+        assert isinstance(project.get('name'), str)
+        assert isinstance(project.get('version'), str) or \
+            'version' in project.get('dynamic', [])
+        assert _is_strings(project.get('dependencies', []))
+        optional = project.get('optional-dependencies', {})
+        assert isinstance(optional, dict)
+        assert all(_is_strings(deps) for deps in optional.values())
+        if 'requires-python' in project:
+            assert isinstance(project['requires-python'], str)
+            SpecifierSet.parse(project['requires-python'])
+
+    @parseerror(f'invalid [tool.chakra] table in {path}')
+    def validate_chakra():
+        assert isinstance(chakra, dict)
+        for table in ('dev-deps', 'hook-deps'):
+            deps = chakra.get(table, {})
+            assert isinstance(deps, dict)
+            assert all(_is_strings(d) for d in deps.values())
+        level = chakra.get('build', {}).get('compression-level', 0)
+        assert isinstance(level, int) and 0 <= level <= 9
+
+    validate_project()
+    validate_chakra()
+
+def load(path='pyproject.toml', cache=True):
+    # the parsed and validated contents of a `pyproject.toml`. with `cache`, the result is
+    # kept on disk, and is returned as is while the file keeps its modification time and
+    # size, rather than parsing the file again.
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    ident = (_FORMAT, path, stat.st_mtime_ns, stat.st_size)
+    entry = cache_dir('pyproject', hashlib.sha256(path.encode()).hexdigest()[:32])
+
+    if cache:
+        try:
+            with open(entry, 'rb') as f:
+                cached_ident, config = pickle.load(f)
+        except Exception:                # missing, or left corrupt by an earlier crash
+            pass
+        else:
+            if cached_ident == ident:
+                return config
+
+    with open(path, 'rb') as f:
+        try:
+            config = tomllib.load(f)
+        except tomllib.TOMLDecodeError as exc:
+            raise ParseError(f'invalid TOML in {path}: {exc}')
+    _validate(config, path)
+
+    if cache:
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp = entry.with_name(f'.{entry.name}.{os.getpid()}')
+            with open(tmp, 'wb') as f:
+                pickle.dump((ident, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except OSError:                  # not being able to cache is not an error
+            pass
+    return config
@@ -0,0 +1,285 @@
+import functools
+import os
+import platform
+import re
+import sys
+
+from . import names
+from .specifier import SpecifierSet
+from .version import Version
+
+__all__ = ['Marker', 'Requirement', 'default_environment']
+
+def default_environment():
+    # the values of the marker variables of PEP 508 for the running interpreter.
+    return dict(_default_environment())
+
+@functools.lru_cache(maxsize=None)
+def _default_environment():
+    impl = sys.implementation
+    impl_version = '{0.major}.{0.minor}.{0.micro}'.format(impl.version)
+    if impl.version.releaselevel != 'final':
+        impl_version += impl.version.releaselevel[0] + str(impl.version.serial)
+    return {
+        'implementation_name': impl.name,
+        'implementation_version': impl_version,
+        'os_name': os.name,
+        'platform_machine': platform.machine(),
+        'platform_python_implementation': platform.python_implementation(),
+        'platform_release': platform.release(),
+        'platform_system': platform.system(),
+        'platform_version': platform.version(),
+        'python_full_version': platform.python_version(),
+        'python_version': '.'.join(platform.python_version_tuple()[:2]),
+        'sys_platform': sys.platform,
+    }
+
+# a marker is tokenized, then parsed into a tree of tuples by recursive descent:
+#
+#     or_expr  := and_expr ('or' and_expr)*
+#     and_expr := atom ('and' atom)*
+#     atom     := '(' or_expr ')' | value op value
+#     value    := variable | quoted string
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<paren>[()])
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>===|==|!=|<=|>=|~=|<|>|not\s+in\b|in\b)
+      | (?P<bool>and\b|or\b)
+      | (?P<variable>[a-z_][a-z0-9_.]*)
+    )''', re.VERBOSE)
+
+_VARIABLES = {
+    'implementation_name', 'implementation_version', 'os_name', 'platform_machine',
+    'platform_python_implementation', 'platform_release', 'platform_system',
+    'platform_version', 'python_full_version', 'python_version', 'sys_platform',
+    'extra',
+    # legacy names, as still found in the metadata of some distributions.
+    'os.name', 'sys.platform', 'platform.version', 'platform.machine',
+    'platform.python_implementation', 'python_implementation',
+}
+
+def _tokenize(markerstr):
+    tokens, pos = [], 0
+    markerstr = markerstr.rstrip()
+    while pos < len(markerstr):
+        match_ = _TOKEN.match(markerstr, pos)
+        assert match_ is not None, f'invalid marker {markerstr!r}'
+        kind = match_.lastgroup
+        value = match_.group(kind)
+        if kind == 'op':
+            value = ' '.join(value.split())      # 'not   in' -> 'not in'
+        elif kind == 'variable':
+            assert value in _VARIABLES, f'unknown marker variable {value!r}'
+            value = value.replace('.', '_')
+            if value == 'python_implementation':
+                value = 'platform_python_implementation'
+        tokens.append((kind, value))
+        pos = match_.end()
+    return tokens
+
+class _Parser(object):
+
+    def __init__(self, markerstr):
+        self.markerstr = markerstr
+        self.tokens = _tokenize(markerstr)
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self, kind):
+        token = self._peek()
+        assert token[0] == kind, f'invalid marker {self.markerstr!r}'
+        self.pos += 1
+        return token[1]
+
+    def parse(self):
+        tree = self._or()
+        assert self.pos == len(self.tokens), f'invalid marker {self.markerstr!r}'
+        return tree
+
+    def _or(self):
+        tree = self._and()
+        while self._peek() == ('bool', 'or'):
+            self.pos += 1
+            tree = ('or', tree, self._and())
+        return tree
+
+    def _and(self):
+        tree = self._atom()
+        while self._peek() == ('bool', 'and'):
+            self.pos += 1
+            tree = ('and', tree, self._atom())
+        return tree
+
+    def _atom(self):
+        if self._peek() == ('paren', '('):
+            self.pos += 1
+            tree = self._or()
+            self._take('paren')
+            return tree
+        lhs = self._value()
+        op = self._take('op')
+        return (op, lhs, self._value())
+
+    def _value(self):
+        kind, value = self._peek()
+        assert kind in ('string', 'variable'), f'invalid marker {self.markerstr!r}'
+        self.pos += 1
+        return ('string', value[1:-1]) if kind == 'string' else ('variable', value)
+
+# variables whose values are compared as versions (where the other side makes a version
+# specifier with the operator); the rest are compared as strings.
+_VERSIONS = {
+    'implementation_version', 'platform_release', 'python_full_version', 'python_version',
+}
+
+def _compare(op, lhs, rhs, key):
+    # as in the `packaging` library, an ordering of strings other than versions is only
+    # satisfied by equal strings (`<=`, `>=`), or not at all (`<`, `>`).
+    if key in _VERSIONS and op == '===':
+        return lhs.lower() == rhs.lower()
+    elif key in _VERSIONS:
+        try:
+            specifier = SpecifierSet.parse(f'{op}{rhs}', prereleases=True)
+        except AssertionError:
+            pass
+        else:
+            try:
+                return specifier.contains(Version.parse(lhs))
+            except AssertionError:
+                return False
+    if op in ('in', 'not in'):
+        return (lhs in rhs) == (op == 'in')
+    assert op not in ('~=', '==='), f'undefined comparison {lhs!r} {op} {rhs!r}'
+    return op in ('==', '<=', '>=') and lhs == rhs or op == '!=' and lhs != rhs
+
+class Marker(object):
+    # an environment marker as in PEP 508, e.g. `python_version < "3.11"`.
+
+    def __init__(self, markerstr):
+        self._str = markerstr.strip()
+        self._tree = _Parser(self._str).parse()
+
+    @classmethod
+    def parse(cls, markerstr):
+        return cls(markerstr)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._str!r})'
+
+    def __str__(self):
+        return self._str
+
+    def __eq__(self, other):
+        if not isinstance(other, Marker):
+            return NotImplemented
+        return self._tree == other._tree
+
+    def __hash__(self):
+        return hash(self._tree)
+
+    def evaluate(self, environment=None):
+        # `environment` overrides values of `default_environment()`; `extra` (the extra
+        # being installed, if any) is the empty string unless given.
+        env = dict(_default_environment())
+        env['extra'] = ''
+        env.update(environment or {})
+
+        def value(node):
+            kind, val = node
+            if kind == 'string':
+                return val
+            return env[val]
+
+        def evaluate(tree):
+            op, lhs, rhs = tree
+            if op == 'and':
+                return evaluate(lhs) and evaluate(rhs)
+            elif op == 'or':
+                return evaluate(lhs) or evaluate(rhs)
+            key = lhs[1] if lhs[0] == 'variable' else rhs[1]
+            lhs, rhs = value(lhs), value(rhs)
+            if key == 'extra':
+                lhs, rhs = names.normalize(lhs), names.normalize(rhs)
+            return _compare(op, lhs, rhs, key)
+
+        return evaluate(self._tree)
+
+class Requirement(object):
+    # a dependency specification as in PEP 508, e.g. `foo[bar]>=1.0; os_name == "posix"`
+    # or `foo @ https://example.com/foo-1.0.tar.gz`.
+
+    _regex = re.compile(r'''
+        ^\s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*
+        (?:\[\s*(?P<extras>[A-Za-z0-9._,\s-]*)\s*\])?\s*
+        (?:
+            @\s*(?P<url>\S+)(?:\s+|$)
+          | \(?(?P<specifier>[^;()]*)\)?\s*
+        )
+        (?:;\s*(?P<marker>.+))?$
+    ''', re.VERBOSE)
+
+    def __init__(self, name, extras=(), specifier=None, marker=None, url=None):
+        self.name = name
+        self.extras = tuple(extras)
+        self.specifier = specifier if specifier is not None else SpecifierSet()
+        self.marker = marker
+        self.url = url
+
+    @classmethod
+    def parse(cls, reqstr):
+        match_ = cls._regex.match(reqstr)
+        assert match_ is not None, f'invalid requirement {reqstr!r}'
+        extras = match_.group('extras') or ''
+        extras = tuple(names.normalize(e.strip()) for e in extras.split(',') if e.strip())
+        specifier = SpecifierSet.parse(match_.group('specifier') or '')
+        marker = match_.group('marker')
+        return cls(
+            match_.group('name'), extras=extras, specifier=specifier,
+            marker=Marker(marker) if marker is not None else None,
+            url=match_.group('url'))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({str(self)!r})'
+
+    def __str__(self):
+        s = self.name
+        if self.extras:
+            s += f'[{",".join(self.extras)}]'
+        if self.url is not None:
+            s += f' @ {self.url}'
+            if self.marker is not None:
+                s += ' '
+        else:
+            s += str(self.specifier)
+        if self.marker is not None:
+            s += f'; {self.marker}'
+        return s
+
+    def __eq__(self, other):
+        if not isinstance(other, Requirement):
+            return NotImplemented
+        return (self.key, set(self.extras), self.specifier, self.marker, self.url) == \
+            (other.key, set(other.extras), other.specifier, other.marker, other.url)
+
+    def __hash__(self):
+        return hash((self.key, frozenset(self.extras), self.specifier, self.url))
+
+    @property
+    def key(self):
+        # the name, normalized.
+        return names.normalize(self.name)
+
+    def applies(self, environment=None, extras=()):
+        # whether the requirement applies in an environment (refer `Marker.evaluate()`),
+        # when installing with any of the given extras (or none).
+        if self.marker is None:
+            return True
+        environment = dict(environment or {})
+        for extra in ('',) + tuple(extras):
+            if self.marker.evaluate(dict(environment, extra=extra)):
+                return True
+        return False
@@ -1,29 +1,44 @@
-__all__ = ['dumps', 'dump', 'loads', 'load']
+import io
 
-# `dumps()` code below draws from code in the package `pyproject-metadata`.
+__all__ = ['dumps', 'dump', 'loads', 'load', 'load_headers']
+
+# `_iterdump()` code below draws from code in the package `pyproject-metadata`.
 # https://github.com/FFY00/python-pyproject-metadata/blob/main/pyproject_metadata/__init__.py#L52
 
-def dumps(headers, body):
-    text = []
+def _iterdump(headers, body):
     for name, entries in headers.items():
         for entry in entries:
             lines = entry.strip().split('\n')
-            text.append(f'{name}: {lines[0]}')
+            yield f'{name}: {lines[0]}\n'
             for line in lines[1:]:
-                text.append(f'        {line}')
-    text.append('')    # leave a line
-    text.append(body)
-    return '\n'.join(text)
+                yield f'        {line}\n'
+    yield '\n'    # leave a line
+    yield body
+
+def dumps(headers, body):
+    return ''.join(_iterdump(headers, body))
 
 def dump(headers, body, fp):
-    return fp.write(dumps(headers, body))
+    # writes the text piece by piece rather than building it in memory first. `fp` may
+    # also be a binary stream (e.g. a member of a zip file opened for writing), which is
+    # written to in UTF-8 and left open.
+    binary = isinstance(fp, (io.RawIOBase, io.BufferedIOBase))
+    if binary:
+        fp = io.TextIOWrapper(fp, encoding='utf-8', newline='')
+    try:
+        return sum(fp.write(chunk) for chunk in _iterdump(headers, body))
+    finally:
+        if binary:
+            fp.flush()
+            fp.detach()
 
-def loads(text):
-    text = text.split('\n')
+def _parse_headers(lines):
+    # consumes lines from the iterator `lines` up to (and including) the blank line that
+    # ends the headers, so that what is left of it is the body.
     headers = {}
     last_added_key = None
 
-    for idx, line in enumerate(text):
+    for line in lines:
         if line == '':   # headers over
             break
         try:
@@ -46,9 +61,29 @@ def loads(text):
                 headers[key] = [value]
             last_added_key = key
 
-    body = text[idx+1:]
-    body = '\n'.join(body)
+    return headers
+
+def loads(text):
+    lines = iter(text.split('\n'))
+    headers = _parse_headers(lines)
+    body = '\n'.join(lines)
     return (headers, body)
 
+def _readlines(fp):
+    # lines of the file read one at a time, without the leading blank lines (which
+    # `loads()` would take as the end of the headers).
+    lines = (line[:-1] if line.endswith('\n') else line for line in iter(fp.readline, ''))
+    for line in lines:
+        if line.strip():
+            yield line.lstrip()
+            break
+    yield from lines
+
+def load_headers(fp):
+    # only reads the file up to the end of the headers, e.g. to skip the long
+    # description in the body of package metadata.
+    return _parse_headers(_readlines(fp))
+
 def load(fp):
-    return loads(fp.read().strip())
+    headers = load_headers(fp)
+    return (headers, fp.read().rstrip())
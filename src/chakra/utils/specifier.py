@@ -0,0 +1,247 @@
+import bisect
+import re
+
+from .version import Version, _release_key
+
+# a specifier set is compiled into a sorted list of disjoint, half-open intervals
+# `[lo, hi)` of version sort keys (see `_cmpkey()`), so that checking a version against
+# the set is a bisection over the bounds, and filtering a sorted list of versions is a
+# couple of bisections per interval.
+#
+# the bounds below are tuples which are not the keys of any version, but compare with
+# them as needed: `_MIN` and `_MAX` are below and above every key; `_release_start()` is
+# below every version of a release; and `_public_end()` is above every local version of a
+# public version.
+
+_INF = float('inf')
+_MIN = (-_INF,)
+_MAX = (_INF,)
+
+def _release_start(epoch, release):
+    return (epoch, _release_key(release), (-_INF,))
+
+def _public_start(version):
+    return version._key[:5] + ((),)
+
+def _public_end(version):
+    return version._key[:5] + (((_INF,),),)
+
+def _local_end(version):
+    # above `version` itself, but below every longer local version, e.g. 1.0+ubuntu.1
+    # for 1.0+ubuntu.
+    return version._key[:5] + (version._key[5] + ((-_INF,),),)
+
+def _intersect(a, b):
+    out, i, j = [], 0, 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo < hi:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+def _complement(intervals):
+    out, lo = [], _MIN
+    for start, end in intervals:
+        if lo < start:
+            out.append((lo, start))
+        lo = end
+    if lo < _MAX:
+        out.append((lo, _MAX))
+    return out
+
+class Specifier(object):
+    # a single version specifier as in PEP 440, e.g. '>=1.2' or '!=1.5.*'.
+
+    _regex = re.compile(
+        r'^\s*(?P<operator>~=|===|==|!=|<=|>=|<|>)\s*(?P<version>[^\s,;]+)\s*$')
+
+    def __init__(self, operator, version):
+        self.operator = operator
+        self.version = version          # a string, since it may end with '.*'
+        self.wildcard = False
+
+        if operator == '===':
+            # arbitrary equality compares strings, so it has no intervals.
+            self.intervals = None
+            self.prereleases = False
+            return
+
+        verstr = version
+        if operator in ('==', '!=') and version.endswith('.*'):
+            verstr, self.wildcard = version[:-2], True
+        ver = Version.parse(verstr)
+        assert not self.wildcard or ver.tag is None and ver.local is None, \
+            f'invalid specifier {self}'
+        assert ver.local is None or operator in ('==', '!='), \
+            f'invalid specifier {self}'
+        assert operator != '~=' or len(ver.release) > 1, f'invalid specifier {self}'
+        self.intervals = self._compile(ver)
+        # a specifier that mentions a pre-release lets pre-releases in.
+        self.prereleases = operator != '!=' and ver.is_prerelease
+
+    def _compile(self, ver):
+        op = self.operator
+        if op in ('==', '!=') and self.wildcard:
+            prefix = ver.release
+            upper = prefix[:-1] + (prefix[-1] + 1,)
+            intervals = [(_release_start(ver.epoch, prefix),
+                          _release_start(ver.epoch, upper))]
+        elif op in ('==', '!=') and ver.local is not None:
+            intervals = [(ver._key, _local_end(ver))]
+        elif op in ('==', '!='):
+            # a version without a local part matches every local version of it.
+            intervals = [(_public_start(ver), _public_end(ver))]
+        elif op == '<=':
+            intervals = [(_MIN, _public_end(ver))]
+        elif op == '>=':
+            intervals = [(_public_start(ver), _MAX)]
+        elif op == '<':
+            # excludes the pre-releases of the given version, unless it is itself one.
+            if ver.is_prerelease:
+                hi = _public_start(ver)
+            elif ver.post is not None:
+                hi = ver._key[:4] + ((0, -_INF),)
+            else:
+                hi = _release_start(ver.epoch, ver.release)
+            intervals = [(_MIN, hi)]
+        elif op == '>':
+            # excludes the post-releases (and local versions) of the given version,
+            # unless it is itself one.
+            if ver.post is None and ver.dev is None:
+                lo = ver._key[:3] + (_INF,)
+            else:
+                lo = _public_end(ver)
+            intervals = [(lo, _MAX)]
+        else:                            # '~='
+            prefix = ver.release[:-1]
+            upper = prefix[:-1] + (prefix[-1] + 1,)
+            intervals = [(_public_start(ver), _release_start(ver.epoch, upper))]
+
+        if op == '!=':
+            intervals = _complement(intervals)
+        return intervals
+
+    @classmethod
+    def parse(cls, specstr):
+        match_ = cls._regex.match(specstr)
+        assert match_ is not None, f'invalid specifier {specstr!r}'
+        return cls(match_.group('operator'), match_.group('version'))
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(operator={self.operator!r}, '
+            f'version={self.version!r})')
+
+    def __str__(self):
+        return f'{self.operator}{self.version}'
+
+    def __eq__(self, other):
+        if not isinstance(other, Specifier):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+class SpecifierSet(object):
+    # a comma-separated set of specifiers, all of which a version must satisfy.
+    #
+    # as in PEP 440, pre-releases are excluded unless `prereleases` is true, or it is None
+    # and one of the specifiers mentions a pre-release. `filter()` (but not `contains()`)
+    # also falls back to the pre-releases when no final release satisfies the set.
+
+    def __init__(self, specifiers=(), prereleases=None):
+        self.specifiers = tuple(specifiers)
+        self._prereleases = prereleases
+
+        intervals, self._arbitrary = [(_MIN, _MAX)], []
+        for spec in self.specifiers:
+            if spec.intervals is None:
+                self._arbitrary.append(spec.version.lower())
+            else:
+                intervals = _intersect(intervals, spec.intervals)
+        self.intervals = intervals
+        self._los = [lo for lo, hi in intervals]
+
+    @classmethod
+    def parse(cls, specstr, prereleases=None):
+        return cls(
+            [Specifier.parse(s) for s in specstr.split(',') if s.strip()],
+            prereleases=prereleases)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({str(self)!r})'
+
+    def __str__(self):
+        return ','.join(str(spec) for spec in self.specifiers)
+
+    def __eq__(self, other):
+        if not isinstance(other, SpecifierSet):
+            return NotImplemented
+        return set(self.specifiers) == set(other.specifiers)
+
+    def __hash__(self):
+        return hash(frozenset(self.specifiers))
+
+    def __and__(self, other):
+        return SpecifierSet(self.specifiers + other.specifiers)
+
+    @property
+    def prereleases(self):
+        if self._prereleases is not None:
+            return self._prereleases
+        return any(spec.prereleases for spec in self.specifiers)
+
+    def _matches(self, version):
+        key = version._key
+        i = bisect.bisect_right(self._los, key) - 1
+        if i < 0 or key >= self.intervals[i][1]:
+            return False
+        return not self._arbitrary or \
+            all(str(version).lower() == s for s in self._arbitrary)
+
+    def contains(self, version, prereleases=None):
+        if isinstance(version, str):
+            version = Version.parse(version)
+        prereleases = self.prereleases if prereleases is None else prereleases
+        if version.is_prerelease and not prereleases:
+            return False
+        return self._matches(version)
+
+    def __contains__(self, version):
+        return self.contains(version)
+
+    def _select(self, matches, prereleases):
+        if prereleases is None:
+            prereleases = self._prereleases
+        if prereleases is None and self.prereleases:
+            prereleases = True
+        if prereleases:
+            return matches
+        finals = [v for v in matches if not v.is_prerelease]
+        # only pre-releases satisfy the set, so take them rather than nothing.
+        return finals if finals or prereleases is False else matches
+
+    def filter(self, versions, prereleases=None):
+        # the versions (in any order) that satisfy the set, keeping their order.
+        return self._select([v for v in versions if self._matches(v)], prereleases)
+
+    def filter_sorted(self, versions, keys=None, prereleases=None):
+        # the same as `filter()` for versions sorted in ascending order, bisecting the
+        # list instead of checking every version. `keys` are the sort keys of the
+        # versions, which can be given when filtering the same list many times.
+        if keys is None:
+            keys = [v._key for v in versions]
+        matches = []
+        for lo, hi in self.intervals:
+            start = bisect.bisect_left(keys, lo)
+            end = bisect.bisect_left(keys, hi, start)
+            matches.extend(versions[start:end])
+        if self._arbitrary:
+            matches = [v for v in matches if self._matches(v)]
+        return self._select(matches, prereleases)
@@ -1,71 +1,402 @@
+import bisect
+import functools
 import re
 
-def _version_cmp(nver1, nver2):
-    assert len(nver1) == len(nver2), 'cannot compare versions of differing lengths'
-    try:
-        if nver1[0] > nver2[0]:
-            return '>'
-        elif nver1[0] < nver2[0]:
-            return '<'
-        else:
-            return _version_cmp(nver1[1:], nver2[1:])
-    except IndexError:  # no elements left
-        return '='
+# the regular expression below is from PEP 440, Appendix B.
+# https://peps.python.org/pep-0440/#appendix-b-parsing-version-strings-with-regular-expressions
+
+_PRE = r'''
+    (?P<pre>                                          # pre-release
+        [-_\.]?
+        (?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)
+        [-_\.]?
+        (?P<pre_n>[0-9]+)?
+    )?
+'''
+_POST = r'''
+    (?P<post>                                         # post release
+        (?:-(?P<post_n1>[0-9]+))
+        |
+        (?:
+            [-_\.]?
+            (?P<post_l>post|rev|r)
+            [-_\.]?
+            (?P<post_n2>[0-9]+)?
+        )
+    )?
+'''
+_DEV = r'''
+    (?P<dev>                                          # dev release
+        [-_\.]?
+        (?P<dev_l>dev)
+        [-_\.]?
+        (?P<dev_n>[0-9]+)?
+    )?
+'''
+
+# spellings of pre-release tags, and their normalized forms.
+_PRE_SPELLINGS = {
+    'a': 'a', 'alpha': 'a',
+    'b': 'b', 'beta': 'b',
+    'rc': 'rc', 'c': 'rc', 'pre': 'rc', 'preview': 'rc',
+}
+_PRE_RANKS = {'a': 0, 'b': 1, 'rc': 2}
+
+def _release_key(release):
+    # trailing zeros don't count, i.e. 3.8 and 3.8.0 are the same release.
+    end = len(release)
+    while end > 0 and release[end-1] == 0:
+        end -= 1
+    return release[:end]
+
+def _cmpkey(epoch, release, pre, post, dev, local):
+    release = _release_key(release)
+    if pre is None and post is None and dev is not None:
+        pre = (-1, 0)                    # X.devN comes before the pre-releases of X
+    elif pre is None:
+        pre = (3, 0)                     # X comes after the pre-releases of X
+    else:
+        pre = (_PRE_RANKS[pre[0]], pre[1])
+    post = -1 if post is None else post
+    dev = (1, 0) if dev is None else (0, dev)
+    # a local version comes after the corresponding public version; in a local version,
+    # numeric segments come after alphanumeric ones.
+    local = () if local is None else \
+        tuple((1, s) if isinstance(s, int) else (0, s) for s in local)
+    return (epoch, release, pre, post, dev, local)
+
+def _parse_suffix(match_):
+    pre = post = dev = None
+    if match_.group('pre_l') is not None:
+        pre_l = _PRE_SPELLINGS[match_.group('pre_l').lower()]
+        pre = (pre_l, int(match_.group('pre_n') or 0))
+    if match_.group('post') is not None:
+        post = int(match_.group('post_n1') or match_.group('post_n2') or 0)
+    if match_.group('dev') is not None:
+        dev = int(match_.group('dev_n') or 0)
+    return pre, post, dev
+
+def _parse_local(local):
+    if local is None:
+        return None
+    return tuple(
+        int(s) if s.isdigit() else s.lower() for s in re.split(r'[-_\.]', local))
 
 class Version(object):
 
+    __slots__ = ('epoch', 'release', 'pre', 'post', 'dev', 'local', '_key', '_hash')
+
     _regex = re.compile(
-        r'^(?P<major>\d+)(?P<minor>\.\d+)?(?P<patch>\.\d+)?(?P<tag>\w+)?$')
+        r'^\s*v?(?:(?P<epoch>[0-9]+)!)?(?P<release>[0-9]+(?:\.[0-9]+)*)' + _PRE + _POST +
+        _DEV + r'(?:\+(?P<local>[a-z0-9]+(?:[-_\.][a-z0-9]+)*))?\s*$',
+        re.VERBOSE | re.IGNORECASE)
+    _suffix_regex = re.compile(
+        r'^' + _PRE + _POST + _DEV + r'$', re.VERBOSE | re.IGNORECASE)
+
+    def __init__(self, major, minor=None, patch=None, tag=None, epoch=0, local=None):
+        # `tag` holds the pre-, post- and development release parts, e.g. 'rc1',
+        # 'post2', 'a1.dev3'. versions with more than three release components are made
+        # with `Version.parse()`.
+        pre = post = dev = None
+        if tag is not None:
+            match_ = self._suffix_regex.match(tag)
+            assert match_ is not None, f'invalid tag {tag!r}'
+            pre, post, dev = _parse_suffix(match_)
+        release = tuple(t for t in (major, minor, patch) if t is not None)
+        self._init(epoch, release, pre, post, dev, _parse_local(local))
+
+    def _init(self, epoch, release, pre, post, dev, local):
+        # versions are immutable, so that the sort key can be computed once and for all.
+        setattr_ = object.__setattr__
+        setattr_(self, 'epoch', epoch)
+        setattr_(self, 'release', release)
+        setattr_(self, 'pre', pre)
+        setattr_(self, 'post', post)
+        setattr_(self, 'dev', dev)
+        setattr_(self, 'local', local)
+        key = _cmpkey(epoch, release, pre, post, dev, local)
+        setattr_(self, '_key', key)
+        setattr_(self, '_hash', hash(key))
+
+    @classmethod
+    def _make(cls, epoch, release, pre, post, dev, local):
+        self = object.__new__(cls)
+        self._init(epoch, release, pre, post, dev, local)
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
 
-    def __init__(self, major, minor=None, patch=None, tag=None):
-        self.major = major
-        self.minor = minor
-        self.patch = patch
-        self.tag = tag
+    def __reduce__(self):
+        return (
+            self.__class__._make,
+            (self.epoch, self.release, self.pre, self.post, self.dev, self.local))
 
     def __repr__(self):
         return (
-            f'{self.__class__.__name__}(major={self.major}, minor={self.minor}, '
-            f'patch={self.patch}, tag={self.tag!r})')
+            f'{self.__class__.__name__}(epoch={self.epoch}, release={self.release}, '
+            f'pre={self.pre}, post={self.post}, dev={self.dev}, local={self.local})')
+
+    @property
+    def major(self):
+        return self.release[0]
+
+    @property
+    def minor(self):
+        return self.release[1] if len(self.release) > 1 else None
+
+    @property
+    def patch(self):
+        return self.release[2] if len(self.release) > 2 else None
+
+    @property
+    def tag(self):
+        tag = ''
+        if self.pre is not None:
+            tag += f'{self.pre[0]}{self.pre[1]}'
+        if self.post is not None:
+            tag += f'.post{self.post}'
+        if self.dev is not None:
+            tag += f'.dev{self.dev}'
+        if tag.startswith('.'):
+            tag = tag[1:]
+        return tag or None
+
+    @property
+    def is_prerelease(self):
+        return self.pre is not None or self.dev is not None
+
+    @property
+    def is_postrelease(self):
+        return self.post is not None
 
-    def _asnumeric(self):
-        tuple_ = (self.major, self.minor, self.patch)
-        return tuple(t for t in tuple_ if t is not None)
+    @property
+    def base_version(self):
+        s = '.'.join(str(i) for i in self.release)
+        return f'{self.epoch}!{s}' if self.epoch else s
+
+    @property
+    def public(self):
+        s = self.base_version
+        if self.pre is not None:
+            s += f'{self.pre[0]}{self.pre[1]}'
+        if self.post is not None:
+            s += f'.post{self.post}'
+        if self.dev is not None:
+            s += f'.dev{self.dev}'
+        return s
 
     def __str__(self):
-        s = '.'.join(str(i) for i in self._asnumeric())
-        s += self.tag if self.tag is not None else ''
+        # the normalized form of the version.
+        s = self.public
+        if self.local is not None:
+            s += '+' + '.'.join(str(i) for i in self.local)
         return s
 
     @classmethod
     def parse(cls, verstr):
-        match_ = cls._regex.match(verstr)
-        assert match_ is not None
-        match_ = match_.groupdict()
-        for key, value in match_.items():
-            if value is not None:
-                if key in ('minor', 'patch'):
-                    value = value[1:]     # remove the leading .
-                if key != 'tag':
-                    value = int(value)
-                match_[key] = value
-        return cls(**match_)
+        return _parse(cls, verstr)
 
-    def __gt__(self, other):
-        return _version_cmp(self._asnumeric(), other._asnumeric()) == '>'
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key == other._key
+
+    def __ne__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key != other._key
 
     def __lt__(self, other):
-        return _version_cmp(self._asnumeric(), other._asnumeric()) == '<'
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key < other._key
 
-    def __eq__(self, other):
-        return \
-            _version_cmp(self._asnumeric(), other._asnumeric()) == '=' and self.tag == other.tag
+    def __le__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key <= other._key
+
+    def __gt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key > other._key
 
     def __ge__(self, other):
-        return (self > other) or (self == other)
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key >= other._key
 
-    def __le__(self, other):
-        return (self < other) or (self == other)
+# versions are immutable, so the same string can safely be given the same instance every
+# time it is parsed. the cache is bounded, since the strings come from untrusted sources
+# such as package indexes.
+@functools.lru_cache(maxsize=2 ** 14)
+def _parse(cls, verstr):
+    match_ = cls._regex.match(verstr)
+    assert match_ is not None
+    pre, post, dev = _parse_suffix(match_)
+    return cls._make(
+        int(match_.group('epoch') or 0),
+        tuple(int(i) for i in match_.group('release').split('.')),
+        pre, post, dev,
+        _parse_local(match_.group('local')))
 
-    def __ne__(self, other):
-        return not (self == other)
+_INF = float('inf')
+
+def _u64(n):
+    return n.to_bytes(8, 'big')
+
+def _pack(key):
+    # packs a sort key into bytes that order the same way as the key. the bounds of the
+    # intervals of a specifier set (see `chakra.utils.specifier`), which may be cut short
+    # or hold infinities, are packed in the same manner.
+    if key[0] == -_INF:
+        return b''
+    if key[0] == _INF:
+        return b'\xff' * 9
+    out = bytearray(_u64(key[0]))
+    if len(key) > 1:
+        for n in key[1]:
+            out += _u64(n + 1)
+        out += _u64(0)                   # a release comes before its extensions
+    if len(key) > 2:
+        if key[2][0] == -_INF:
+            return bytes(out)
+        if key[2][0] == _INF:
+            return bytes(out + b'\xff')
+        out.append(key[2][0] + 1)
+        out += _u64(key[2][1])
+    if len(key) > 3:
+        if key[3] == _INF:
+            return bytes(out + b'\xff')
+        out += _u64(key[3] + 1)
+    if len(key) > 4:
+        out.append(key[4][0])
+        if key[4][1] == -_INF:
+            return bytes(out)
+        out += _u64(key[4][1])
+    if len(key) > 5:
+        for segment in key[5]:
+            if segment[0] == -_INF:
+                out.append(0)
+            elif segment[0] == _INF:
+                out.append(3)
+            elif segment[0] == 1:
+                out.append(2)
+                out += _u64(segment[1])
+            else:
+                out.append(1)
+                out += segment[1].encode() + b'\x00'
+    return bytes(out)
+
+class VersionArray(object):
+    # a list of versions parsed in one go, held as version strings together with their
+    # sort keys packed into bytes, rather than as `Version` objects. sorting,
+    # deduplicating and looking up versions then compare bytes instead of tuples, and a
+    # `Version` is only made for the versions that are asked for.
+
+    __slots__ = ('strings', '_keys', '_prereleases', '_sorted')
+
+    def __init__(self, strings=(), keys=(), prereleases=b''):
+        self.strings = list(strings)
+        self._keys = list(keys)
+        self._prereleases = bytes(prereleases)    # 1 for every pre-release, else 0
+        self._sorted = None
+
+    @classmethod
+    def parse(cls, verstrs, strict=True):
+        # with `strict` false, strings that are not valid versions are skipped rather
+        # than failing the whole list.
+        regex = Version._regex
+        strings, keys, prereleases = [], [], bytearray()
+        for verstr in verstrs:
+            match_ = regex.match(verstr)
+            if match_ is None:
+                assert not strict, f'invalid version {verstr!r}'
+                continue
+            pre, post, dev = _parse_suffix(match_)
+            strings.append(verstr)
+            keys.append(_pack(_cmpkey(
+                int(match_.group('epoch') or 0),
+                tuple(int(i) for i in match_.group('release').split('.')),
+                pre, post, dev,
+                _parse_local(match_.group('local')))))
+            prereleases.append(pre is not None or dev is not None)
+        return cls(strings, keys, prereleases)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.strings!r})'
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getitem__(self, index):
+        return Version.parse(self.strings[index])
+
+    def __iter__(self):
+        return (Version.parse(s) for s in self.strings)
+
+    def _take(self, indices):
+        return self.__class__(
+            [self.strings[i] for i in indices], [self._keys[i] for i in indices],
+            bytes(self._prereleases[i] for i in indices))
+
+    def argsort(self):
+        return sorted(range(len(self._keys)), key=self._keys.__getitem__)
+
+    def sort(self):
+        # a sorted copy of the array; the sort is stable.
+        if self._sorted is None:
+            array = self._take(self.argsort())
+            array._sorted = array
+            self._sorted = array
+        return self._sorted
+
+    def unique(self):
+        # a sorted copy of the array, keeping the first of every set of equal versions
+        # (e.g. '1.0' and '1.0.0').
+        array = self.sort()
+        indices = [
+            i for i, key in enumerate(array._keys) if i == 0 or key != array._keys[i-1]]
+        unique = array._take(indices)
+        unique._sorted = unique
+        return unique
+
+    def max(self, prereleases=True):
+        array = self.sort()
+        for i in reversed(range(len(array))):
+            if prereleases or not array._prereleases[i]:
+                return array[i]
+        return None
+
+    def _find(self, specset, lo, hi, prereleases):
+        keys = self._keys
+        start = bisect.bisect_left(keys, _pack(lo))
+        for i in reversed(range(start, bisect.bisect_left(keys, _pack(hi), start))):
+            if (prereleases or not self._prereleases[i]) and (
+                    not specset._arbitrary or specset._matches(self[i])):
+                return i
+        return None
+
+    def max_satisfying(self, specset, prereleases=None):
+        # the highest version that satisfies the specifier set, or None. as with
+        # `SpecifierSet.filter()`, pre-releases are taken when no final release
+        # satisfies the set (unless `prereleases` is false).
+        array = self.sort()
+        if prereleases is None:
+            prereleases = specset._prereleases
+        if prereleases is None and specset.prereleases:
+            prereleases = True
+        passes = [prereleases] if prereleases is not None else [False, True]
+        for prereleases in passes:
+            for lo, hi in reversed(specset.intervals):
+                i = array._find(specset, lo, hi, prereleases)
+                if i is not None:
+                    return array[i]
+        return None
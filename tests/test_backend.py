@@ -0,0 +1,197 @@
+import base64
+import hashlib
+import os
+import pathlib
+import tarfile
+import textwrap
+import unittest
+import zipfile
+from unittest import mock
+
+from chakra import backend
+from chakra.utils import rfc822, tempfile
+
+class _Project(unittest.TestCase):
+    # a project to build, in a temporary directory.
+
+    _pyproject = textwrap.dedent("""
+        [project]
+        name = "Foo.Bar"
+        version = "1.0.0-rc1"
+        description = "A test project."
+        readme = "README.md"
+        dependencies = ["baz>=1"]
+        optional-dependencies = { test = ["qux; python_version<'3.11'"] }
+        scripts = { foo = "foo_bar.cli:main" }
+    """)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        (self.root / 'pyproject.toml').write_text(self._pyproject)
+        (self.root / 'README.md').write_text('# Foo\n\nlong description\n')
+        package = self.root / 'src' / 'foo_bar'
+        (package / 'data').mkdir(parents=True)
+        (package / '__pycache__').mkdir()
+        (package / '__init__.py').write_text('')
+        (package / 'cli.py').write_text('def main(): pass\n')
+        (package / 'data' / 'blob.bin').write_bytes(os.urandom(100000))
+        (package / '__pycache__' / 'cli.cpython-311.pyc').write_bytes(b'')
+        self.orig_dir = os.getcwd()
+        os.chdir(self.root)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        os.chdir(self.orig_dir)
+        self.tmp.cleanup()
+
+    def _build(self, build=backend.build_wheel, config_settings=None):
+        name = build(str(self.root / 'dist'), config_settings)
+        return zipfile.ZipFile(self.root / 'dist' / name), name
+
+    def _check_record(self, wheel):
+        lines = wheel.read('foo_bar-1.0.0rc1.dist-info/RECORD').decode().splitlines()
+        assert lines[-1] == 'foo_bar-1.0.0rc1.dist-info/RECORD,,'
+        for line in lines[:-1]:
+            path, hash_, size = line.rsplit(',', 2)
+            data = wheel.read(path)
+            digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=')
+            assert hash_ == f'sha256={digest.decode()}'
+            assert int(size) == len(data)
+
+class TestBuild(_Project):
+
+    def test_wheel(self):
+        wheel, name = self._build()
+        assert name == 'foo_bar-1.0.0rc1-py3-none-any.whl'
+        assert sorted(wheel.namelist()) == [
+            'foo_bar-1.0.0rc1.dist-info/METADATA',
+            'foo_bar-1.0.0rc1.dist-info/RECORD',
+            'foo_bar-1.0.0rc1.dist-info/WHEEL',
+            'foo_bar-1.0.0rc1.dist-info/entry_points.txt',
+            'foo_bar/__init__.py',
+            'foo_bar/cli.py',
+            'foo_bar/data/blob.bin',
+        ]
+
+    def test_record(self):
+        wheel, name = self._build()
+        self._check_record(wheel)
+
+    def test_metadata(self):
+        wheel, name = self._build()
+        headers, body = rfc822.loads(
+            wheel.read('foo_bar-1.0.0rc1.dist-info/METADATA').decode())
+        assert headers['Name'] == ['Foo.Bar']
+        assert headers['Version'] == ['1.0.0rc1']
+        assert headers['Requires-Dist'] == [
+            'baz>=1', 'qux; (python_version<\'3.11\') and extra == "test"']
+        assert headers['Provides-Extra'] == ['test']
+        assert headers['Description-Content-Type'] == ['text/markdown']
+        assert body == '# Foo\n\nlong description\n'
+        entry_points = wheel.read('foo_bar-1.0.0rc1.dist-info/entry_points.txt').decode()
+        assert 'foo = foo_bar.cli:main' in entry_points
+
+    def test_compression_level(self):
+        wheel, name = self._build(config_settings={'compression-level': '0'})
+        assert wheel.getinfo('foo_bar/cli.py').compress_type == zipfile.ZIP_STORED
+        wheel, name = self._build(config_settings={'compression-level': '9'})
+        assert wheel.getinfo('foo_bar/cli.py').compress_type == zipfile.ZIP_DEFLATED
+        with self.assertRaises(ValueError):
+            self._build(config_settings={'compression-level': '10'})
+
+    def test_reproducible(self):
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1700000000'}):
+            wheel, name = self._build()
+            first = (self.root / 'dist' / name).read_bytes()
+            self._build()
+            assert (self.root / 'dist' / name).read_bytes() == first
+
+    def test_editable(self):
+        wheel, name = self._build(build=backend.build_editable)
+        assert 'foo_bar/cli.py' not in wheel.namelist()
+        assert wheel.read('foo_bar.pth').decode().strip() == str(self.root / 'src')
+
+    def test_missing_package(self):
+        (self.root / 'src' / 'foo_bar').rename(self.root / 'src' / 'other')
+        with self.assertRaises(RuntimeError):
+            self._build()
+        assert not (self.root / 'dist' / 'foo_bar-1.0.0rc1-py3-none-any.whl').exists()
+
+class TestBuildSdist(_Project):
+
+    def _sdist(self):
+        name = backend.build_sdist(str(self.root / 'dist'))
+        return tarfile.open(self.root / 'dist' / name), name
+
+    def test_sdist(self):
+        sdist, name = self._sdist()
+        assert name == 'foo_bar-1.0.0rc1.tar.gz'
+        assert sdist.getnames() == [
+            'foo_bar-1.0.0rc1/PKG-INFO',
+            'foo_bar-1.0.0rc1/pyproject.toml',
+            'foo_bar-1.0.0rc1/README.md',
+            'foo_bar-1.0.0rc1/src/foo_bar/__init__.py',
+            'foo_bar-1.0.0rc1/src/foo_bar/cli.py',
+            'foo_bar-1.0.0rc1/src/foo_bar/data/blob.bin',
+        ]
+        headers, body = rfc822.loads(
+            sdist.extractfile('foo_bar-1.0.0rc1/PKG-INFO').read().decode())
+        assert headers['Name'] == ['Foo.Bar'] and headers['Version'] == ['1.0.0rc1']
+        assert sdist.extractfile('foo_bar-1.0.0rc1/src/foo_bar/data/blob.bin').read() == \
+            (self.root / 'src' / 'foo_bar' / 'data' / 'blob.bin').read_bytes()
+
+    def test_rebuild(self):
+        # the wheel built from the unpacked sdist is the same as the one built from the
+        # project.
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1700000000'}):
+            sdist, name = self._sdist()
+            wheel = (self.root / 'dist' / backend.build_wheel(str(self.root / 'dist')))
+            expected = wheel.read_bytes()
+            sdist.extractall(self.root / 'unpacked')
+            os.chdir(self.root / 'unpacked' / 'foo_bar-1.0.0rc1')
+            backend.build_wheel(str(self.root / 'rebuilt'))
+        assert (self.root / 'rebuilt' / wheel.name).read_bytes() == expected
+
+    def test_reproducible(self):
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1700000000'}):
+            sdist, name = self._sdist()
+            first = (self.root / 'dist' / name).read_bytes()
+            self._sdist()
+            assert (self.root / 'dist' / name).read_bytes() == first
+
+class TestIncrementalBuild(_Project):
+
+    def _build_counting(self, config_settings=None):
+        # builds the wheel, returning it along with the names of the copied members.
+        copy = backend.WheelWriter.copy
+        with mock.patch.object(
+                backend.WheelWriter, 'copy', autospec=True, side_effect=copy) as copied:
+            wheel, name = self._build(config_settings=config_settings)
+        return wheel, sorted(call.args[2] for call in copied.call_args_list)
+
+    def test_unchanged(self):
+        wheel, copied = self._build_counting()
+        assert copied == []
+        contents = {name: wheel.read(name) for name in wheel.namelist()}
+        wheel, copied = self._build_counting()
+        assert copied == [
+            'foo_bar/__init__.py', 'foo_bar/cli.py', 'foo_bar/data/blob.bin']
+        assert wheel.testzip() is None
+        assert {name: wheel.read(name) for name in wheel.namelist()} == contents
+        self._check_record(wheel)
+
+    def test_changed(self):
+        self._build_counting()
+        (self.root / 'src' / 'foo_bar' / 'cli.py').write_text('def main(): return 1\n')
+        wheel, copied = self._build_counting()
+        assert copied == ['foo_bar/__init__.py', 'foo_bar/data/blob.bin']
+        assert wheel.read('foo_bar/cli.py') == b'def main(): return 1\n'
+        self._check_record(wheel)
+
+    def test_settings_changed(self):
+        self._build_counting()
+        wheel, copied = self._build_counting(config_settings={'compression-level': '1'})
+        assert copied == []
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from chakra.cli import cli
+from chakra.utils import tempfile
+
+def _imported(code):
+    # the chakra modules imported by running `code` in a fresh interpreter.
+    code += '\nimport sys; print(*sys.modules, file=sys.stderr)'
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return {m for m in result.stderr.split() if m.startswith('chakra')}
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_core(self):
+        modules = _imported('import chakra.core; chakra.core.Command')
+        assert 'chakra.core.command' in modules
+        assert 'chakra.core.hook' not in modules
+        assert 'chakra.core.environment' not in modules
+
+    def test_utils(self):
+        modules = _imported('from chakra.utils import Version')
+        assert 'chakra.utils.version' in modules
+        assert 'chakra.utils.tempfile_patch' not in modules
+
+    def test_cli(self):
+        modules = _imported(
+            'from chakra.cli import cli\ntry: cli(["hooks", "--help"])\n'
+            'except SystemExit: pass')
+        assert 'chakra.cli.hooks' in modules
+        assert 'chakra.cli.cache' not in modules
+        assert 'chakra.core.hook' not in modules
+
+    def test_missing(self):
+        import chakra.core
+        with self.assertRaises(AttributeError):
+            chakra.core.Missing
+
+class TestCli(unittest.TestCase):
+
+    def test_help(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            assert cli([]) == 0
+        assert 'hooks' in stdout.getvalue()
+
+    def test_hooks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            (tmp / 'hooks').mkdir()
+            (tmp / 'hooks' / 'foo.py').write_text('print("foo")')
+            (tmp / 'pyproject.toml').write_text('')
+            os.chdir(tmp)
+            stdout = io.StringIO()
+            with mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(tmp / 'cache')}), \
+                    contextlib.redirect_stdout(stdout):
+                assert cli(['hooks']) == 0
+                (tmp / 'hooks' / 'bar.py').write_text('raise SystemExit(1)')
+                with contextlib.redirect_stderr(io.StringIO()):
+                    assert cli(['hooks']) == 1
+        assert '[foo] foo' in stdout.getvalue()
+
+    def test_hooks_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            for args, missing in [
+                    (['--pyproject', str(tmp / 'pyproject.toml')], 'pyproject.toml'),
+                    ([str(tmp / 'hooks'), '--pyproject', str(tmp / 'pyproject.toml')],
+                     'hooks')]:
+                with self.subTest(missing=missing):
+                    stderr = io.StringIO()
+                    with mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(tmp)}), \
+                            contextlib.redirect_stderr(stderr):
+                        assert cli(['hooks', *args]) == 1
+                    assert stderr.getvalue() == \
+                        f'could not find {tmp / missing}\n'
+                (tmp / 'pyproject.toml').write_text('')
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stdout = io.StringIO()
+            with mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': tmp}), \
+                    contextlib.redirect_stdout(stdout):
+                assert cli(['cache']) == 0
+                assert cli(['cache', 'clear']) == 0
+        assert 'templates' in stdout.getvalue()
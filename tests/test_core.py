@@ -1,14 +1,24 @@
+import asyncio
+import graphlib
 import os
 import pathlib
 import subprocess
 import sys
+import time
 import unittest
+import zipfile
+from unittest import mock
 
 import virtualenv
 
-from chakra.core import Command, Environment, Hook, OpSystem
-from chakra.errors import NotSupportedError
-from chakra.utils import tempfile
+from chakra.core import (
+    Arch, Command, Environment, EnvironmentPool, FindLinks, Hook, HookScheduler,
+    OpSystem, Lock, Resolver, ResultCache, TemplateCache, WheelCache, build_many,
+    discover, install_wheel, resolve, run_many, scan_metadata, sync)
+from chakra.core.lock import Pin
+from chakra import backend
+from chakra.errors import NotSupportedError, ParseError, ResolutionError
+from chakra.utils import rfc822, tempfile
 
 
 class TestCommand(unittest.TestCase):
@@ -86,6 +96,141 @@ class TestCommand(unittest.TestCase):
         assert result.stdout == 'bar\nfoo'
 
 
+class TestRunMany(unittest.TestCase):
+
+    def test_order(self):
+        # the first command finishes last.
+        script = 'import time; time.sleep({}); print({})'
+        commands = [
+            Command(['python', '-c', script.format(0.3 - 0.1*i, i)]) for i in range(3)]
+        results = run_many(commands, max_workers=3)
+        assert [result.stdout for result in results] == ['0', '1', '2']
+        assert all(result.returncode == 0 for result in results)
+
+    def test_failure_isolation(self):
+        commands = [
+            Command(['python', '-c', "print('foo')"]),
+            Command(['foo']),
+            Command(['python', '-c', 'import sys; sys.exit(3)']),
+            Command(['python', '-c', "print('bar')"]),
+        ]
+        results = run_many(commands, max_workers=2)
+        assert [result.returncode for result in results] == [0, 127, 3, 0]
+        assert results[0].stdout == 'foo'
+        assert results[1].stderr == 'command not found: foo'
+        assert results[3].stdout == 'bar'
+
+    @unittest.skipIf(OpSystem.find() == OpSystem.WINDOWS, 'on windows system')
+    def test_not_executable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = pathlib.Path(tmp) / 'foo'
+            script.write_text("#!/bin/sh\necho 'foo'")
+            results = run_many([Command([str(script)]), Command(['echo', 'bar'])])
+        assert results[0].returncode == 126
+        assert results[1].stdout == 'bar'
+
+    def test_empty(self):
+        assert run_many([]) == []
+
+
+class TestRunAsync(unittest.TestCase):
+
+    _script = (
+        'import sys, time\n'
+        'print("foo", flush=True)\n'
+        'print("bar", file=sys.stderr, flush=True)\n'
+        'time.sleep(0.2)\n'
+        'print("baz", flush=True)\n'
+    )
+
+    def test_capture(self):
+        result = asyncio.run(Command(['python', '-c', self._script]).run_async())
+        assert result.returncode == 0
+        assert result.stdout == 'foo\nbaz'
+        assert result.stderr == 'bar'
+
+    def test_streaming(self):
+        lines = []
+        def on_output(name, line):
+            lines.append((name, line))
+
+        result = asyncio.run(Command(['python', '-c', self._script]).run_async(
+            capture_output=False, on_output=on_output))
+        assert result.returncode == 0
+        assert result.stdout is None and result.stderr is None
+        assert sorted(lines) == [('stderr', 'bar'), ('stdout', 'baz'), ('stdout', 'foo')]
+        assert lines.index(('stdout', 'foo')) < lines.index(('stdout', 'baz'))
+
+    def test_long_line(self):
+        # read in parts, some of which end halfway through a two byte character.
+        lines = []
+        script = "print('x' + '\\u00e9' * 100000); print('foo')"
+        result = asyncio.run(Command(['python', '-c', script]).run_async(
+            on_output=lambda name, line: lines.append(line)))
+        assert result.returncode == 0
+        assert result.stdout == 'x' + '\u00e9' * 100000 + '\nfoo'
+        assert lines == ['x' + '\u00e9' * 100000, 'foo']
+
+    def test_undecodable(self):
+        # the process is killed, rather than left running, once its output can't be
+        # decoded.
+        pids = []
+        script = (
+            'import os, sys, time\n'
+            'print(os.getpid(), file=sys.stderr, flush=True)\n'
+            'time.sleep(0.5)\n'
+            'sys.stdout.buffer.write(bytes([0xff, 0xff, 10])); sys.stdout.flush()\n'
+            'time.sleep(60)\n')
+
+        def on_output(name, line):
+            if name == 'stderr':
+                pids.append(int(line))
+
+        with self.assertRaises(UnicodeDecodeError):
+            asyncio.run(asyncio.wait_for(
+                Command(['python', '-c', script]).run_async(on_output=on_output), 30))
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pids[0], 0)
+
+    def test_invalid(self):
+        result = asyncio.run(Command(['foo']).run_async())
+        assert result.returncode == 127
+        assert result.stdout == ''
+        assert result.stderr == 'command not found: foo'
+
+    def test_many(self):
+        async def main():
+            return await asyncio.gather(*(
+                Command(['python', '-c', f'print({i})']).run_async() for i in range(4)))
+
+        results = asyncio.run(main())
+        assert [result.stdout for result in results] == ['0', '1', '2', '3']
+
+    def test_cancel(self):
+        async def main():
+            lines = []
+            task = asyncio.ensure_future(
+                Command(['python', '-c', self._script.replace('0.2', '60')]).run_async(
+                    on_output=lambda name, line: lines.append(line)))
+            while 'bar' not in lines:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return lines
+
+        assert 'baz' not in asyncio.run(asyncio.wait_for(main(), 30))
+
+
+class TestPlatform(unittest.TestCase):
+
+    @unittest.skipIf(OpSystem.find() == OpSystem.WINDOWS, 'on windows system')
+    def test_matches_uname(self):
+        # in-process detection should agree with what `uname` reports.
+        assert OpSystem.find().value == Command(['uname', '-s']).run().stdout.lower()
+        assert Command(['uname', '-m']).run().stdout in Arch.find(OpSystem.find()).value
+
+
 class TestHook(unittest.TestCase):
 
     def test_python(self):
@@ -133,6 +278,131 @@ class TestHook(unittest.TestCase):
                 Hook(pathlib.Path('foo.bat')).run()
 
 
+class TestHookScheduler(unittest.TestCase):
+
+    def _write(self, directory, hooks):
+        for name, code in hooks.items():
+            (pathlib.Path(directory) / name).write_text(code)
+
+    def test_deps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write(tmp, {
+                'first.py': "open('first.txt', 'w').write('foo')",
+                'second.py': "print(open('first.txt').read())",
+                'unsupported.bat': 'dir',
+            })
+            os.chdir(tmp)
+            scheduler = HookScheduler.discover(tmp, deps={'second': ['first', 'other']})
+            assert sorted(scheduler.hooks) == ['first', 'second']
+            results = scheduler.run()
+        assert results['second'].stdout == 'foo'
+
+    def test_concurrent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write(tmp, {
+                f'hook{i}.py': 'import time; time.sleep(1)' for i in range(3)})
+            scheduler = HookScheduler.discover(tmp, max_workers=3)
+            start = time.perf_counter()
+            results = scheduler.run()
+            elapsed = time.perf_counter() - start
+        assert sorted(results) == ['hook0', 'hook1', 'hook2']
+        assert elapsed < 2.5
+
+    def test_fail_fast(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write(tmp, {
+                'fails.py': 'import sys; sys.exit(1)',
+                'slow.py': "import time; time.sleep(60); print('slow')",
+                'after.py': "print('after')",
+            })
+            scheduler = HookScheduler.discover(tmp, deps={'after': ['fails']})
+            start = time.perf_counter()
+            results = scheduler.run()
+        assert time.perf_counter() - start < 30
+        assert results['fails'].returncode == 1
+        assert 'slow' not in results          # cancelled
+        assert 'after' not in results         # never started
+
+    def test_cycle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write(tmp, {'foo.py': '', 'bar.py': ''})
+            scheduler = HookScheduler.discover(tmp, deps={'foo': ['bar'], 'bar': ['foo']})
+            with self.assertRaises(graphlib.CycleError):
+                scheduler.run()
+
+    def test_from_pyproject(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._write(tmp, {
+                'pyproject.toml': '[tool.chakra.hook-deps]\nbar = ["foo"]\n',
+                'foo.py': '', 'bar.py': ''})
+            os.chdir(tmp)
+            scheduler = HookScheduler.from_pyproject(tmp)
+        assert scheduler.deps == {'bar': ['foo']}
+
+
+class TestResultCache(unittest.TestCase):
+
+    _script = "print(open('input.txt').read()); open('runs.txt', 'a').write('x')"
+
+    def _runs(self):
+        return len(pathlib.Path('runs.txt').read_text())
+
+    def test_hit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            cache = ResultCache(pathlib.Path(tmp) / 'cache')
+            pathlib.Path('input.txt').write_text('foo')
+            command = Command(['python', '-c', self._script])
+            results = [cache.run(command, inputs=['input.txt']) for _ in range(2)]
+            assert self._runs() == 1
+            assert [result.stdout for result in results] == ['foo', 'foo']
+
+            pathlib.Path('input.txt').write_text('bar')
+            assert cache.run(command, inputs=['input.txt']).stdout == 'bar'
+            assert self._runs() == 2
+
+            # a change to the environment variables is a miss too.
+            command = Command(['python', '-c', self._script], env_vars={'FOO': 'bar'})
+            cache.run(command, inputs=['input.txt'])
+            assert self._runs() == 3
+            assert len(cache.entries()) == 3
+
+    def test_hook(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            cache = ResultCache(pathlib.Path(tmp) / 'cache')
+            pathlib.Path('input.txt').write_text('foo')
+            pathlib.Path('hook.py').write_text(self._script)
+            cache.run(Hook('hook.py'))
+            cache.run(Hook('hook.py'))
+            assert self._runs() == 1
+            # the script of a hook is an input in itself.
+            pathlib.Path('hook.py').write_text(self._script + '\n')
+            cache.run(Hook('hook.py'))
+            assert self._runs() == 2
+
+    def test_failure_not_stored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            cache = ResultCache(pathlib.Path(tmp) / 'cache')
+            command = Command(['python', '-c', "import sys; sys.exit(1)"])
+            assert cache.run(command).returncode == 1
+            assert cache.entries() == []
+
+    def test_evict_clear(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            cache = ResultCache(pathlib.Path(tmp) / 'cache')
+            for i in range(3):
+                cache.run(Command(['python', '-c', f'print({i})']))
+            assert len(cache.entries()) == 3
+            size = cache.size()
+            assert len(cache.evict(max_size=size - 1)) == 1
+            cache.clear()
+            assert cache.entries() == []
+            assert cache.size() == 0
+
+
 class TestEnvironment(unittest.TestCase):
 
     def test_create(self):
@@ -229,3 +499,656 @@ class TestEnvironment(unittest.TestCase):
         assert result.returncode == 0
         assert result.stdout != ''
         assert result.stderr == ''
+
+
+@unittest.skipIf(OpSystem.find() == OpSystem.WINDOWS, 'on windows system')
+class TestTemplateCache(unittest.TestCase):
+
+    def test_clone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            templates = TemplateCache(pathlib.Path(tmp) / 'templates')
+            for name in ('foo', 'bar'):
+                env = Environment(pathlib.Path(tmp) / name)
+                env.create(templates=templates)
+                assert env.python_executable.exists()
+                assert env.site_packages.exists()
+                assert env.has_installed('pip')
+                assert f'prompt = "{name}"' in env.pyvenv_cfg.read_text()
+                # scripts should refer to the new environment.
+                pip = env.python_executable.parent / 'pip'
+                assert pip.read_text().startswith(f'#!{env.path}/')
+                result = Command([str(pip), '--version']).run()
+                assert result.returncode == 0
+                assert str(env.path) in result.stdout
+            assert len(list(templates.root.iterdir())) == 1
+
+    def test_evict(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            templates = TemplateCache(pathlib.Path(tmp) / 'templates')
+            env = Environment(pathlib.Path(tmp) / 'foo')
+            env.create(templates=templates)
+            key = templates.key(env)
+            assert templates.evict() == []
+            assert templates.evict(max_size=0) == [key]
+            assert not (templates.root / key).exists()
+
+            env.remove()
+            env.create(templates=templates)
+            assert templates.evict(max_age=0) == [key]
+
+
+class TestInstalledIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = Environment(self.tmp.name)
+        self.env.site_packages.mkdir(parents=True)
+        for dist in ('pip-23.0.1.dist-info', 'typing_extensions-4.5.0.dist-info',
+                     'Foo.Bar-1.0-py3.11.egg-info', 'typing_extensions.py', 'pip'):
+            (self.env.site_packages / dist).mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_installed(self):
+        assert self.env.installed() == {
+            'pip': '23.0.1', 'typing-extensions': '4.5.0', 'foo-bar': '1.0'}
+
+    def test_has_installed(self):
+        assert self.env.has_installed('pip')
+        assert self.env.has_installed('pip', '23.0.1')
+        assert not self.env.has_installed('pip', '22.0')
+        assert self.env.has_installed('Typing.Extensions')
+        assert not self.env.has_installed('setuptools')
+
+    def test_has_installed_many(self):
+        assert self.env.has_installed_many(['pip', 'foo_bar', 'wheel']) == \
+            {'pip': True, 'foo_bar': True, 'wheel': False}
+        assert self.env.has_installed_many({'pip': '23.0.1', 'foo-bar': '2.0'}) == \
+            {'pip': True, 'foo-bar': False}
+
+    def test_invalidation(self):
+        assert not self.env.has_installed('wheel')
+        (self.env.site_packages / 'wheel-0.40.0.dist-info').mkdir()
+        # make sure the modification is visible even with a coarse-grained clock.
+        os.utime(self.env.site_packages, ns=(0, 0))
+        assert self.env.has_installed('wheel', '0.40.0')
+
+
+class TestScanMetadata(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = Environment(self.tmp.name)
+        self.env.site_packages.mkdir(parents=True)
+        for name, version, requires in (('pip', '23.0.1', []),
+                                        ('Foo.Bar', '1.0', ['pip>=23', 'baz'])):
+            dist_info = self.env.site_packages / f'{name}-{version}.dist-info'
+            dist_info.mkdir()
+            headers = {'Metadata-Version': ['2.1'], 'Name': [name], 'Version': [version]}
+            if requires:
+                headers['Requires-Dist'] = requires
+            with open(dist_info / 'METADATA', 'w') as fp:
+                rfc822.dump(headers, 'Foo\n\nBar: baz\n' * 100, fp)
+        (self.env.site_packages / 'empty-0.1.dist-info').mkdir()
+        (self.env.site_packages / 'empty-0.1.dist-info' / 'METADATA').touch()
+        (self.env.site_packages / 'nometadata-0.1.dist-info').mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan(self):
+        expected = {
+            'pip': {'Name': ['pip'], 'Version': ['23.0.1']},
+            'foo-bar': {
+                'Name': ['Foo.Bar'], 'Version': ['1.0'],
+                'Requires-Dist': ['pip>=23', 'baz'],
+            },
+            'empty': {},
+            'nometadata': {},
+        }
+        for max_workers in (1, 4):
+            with self.subTest(max_workers=max_workers):
+                assert self.env.metadata(max_workers=max_workers) == expected
+
+    def test_fields(self):
+        # the body is not taken for headers.
+        assert scan_metadata(self.env.site_packages, fields=['Version', 'Bar']) == {
+            'pip': {'Version': ['23.0.1']}, 'foo-bar': {'Version': ['1.0']},
+            'empty': {}, 'nometadata': {}}
+
+    def test_missing(self):
+        assert scan_metadata(pathlib.Path(self.tmp.name) / 'missing') == {}
+
+    def test_crlf(self):
+        dist_info = self.env.site_packages / 'crlf-1.0.dist-info'
+        dist_info.mkdir()
+        (dist_info / 'METADATA').write_bytes(
+            b'Metadata-Version: 2.1\r\nName: crlf\r\nVersion: 1.0\r\n\r\n'
+            + b'Foo\r\n\r\nBar: baz\r\n' * 100)
+        with mock.patch.object(rfc822, 'loads', wraps=rfc822.loads) as loads:
+            metadata = scan_metadata(self.env.site_packages, fields=['Version', 'Bar'])
+        assert metadata['crlf'] == {'Version': ['1.0']}
+        # only the headers are decoded, not the body.
+        assert not any('Bar: baz' in call.args[0] for call in loads.call_args_list)
+
+
+class TestBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ('foo', 'bar', 'baz'):
+            project = self.root / 'packages' / name
+            (project / 'src' / name).mkdir(parents=True)
+            (project / 'src' / name / '__init__.py').write_text('')
+            (project / 'pyproject.toml').write_text(
+                '[build-system]\nbuild-backend = "chakra.backend"\n'
+                f'[project]\nname = "{name}"\nversion = "1.0"\n')
+        # not projects, or not to be searched.
+        for path in ('.git', 'node_modules/qux', 'venv', 'packages/foo/build'):
+            (self.root / path).mkdir(parents=True, exist_ok=True)
+            (self.root / path / 'pyproject.toml').touch()
+        (self.root / 'venv' / 'pyvenv.cfg').touch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_discover(self):
+        assert discover(self.root) == [
+            self.root / 'packages' / name for name in ('bar', 'baz', 'foo')]
+
+    def test_build_many(self):
+        (self.root / 'packages' / 'baz' / 'src' / 'baz').rename(
+            self.root / 'packages' / 'baz' / 'src' / 'other')
+        seen = []
+        results = build_many(
+            discover(self.root), self.root / 'dist', max_workers=2,
+            on_result=seen.append)
+        assert [result.project.name for result in results] == ['bar', 'baz', 'foo']
+        assert sorted(r.project.name for r in seen) == ['bar', 'baz', 'foo']
+
+        bar, baz, foo = results
+        assert bar.ok and foo.ok and not baz.ok
+        assert 'could not find the package baz' in baz.error
+        assert (bar.sdist, bar.wheel) == ('bar-1.0.tar.gz', 'bar-1.0-py3-none-any.whl')
+        assert sorted((self.root / 'dist').glob('[!.]*')) == [
+            self.root / 'dist' / name for name in (
+                'bar-1.0-py3-none-any.whl', 'bar-1.0.tar.gz',
+                'foo-1.0-py3-none-any.whl', 'foo-1.0.tar.gz')]
+        assert all(result.seconds > 0 for result in results)
+
+
+def _make_wheel(root, name, version, extra={}):
+    # a wheel built by chakra's backend, with a console script.
+    project = root / f'{name}-{version}'
+    (project / name).mkdir(parents=True)
+    (project / name / '__init__.py').write_text(f'VERSION = {version!r}\n')
+    (project / name / 'cli.py').write_text('def main():\n    print("hello")\n')
+    for path, content in extra.items():
+        (project / name / path).write_text(content)
+    (project / 'pyproject.toml').write_text(
+        f'[project]\nname = "{name}"\nversion = "{version}"\n'
+        f'scripts = {{ {name} = "{name}.cli:main" }}\n')
+    orig_dir = os.getcwd()
+    os.chdir(project)
+    try:
+        return project / 'dist' / backend.build_wheel(str(project / 'dist'))
+    finally:
+        os.chdir(orig_dir)
+
+
+class TestWheelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = WheelCache(self.root / 'cache')
+        self.env = Environment(self.root / 'env')
+        self.env.site_packages.mkdir(parents=True)
+        for version in ('1.0', '1.1'):
+            self.cache.add(_make_wheel(self.root / 'src', 'foo', version))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_add(self):
+        wheel = _make_wheel(self.root / 'other', 'foo', '1.0')
+        path = self.cache.add(wheel)
+        assert path.name == 'foo-1.0-py3-none-any.whl'
+        assert path.read_bytes() == wheel.read_bytes()
+        assert len(self.cache.wheels()) == 2
+        with self.assertRaises(ValueError):
+            self.cache.add(self.root / 'foo.zip')
+
+    def test_find(self):
+        assert self.cache.find('Foo', '1.0').name == 'foo-1.0-py3-none-any.whl'
+        assert self.cache.find('foo').name == 'foo-1.1-py3-none-any.whl'
+        assert self.cache.find('foo', '2.0') is None
+        assert self.cache.find('bar') is None
+
+    def test_install(self):
+        assert self.env.install_cached(['foo==1.0'], cache=self.cache) == \
+            ['foo-1.0.dist-info']
+        installed = self.env.site_packages / 'foo' / '__init__.py'
+        assert installed.read_text() == "VERSION = '1.0'\n"
+        unpacked = self.cache.unpacked(self.cache.find('foo', '1.0'))
+        assert os.stat(installed).st_ino == \
+            os.stat(unpacked / 'foo' / '__init__.py').st_ino
+        assert self.env.installed() == {'foo': '1.0'}
+
+        dist_info = self.env.site_packages / 'foo-1.0.dist-info'
+        assert (dist_info / 'INSTALLER').read_text() == 'chakra\n'
+        record = (dist_info / 'RECORD').read_text().splitlines()
+        assert 'foo-1.0.dist-info/RECORD,,' in record
+        assert any(line.startswith('foo/__init__.py,sha256=') for line in record)
+        script = self.env.python_executable.parent / 'foo'
+        assert any(line.startswith(f'{os.path.relpath(script, self.env.site_packages)},')
+                   for line in record)
+        assert script.read_text().startswith(f'#!{self.env.python_executable}\n')
+        assert os.access(script, os.X_OK)
+
+    def test_missing(self):
+        with self.assertRaises(LookupError):
+            self.cache.install_requirements(self.env, ['foo==1.0', 'bar==1.0'])
+        assert not (self.env.site_packages / 'foo').exists()
+        with self.assertRaises(ValueError):
+            self.cache.install_requirements(self.env, ['foo>=1.0'])
+
+    def test_unsafe(self):
+        wheel = self.root / 'evil-1.0-py3-none-any.whl'
+        with zipfile.ZipFile(wheel, 'w') as zf:
+            zf.writestr('evil-1.0.dist-info/RECORD', '../evil.py,,\n')
+            zf.writestr('../evil.py', '')
+        with self.assertRaises(ValueError):
+            self.cache.unpacked(self.cache.add(wheel))
+        assert not (self.root / 'cache' / 'evil.py').exists()
+        assert not any((self.root / 'cache' / 'unpacked').iterdir())
+
+
+class TestInstallWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.env = Environment(self.root / 'env')
+        self.env.site_packages.mkdir(parents=True)
+        self.wheel = _make_wheel(
+            self.root / 'src', 'foo', '1.0',
+            extra={f'mod{i}.py': f'x = {i}\n' * 1000 for i in range(20)})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _rewrite(self, replace):
+        # a copy of the wheel with some of its members replaced.
+        wheel = self.root / self.wheel.name
+        with zipfile.ZipFile(self.wheel) as src, zipfile.ZipFile(wheel, 'w') as dst:
+            for info in src.infolist():
+                dst.writestr(info, replace.get(info.filename, src.read(info)))
+        return wheel
+
+    def test_install(self):
+        for max_workers in (1, 4):
+            with self.subTest(max_workers=max_workers):
+                assert install_wheel(self.env, self.wheel, max_workers=max_workers) == \
+                    'foo-1.0.dist-info'
+                assert (self.env.site_packages / 'foo' / 'mod7.py').read_text() == \
+                    'x = 7\n' * 1000
+                assert self.env.installed() == {'foo': '1.0'}
+                dist_info = self.env.site_packages / 'foo-1.0.dist-info'
+                assert (dist_info / 'INSTALLER').read_text() == 'chakra\n'
+                record = (dist_info / 'RECORD').read_text().splitlines()
+                # 22 modules, 3 metadata files, the script, INSTALLER and RECORD.
+                assert len(record) == 28
+                assert record[-1] == 'foo-1.0.dist-info/RECORD,,'
+                assert (self.env.python_executable.parent / 'foo').exists()
+                # nothing is left behind from extracting.
+                assert not list(self.env.site_packages.rglob('.*'))
+
+    def test_environment(self):
+        assert self.env.install_wheel(self.wheel) == 'foo-1.0.dist-info'
+        assert self.env.has_installed('foo', '1.0')
+
+    def test_hash_mismatch(self):
+        wheel = self._rewrite({'foo/mod3.py': b'import os\n'})
+        with self.assertRaises(ValueError):
+            install_wheel(self.env, wheel, max_workers=4)
+        assert not any(path.is_file() for path in self.env.site_packages.rglob('*'))
+
+    def test_not_in_record(self):
+        with zipfile.ZipFile(self.wheel) as zf:
+            record = zf.read('foo-1.0.dist-info/RECORD').decode()
+        record = ''.join(
+            line for line in record.splitlines(keepends=True)
+            if not line.startswith('foo/cli.py,'))
+        wheel = self._rewrite({'foo-1.0.dist-info/RECORD': record.encode()})
+        with self.assertRaises(ValueError):
+            install_wheel(self.env, wheel)
+        assert not any(self.env.site_packages.iterdir())
+
+
+class TestLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.env = Environment(self.root / 'env')
+        self.env.site_packages.mkdir(parents=True)
+        for name, version, requires in [
+                ('foo', '1.0', ['bar>=1', 'baz; extra == "fast"',
+                                'qux; python_version < "3"']),
+                ('bar', '1.2', []), ('baz', '2.0', ['bar']),
+                ('pytest', '7.4.0', ['iniconfig']), ('iniconfig', '2.0.0', []),
+                ('unrelated', '0.1', [])]:
+            dist_info = self.env.site_packages / f'{name}-{version}.dist-info'
+            dist_info.mkdir()
+            headers = {'Metadata-Version': ['2.1'], 'Name': [name], 'Version': [version]}
+            if requires:
+                headers['Requires-Dist'] = requires
+            with open(dist_info / 'METADATA', 'w') as fp:
+                rfc822.dump(headers, '', fp)
+        self.pyproject = self.root / 'pyproject.toml'
+        self.pyproject.write_text(
+            '[project]\nname = "proj"\nversion = "0.1"\ndependencies = ["foo"]\n'
+            '[tool.chakra.dev-deps]\ntest = ["pytest==7.4.0", "foo[fast]"]\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_from_environment(self):
+        lock = Lock.from_environment(self.env, self.pyproject)
+        assert lock == Lock([
+            Pin('foo', '1.0', ['default', 'test']),
+            Pin('bar', '1.2', ['default', 'test']), Pin('baz', '2.0', ['test']),
+            Pin('pytest', '7.4.0', ['test']),
+            Pin('iniconfig', '2.0.0', ['test'])])
+        assert lock.select(['default']) == {'foo': '1.0', 'bar': '1.2'}
+
+    def test_unsatisfied(self):
+        self.pyproject.write_text(
+            '[project]\nname = "proj"\nversion = "0.1"\ndependencies = ["bar>=2"]\n')
+        with self.assertRaises(LookupError):
+            Lock.from_environment(self.env, self.pyproject)
+        self.pyproject.write_text(
+            '[project]\nname = "proj"\nversion = "0.1"\ndependencies = ["missing"]\n')
+        with self.assertRaises(LookupError):
+            Lock.from_environment(self.env, self.pyproject)
+
+    def test_dump(self):
+        lock = Lock.from_environment(self.env, self.pyproject)
+        lock.dump(self.root / 'chakra.lock')
+        text = (self.root / 'chakra.lock').read_text()
+        assert text.startswith('[chakra]\nlock-version = 1\n\n[package bar]\n')
+        assert Lock.load(self.root / 'chakra.lock') == lock
+
+    def test_invalid(self):
+        for text in ['[package foo]\nversion = 1.0\ngroups = default\n',
+                     '[chakra]\nlock-version = 2\n',
+                     '[chakra]\nlock-version = 1\n[foo]\nversion = 1.0\ngroups = a\n',
+                     '[chakra]\nlock-version = 1\n[package foo]\ngroups = a\n',
+                     '[chakra]\nlock-version = 1\n[package foo]\nversion = x\n',
+                     'invalid']:
+            with self.subTest(text=text):
+                with self.assertRaises(ParseError):
+                    Lock.loads(text)
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = WheelCache(self.root / 'cache')
+        for name, version in [('foo', '1.0'), ('foo', '1.1'), ('bar', '1.0'),
+                              ('baz', '1.0'), ('pip', '23.0')]:
+            self.cache.add(_make_wheel(self.root / 'src', name, version))
+        self.env = Environment(self.root / 'env')
+        self.env.site_packages.mkdir(parents=True)
+        self.env.install_cached(['foo==1.0', 'bar==1.0', 'pip==23.0'], cache=self.cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sync(self):
+        lock = Lock([Pin('foo', '1.1', ['default']), Pin('baz', '1.0', ['test'])])
+        installed, removed = self.env.sync(lock, cache=self.cache)
+        assert installed == ['baz==1.0', 'foo==1.1']
+        assert removed == ['bar==1.0', 'foo==1.0']
+        assert self.env.installed() == {'foo': '1.1', 'baz': '1.0', 'pip': '23.0'}
+        assert (self.env.site_packages / 'foo' / '__init__.py').read_text() == \
+            "VERSION = '1.1'\n"
+        assert not (self.env.site_packages / 'bar').exists()
+        assert not (self.env.python_executable.parent / 'bar').exists()
+
+        # nothing to do the second time.
+        assert sync(self.env, lock, cache=self.cache) == ([], [])
+
+        # only the `default` group.
+        assert sync(self.env, lock, groups=['default'], cache=self.cache) == \
+            ([], ['baz==1.0'])
+
+    def test_missing(self):
+        lock = Lock([Pin('foo', '1.1', ['default']), Pin('qux', '1.0', ['default'])])
+        with self.assertRaises(LookupError):
+            sync(self.env, lock, cache=self.cache)
+        assert self.env.installed() == {'foo': '1.0', 'bar': '1.0', 'pip': '23.0'}
+
+    def test_uninstall(self):
+        (self.env.site_packages / 'bar' / '__pycache__').mkdir()
+        (self.env.site_packages / 'bar' / '__pycache__' / 'cli.cpython-311.pyc').touch()
+        (self.env.site_packages / 'keep.py').touch()
+        assert self.env.uninstall('Bar') == 'bar-1.0.dist-info'
+        assert not (self.env.site_packages / 'bar').exists()
+        assert not (self.env.site_packages / 'bar-1.0.dist-info').exists()
+        assert (self.env.site_packages / 'keep.py').exists()
+        with self.assertRaises(LookupError):
+            self.env.uninstall('bar')
+
+    def test_sync_legacy(self):
+        # nothing is changed when a distribution to remove can't be uninstalled.
+        (self.env.site_packages / 'legacy-1.0-py3.11.egg-info').mkdir()
+        assert self.env.installed()['legacy'] == '1.0'
+        with self.assertRaises(NotSupportedError):
+            sync(self.env, Lock([]), cache=self.cache)
+        assert self.env.installed() == \
+            {'foo': '1.0', 'bar': '1.0', 'pip': '23.0', 'legacy': '1.0'}
+
+    def test_uninstall_outside(self):
+        outside = self.root / 'outside.txt'
+        outside.touch()
+        record = self.env.site_packages / 'bar-1.0.dist-info' / 'RECORD'
+        relpath = os.path.relpath(outside, self.env.site_packages)
+        record.write_text(record.read_text() + f'{relpath},,\n')
+        with self.assertRaises(ValueError):
+            self.env.uninstall('bar')
+        assert outside.exists()
+        assert (self.env.site_packages / 'bar' / '__init__.py').exists()
+
+    def test_sync_seed(self):
+        # a distribution in `keep` which the lock pins to another version is replaced.
+        self.cache.add(_make_wheel(self.root / 'src', 'pip', '24.0'))
+        lock = Lock([Pin('foo', '1.0', ['default']), Pin('pip', '24.0', ['default'])])
+        assert sync(self.env, lock, cache=self.cache) == \
+            (['pip==24.0'], ['bar==1.0', 'pip==23.0'])
+        assert self.env.installed() == {'foo': '1.0', 'pip': '24.0'}
+        assert not (self.env.site_packages / 'pip-23.0.dist-info').exists()
+
+
+def _write_wheel(root, name, version, requires=(), requires_python=None,
+                 tag='py3-none-any'):
+    # a wheel with only the `METADATA` that the resolver reads.
+    lines = ['Metadata-Version: 2.1', f'Name: {name}', f'Version: {version}']
+    if requires_python is not None:
+        lines.append(f'Requires-Python: {requires_python}')
+    lines += [f'Requires-Dist: {r}' for r in requires]
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f'{name}-{version}-{tag}.whl'
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr(f'{name}-{version}.dist-info/METADATA', '\n'.join(lines) + '\n')
+    return path
+
+
+class TestResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.dict(os.environ, {'CHAKRA_CACHE_DIR': str(self.root / 'c')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.links = self.root / 'links'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def resolve(self, requirements, **kwargs):
+        return {name: str(version) for name, version in
+                resolve(requirements, self.links, **kwargs).items()}
+
+    def test_chain(self):
+        _write_wheel(self.links, 'foo', '1.0', ['bar>=1.0'])
+        _write_wheel(self.links, 'foo', '2.0', ['bar>=2.0'])
+        _write_wheel(self.links, 'bar', '1.5')
+        _write_wheel(self.links, 'bar', '2.1', ['baz'])
+        _write_wheel(self.links, 'baz', '0.1')
+        assert self.resolve(['Foo']) == {'foo': '2.0', 'bar': '2.1', 'baz': '0.1'}
+        assert self.resolve(['foo<2']) == {'foo': '1.0', 'bar': '2.1', 'baz': '0.1'}
+        assert self.resolve(['foo', 'bar<2']) == {'foo': '1.0', 'bar': '1.5'}
+
+    def test_backtrack(self):
+        _write_wheel(self.links, 'a', '1.0', ['b'])
+        _write_wheel(self.links, 'b', '1.0')
+        _write_wheel(self.links, 'b', '2.0', ['c<1'])
+        for version in ('0.5', '1.5'):
+            _write_wheel(self.links, 'c', version)
+        assert self.resolve(['a']) == {'a': '1.0', 'b': '2.0', 'c': '0.5'}
+        assert self.resolve(['a', 'c>=1']) == {'a': '1.0', 'b': '1.0', 'c': '1.5'}
+        with self.assertRaises(ResolutionError) as cm:
+            self.resolve(['a', 'c>=1', 'b>=2'])
+        assert 'no version of c' in str(cm.exception)
+        with self.assertRaises(ResolutionError):
+            self.resolve(['d'])
+
+    def test_backjump(self):
+        # no version of `b` works, whatever the version of the unrelated `a`; the search
+        # doesn't retry the versions of `b` for each of those of `a`.
+        for i in range(20):
+            _write_wheel(self.links, 'a', f'1.{i}')
+        for i in range(30):
+            _write_wheel(self.links, 'b', f'1.{i}', ['c>=2'])
+        _write_wheel(self.links, 'c', '1.0')
+        _write_wheel(self.links, 'c', '2.0', ['d==2'])
+        _write_wheel(self.links, 'd', '1.0')
+        resolver = Resolver(FindLinks(self.links))
+        with mock.patch.object(Resolver, '_pin', autospec=True,
+                               side_effect=Resolver._pin) as pin:
+            with self.assertRaises(ResolutionError):
+                resolver.resolve(['a', 'b', 'x-unused; python_version < "3"'])
+        assert pin.call_count < 100
+
+    def test_many(self):
+        # a chain of more distributions than the recursion limit of Python, alongside a
+        # flat set of as many.
+        count = sys.getrecursionlimit() + 100
+        for i in range(count):
+            _write_wheel(self.links, f'chain{i}', '1.0', [f'chain{i + 1}'])
+            _write_wheel(self.links, f'flat{i}', '1.0')
+        _write_wheel(self.links, f'chain{count}', '1.0')
+        pins = self.resolve(['chain0'] + [f'flat{i}' for i in range(count)])
+        assert len(pins) == 2 * count + 1
+        with self.assertRaises(ResolutionError):
+            self.resolve(['chain0', f'chain{count}>1'])
+
+    def test_extras_markers(self):
+        _write_wheel(self.links, 'foo', '1.0', [
+            'bar; extra == "fast"', 'baz; sys_platform == "win32"',
+            'qux; python_version >= "3"'])
+        for name in ('bar', 'baz', 'qux'):
+            _write_wheel(self.links, name, '1.0')
+        assert self.resolve(['foo'], environment={'sys_platform': 'linux'}) == \
+            {'foo': '1.0', 'qux': '1.0'}
+        assert self.resolve(['foo[Fast]'], environment={'sys_platform': 'win32'}) == \
+            {'foo': '1.0', 'bar': '1.0', 'baz': '1.0', 'qux': '1.0'}
+        # an extra asked for by a dependency, once the distribution is pinned.
+        _write_wheel(self.links, 'top', '1.0', ['foo', 'qux[x]'])
+        _write_wheel(self.links, 'qux', '2.0', ['foo[fast]; extra == "x"'])
+        assert self.resolve(['top'], environment={'sys_platform': 'linux'}) == \
+            {'top': '1.0', 'foo': '1.0', 'bar': '1.0', 'qux': '2.0'}
+
+    def test_requires_python(self):
+        _write_wheel(self.links, 'foo', '1.0')
+        _write_wheel(self.links, 'foo', '2.0', requires_python='>=3.99')
+        _write_wheel(self.links, 'foo', '3.0', tag='py2-none-any')
+        _write_wheel(self.links, 'foo', '4.0', tag='cp30-cp30-win32')
+        _write_wheel(self.links, 'foo', '5.0rc1')
+        assert self.resolve(['foo']) == {'foo': '1.0'}
+        assert self.resolve(['foo>=5.0rc1']) == {'foo': '5.0rc1'}
+        assert self.resolve(['foo'], environment={'python_full_version': '3.99.0'}) == \
+            {'foo': '2.0'}
+
+    def test_cache(self):
+        _write_wheel(self.links, 'foo', '1.0', ['bar'])
+        _write_wheel(self.links, 'bar', '1.0')
+        assert self.resolve(['foo']) == {'foo': '1.0', 'bar': '1.0'}
+        with mock.patch('chakra.core.resolver._read_metadata') as read:
+            assert self.resolve(['foo']) == {'foo': '1.0', 'bar': '1.0'}
+            assert read.call_count == 0
+        # a modified wheel is read again.
+        wheel = _write_wheel(self.links, 'bar', '1.0', ['foo<1'])
+        os.utime(wheel, ns=(0, 0))
+        with self.assertRaises(ResolutionError):
+            self.resolve(['foo'])
+
+
+@unittest.skipIf(OpSystem.find() == OpSystem.WINDOWS, 'on windows system')
+class TestEnvironmentPool(unittest.TestCase):
+
+    def test_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            templates = TemplateCache(pathlib.Path(tmp) / 'templates')
+            with EnvironmentPool(pathlib.Path(tmp) / 'pool', size=2,
+                                 templates=templates) as pool:
+                envs = [pool.acquire() for _ in range(3)]
+                assert len({env.path for env in envs}) == 3
+                assert all(env.has_installed('pip') for env in envs)
+
+                # an unmodified environment is handed out again ...
+                pool.release(envs[0])
+                with self.assertRaises(ValueError):
+                    pool.release(envs[0])
+                with self.assertRaises(ValueError):
+                    pool.release(Environment(pathlib.Path(tmp) / 'other'))
+                with pool.environment() as env:
+                    assert env.path == envs[0].path
+
+                # ... but a modified one is not.
+                (envs[1].site_packages / 'foo-1.0.dist-info').mkdir()
+                os.utime(envs[1].site_packages, ns=(0, 0))
+                pool.release(envs[1])
+                pool.release(envs[2], recycle=False)
+                assert pool.acquire().path == envs[0].path
+
+            assert not envs[1].path.exists()
+            assert not envs[2].path.exists()
+
+    def test_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                EnvironmentPool(pathlib.Path(tmp) / 'pool', size=0)
+            assert not (pathlib.Path(tmp) / 'pool').exists()
@@ -1,4 +1,5 @@
 import json
+import os
 import shutil
 import random
 import unittest
@@ -6,6 +7,7 @@ import unittest
 from chakra.core import Command
 from chakra.utils import HDirectory, HFile
 from chakra.utils import tempfile
+from unittest import mock
 
 NO_TREE = False
 if Command(['tree', '--version']).run().returncode != 0:
@@ -73,6 +75,35 @@ class TestNSubdirectories(unittest.TestCase):
             with self.assertRaises(RuntimeError):
                 self.root.load(tmp)
 
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.root.create(tmp)
+            self.root.subdirs['subdir1'].files['file1.txt'].path.unlink()
+            shutil.rmtree(self.root.subdirs['subdir2'].path)
+            (self.root.subdirs['subdir3'].path / 'file3.txt').unlink()
+            (self.root.subdirs['subdir3'].path / 'file3.txt').mkdir()  # any type will do
+
+            del self.root; self.setUp()
+            with self.assertRaises(RuntimeError) as cm:
+                self.root.load(tmp)
+            # all of the missing entries at once, but not the contents of subdir2.
+            message = str(cm.exception)
+            assert message.startswith(f'could not load 2 entries from {tmp}: ')
+            assert message.endswith(
+                f'{os.path.join("root", "subdir1", "file1.txt")}, '
+                f'{os.path.join("root", "subdir2")}')
+
+    def test_load_scans(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.root.create(tmp)
+
+            del self.root; self.setUp()
+            with mock.patch('os.scandir', side_effect=os.scandir) as scandir:
+                self.root.load(tmp)
+            # tmp, root and each subdirectory, once each.
+            assert scandir.call_count == self.NDIRS + 2
+            assert self.root.subdirs['subdir0'].files['file0.txt'].path.exists()
+
 class TestBinaryTree(unittest.TestCase):
     LEVEL = 5
 
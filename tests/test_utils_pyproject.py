@@ -0,0 +1,58 @@
+import os
+import pathlib
+import unittest
+from unittest import mock
+
+from chakra.errors import ParseError
+from chakra.utils import pyproject, tempfile
+
+class TestLoad(unittest.TestCase):
+
+    _text = '[project]\nname = "foo"\nversion = "1.0"\ndependencies = ["bar>=1"]\n'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp.name) / 'pyproject.toml'
+        self.path.write_text(self._text)
+        patcher = mock.patch.dict(
+            os.environ, {'CHAKRA_CACHE_DIR': str(pathlib.Path(self.tmp.name) / 'cache')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load(self):
+        config = pyproject.load(self.path)
+        assert config['project'] == {
+            'name': 'foo', 'version': '1.0', 'dependencies': ['bar>=1']}
+
+    def test_cached(self):
+        config = pyproject.load(self.path)
+        with mock.patch.object(pyproject.tomllib, 'load') as load:
+            assert pyproject.load(self.path) == config
+        load.assert_not_called()
+
+    def test_invalidation(self):
+        pyproject.load(self.path)
+        stat = self.path.stat()
+        # the same modification time, but a different size.
+        self.path.write_text(self._text.replace('1.0', '1.0.1'))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert pyproject.load(self.path)['project']['version'] == '1.0.1'
+
+    def test_corrupt_cache(self):
+        pyproject.load(self.path)
+        for entry in (pathlib.Path(self.tmp.name) / 'cache' / 'pyproject').iterdir():
+            entry.write_bytes(b'not a pickle')
+        assert pyproject.load(self.path)['project']['name'] == 'foo'
+
+    def test_invalid(self):
+        for text in ['[project\n', '[project]\nversion = "1.0"\n',
+                     '[project]\nname = "foo"\nversion = "1.0"\nrequires-python = "3"\n',
+                     '[project]\nname = "foo"\nversion = "1.0"\nrequires-python = 3\n',
+                     '[tool.chakra.dev-deps]\ntest = "nose2"\n']:
+            with self.subTest(text=text):
+                self.path.write_text(text)
+                with self.assertRaises(ParseError):
+                    pyproject.load(self.path, cache=False)
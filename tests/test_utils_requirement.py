@@ -0,0 +1,86 @@
+import unittest
+
+from chakra.utils import Marker, Requirement, SpecifierSet
+
+_ENV = {'python_version': '3.10', 'python_full_version': '3.10.4', 'os_name': 'posix',
+        'sys_platform': 'linux', 'platform_release': '6.1.0-13-amd64'}
+
+def _evaluate(markerstr, **environment):
+    return Marker(markerstr).evaluate(dict(_ENV, **environment))
+
+class TestRequirement(unittest.TestCase):
+
+    def test_parse(self):
+        req = Requirement.parse(
+            'Foo.Bar [Baz, qux_1] >=1.0, <2 ; python_version < "3.11"')
+        assert req.name == 'Foo.Bar' and req.key == 'foo-bar'
+        assert req.extras == ('baz', 'qux-1')
+        assert req.specifier == SpecifierSet.parse('<2,>=1.0')
+        assert str(req.marker) == 'python_version < "3.11"'
+        assert req.url is None
+        assert str(req) == 'Foo.Bar[baz,qux-1]>=1.0,<2; python_version < "3.11"'
+
+    def test_forms(self):
+        for reqstr, expected in [
+                ('foo', 'foo'),
+                ('foo (>=1.0)', 'foo>=1.0'),
+                ('foo==1.0.*', 'foo==1.0.*'),
+                ('foo @ https://x.org/foo.whl', 'foo @ https://x.org/foo.whl'),
+                ('foo @ https://x.org/foo.whl ; os_name == "nt"',
+                 'foo @ https://x.org/foo.whl ; os_name == "nt"')]:
+            with self.subTest(reqstr=reqstr):
+                assert str(Requirement.parse(reqstr)) == expected
+                assert Requirement.parse(expected) == Requirement.parse(reqstr)
+
+    def test_invalid(self):
+        for reqstr in ['', '-foo', 'foo >= 1.0 bar', 'foo; python_version <', 'foo[bar']:
+            with self.subTest(reqstr=reqstr):
+                with self.assertRaises(AssertionError):
+                    Requirement.parse(reqstr)
+
+    def test_applies(self):
+        req = Requirement.parse('foo; python_version < "3.11" and extra == "test"')
+        assert not req.applies(_ENV)
+        assert req.applies(_ENV, extras=['Test'])
+        assert not req.applies(dict(_ENV, python_version='3.11'), extras=['test'])
+        assert Requirement.parse('foo').applies()
+
+class TestMarker(unittest.TestCase):
+
+    def test_versions(self):
+        assert _evaluate('python_version < "3.11"')
+        assert not _evaluate('python_version >= "3.10.1"')
+        assert _evaluate('python_full_version >= "3.10.1"')
+        assert _evaluate('python_version == "3.*"')
+        assert _evaluate('python_version ~= "3.8"')
+        assert _evaluate('"3.9" < python_version')
+        # not a version, hence not ordered.
+        assert not _evaluate('platform_release >= "5"')
+        assert _evaluate('platform_release === "6.1.0-13-AMD64"')
+
+    def test_strings(self):
+        assert _evaluate('os_name == "posix"')
+        assert _evaluate("os.name == 'posix'")                # legacy name
+        assert _evaluate('"linux" in sys_platform')
+        assert _evaluate('sys_platform not in "win32 cygwin"')
+        assert not _evaluate('sys_platform < "z"')
+        assert _evaluate('sys_platform <= "linux"')
+
+    def test_bool(self):
+        assert _evaluate('os_name == "nt" or python_version < "3.11"')
+        assert not _evaluate('os_name == "nt" and python_version < "3.11"')
+        assert _evaluate(
+            'python_version >= "3.8" and (os_name == "nt" or sys_platform == "linux")')
+        assert not _evaluate(
+            '(python_version >= "3.8" and os_name == "nt") or sys_platform == "win32"')
+
+    def test_extra(self):
+        assert not _evaluate('extra == "test"')
+        assert _evaluate('extra == "Test_Suite"', extra='test.suite')
+
+    def test_invalid(self):
+        for markerstr in ['os_name', 'os_name ==', 'foo == "bar"', '(os_name == "nt"',
+                          'os_name == "nt" and', 'os_name = "nt"']:
+            with self.subTest(markerstr=markerstr):
+                with self.assertRaises(AssertionError):
+                    Marker(markerstr)
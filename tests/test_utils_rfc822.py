@@ -1,5 +1,7 @@
+import io
 import unittest
 import textwrap
+import zipfile
 
 from chakra.utils import rfc822
 
@@ -41,6 +43,35 @@ class Test(unittest.TestCase):
             (self._headers, self._body)
         assert rfc822.dumps(*rfc822.loads(self._text)) == self._text
 
+    def test_dump(self):
+        fp = io.StringIO()
+        assert rfc822.dump(self._headers, self._body, fp) == len(self._text)
+        assert fp.getvalue() == self._text
+
+    def test_dump_binary(self):
+        # binary streams are written to in UTF-8, and left open.
+        fp = io.BytesIO()
+        rfc822.dump(self._headers, 'f\u00f6\u00f6', fp)
+        assert not fp.closed
+        assert fp.getvalue().decode().endswith('\n\nf\u00f6\u00f6')
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            with zf.open('METADATA', 'w') as fp:
+                rfc822.dump(self._headers, self._body, fp)
+        with zipfile.ZipFile(buf) as zf:
+            assert zf.read('METADATA').decode() == self._text
+
+    def test_load(self):
+        fp = io.StringIO('\n\n' + self._text + '\n\n')
+        assert rfc822.load(fp) == (self._headers, self._body)
+
+    def test_load_headers(self):
+        # the body is left unread.
+        fp = io.StringIO(self._text)
+        assert rfc822.load_headers(fp) == self._headers
+        assert fp.read() == self._body
+
 class TestBoundaryCases(unittest.TestCase):
 
     def test_empty(self):
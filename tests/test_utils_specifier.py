@@ -0,0 +1,125 @@
+import unittest
+
+from chakra.utils import Specifier, SpecifierSet, Version
+
+def _contains(specstr, verstr, prereleases=None):
+    return SpecifierSet.parse(specstr).contains(verstr, prereleases=prereleases)
+
+class TestParse(unittest.TestCase):
+
+    def test_specifier(self):
+        spec = Specifier.parse(' >= 1.2 ')
+        assert spec.operator == '>='
+        assert spec.version == '1.2'
+        assert str(spec) == '>=1.2'
+
+    def test_set(self):
+        specset = SpecifierSet.parse('>=1.2, <2,!=1.5.*')
+        assert [str(s) for s in specset.specifiers] == ['>=1.2', '<2', '!=1.5.*']
+        assert str(specset) == '>=1.2,<2,!=1.5.*'
+        assert specset == SpecifierSet.parse('!=1.5.*,<2,>=1.2')
+
+    def test_empty(self):
+        specset = SpecifierSet.parse('')
+        assert specset.contains('0.1')
+        assert specset.contains('100!1')
+
+    def test_invalid(self):
+        for specstr in ['1.0', '=>1.0', '>=1.0.*', '~=1', '==1.0a1.*', '<1.0+local']:
+            with self.subTest(specstr=specstr):
+                with self.assertRaises(AssertionError):
+                    Specifier.parse(specstr)
+
+class TestContains(unittest.TestCase):
+
+    def test_equal(self):
+        assert _contains('==1.0', '1.0.0')
+        assert _contains('==1.0', '1.0+local')
+        assert not _contains('==1.0', '1.0.post1')
+        assert not _contains('==1.0+abc', '1.0+abc.1')
+        assert _contains('==1.0+abc', '1.0+ABC')
+
+    def test_wildcard(self):
+        assert _contains('==1.5.*', '1.5')
+        assert _contains('==1.5.*', '1.5.9.post1')
+        assert not _contains('==1.5.*', '1.6')
+        assert not _contains('==1.5.*', '1.50')
+        assert _contains('!=1.5.*', '1.4.9')
+        assert not _contains('!=1.5.*', '1.5.3')
+
+    def test_ordered(self):
+        assert _contains('<=2', '2.0+local')
+        assert _contains('>=2', '2.0')
+        assert not _contains('>=2', '1.9.9')
+        assert _contains('<2', '1.9.9')
+        assert not _contains('<2', '2.0')
+        assert _contains('>2', '2.0.1')
+
+    def test_exclusive_ordered(self):
+        # `<V` doesn't allow the pre-releases of V, nor does `>V` the post-releases of V.
+        assert not _contains('<2', '2.0rc1', prereleases=True)
+        assert _contains('<2rc2', '2.0rc1')
+        assert not _contains('>2', '2.post1')
+        assert not _contains('>2', '2.0+local')
+        assert _contains('>2.post1', '2.post2')
+        assert _contains('>2.dev1', '2.dev2', prereleases=True)
+
+    def test_compatible(self):
+        assert _contains('~=2.2', '2.9')
+        assert not _contains('~=2.2', '3.0')
+        assert not _contains('~=2.2', '2.1')
+        assert _contains('~=1.4.5', '1.4.9')
+        assert not _contains('~=1.4.5', '1.5.0')
+
+    def test_arbitrary(self):
+        assert _contains('===1.0', '1.0')
+        assert not _contains('===1.0', '1.0.0')
+
+    def test_epoch(self):
+        assert _contains('>=2', '1!1.0')
+        assert not _contains('<2', '1!1.0')
+        assert _contains('>=1!1', '1!1.0')
+
+    def test_prereleases(self):
+        assert not _contains('>=1', '2.0a1')
+        assert _contains('>=1', '2.0a1', prereleases=True)
+        assert _contains('>=1.0a1', '2.0a1')
+        assert not _contains('!=1.0a1', '2.0a1')
+        assert '2.0' in SpecifierSet.parse('>=1')
+
+class TestFilter(unittest.TestCase):
+
+    versions = [Version.parse(v) for v in [
+        '0.9', '1.0', '1.2a1', '1.2', '1.5', '1.5.1', '1.9', '2.0b1', '2.0', '2.1']]
+
+    def test_filter(self):
+        specset = SpecifierSet.parse('>=1.2,<2,!=1.5.*')
+        for filter_ in (specset.filter, specset.filter_sorted):
+            with self.subTest(filter_=filter_.__name__):
+                assert [str(v) for v in filter_(self.versions)] == ['1.2', '1.9']
+
+    def test_filter_unsorted(self):
+        specset = SpecifierSet.parse('>=1.2,<2')
+        versions = list(reversed(self.versions))
+        filtered = specset.filter(versions)
+        assert [str(v) for v in filtered] == ['1.9', '1.5.1', '1.5', '1.2']
+
+    def test_filter_sorted_keys(self):
+        specset = SpecifierSet.parse('~=1.5')
+        keys = [v._key for v in self.versions]
+        assert [str(v) for v in specset.filter_sorted(self.versions, keys=keys)] == \
+            ['1.5', '1.5.1', '1.9']
+
+    def test_prereleases(self):
+        specset = SpecifierSet.parse('>=1.9')
+        filtered = specset.filter_sorted(self.versions)
+        assert [str(v) for v in filtered] == ['1.9', '2.0', '2.1']
+        filtered = specset.filter_sorted(self.versions, prereleases=True)
+        assert [str(v) for v in filtered] == ['1.9', '2.0b1', '2.0', '2.1']
+
+    def test_only_prereleases(self):
+        # pre-releases are taken when nothing else satisfies the specifiers.
+        specset = SpecifierSet.parse('>=1.9.5,<2.0.5')
+        versions = [v for v in self.versions if str(v) != '2.0']
+        assert [str(v) for v in specset.filter(versions)] == ['2.0b1']
+        assert specset.filter(versions, prereleases=False) == []
@@ -1,6 +1,7 @@
+import pickle
 import unittest
 
-from chakra.utils import Version
+from chakra.utils import SpecifierSet, Version, VersionArray
 
 class TestParse(unittest.TestCase):
 
@@ -44,8 +45,9 @@ class TestParse(unittest.TestCase):
         assert ver.tag == 'a1'
 
     def test_four_fields(self):
-        with self.assertRaises(AssertionError):
-            Version.parse('3.8.9.10')
+        ver = Version.parse('3.8.9.10')
+        assert ver.release == (3, 8, 9, 10)
+        assert ver.patch == 9
 
     def test_non_digits(self):
         with self.assertRaises(AssertionError):
@@ -152,3 +154,149 @@ class TestStr(unittest.TestCase):
         assert str(Version(3, 8, 11, 'b5')) == '3.8.11b5'
         assert str(Version(3, 8, None, tag='rc1')) == '3.8rc1'
         assert str(Version(3, None, None, 'a1')) == '3a1'   # again, nonsensical
+
+class TestOrdering(unittest.TestCase):
+
+    def test_tags(self):
+        verstrs = [
+            '1.0', '1.0rc1', '1.0a2', '1.0post1', '1.0b1', '1.0dev0', '0.9', '1.0a1']
+        versions = sorted(Version.parse(v) for v in verstrs)
+        assert [str(v) for v in versions] == \
+            ['0.9', '1.0.dev0', '1.0a1', '1.0a2', '1.0b1', '1.0rc1', '1.0', '1.0.post1']
+
+    def test_trailing_zeros(self):
+        assert Version(3, 8) == Version(3, 8, 0)
+        assert Version(3) == Version(3, 0, 0)
+        assert Version(3, 8) < Version(3, 8, 1)
+
+    def test_hash(self):
+        assert hash(Version(3, 8)) == hash(Version(3, 8, 0))
+        versions = {Version.parse('3.8'), Version.parse('3.8.0'), Version.parse('3.9')}
+        assert len(versions) == 2
+
+    def test_immutable(self):
+        ver = Version(3, 8)
+        with self.assertRaises(AttributeError):
+            ver.minor = 9
+        with self.assertRaises(AttributeError):
+            ver.foo = 'bar'
+
+class TestPEP440(unittest.TestCase):
+
+    def test_parse(self):
+        ver = Version.parse('1!2.0.3.4rc5.post6.dev7+ubuntu.8')
+        assert ver.epoch == 1
+        assert ver.release == (2, 0, 3, 4)
+        assert ver.pre == ('rc', 5)
+        assert ver.post == 6
+        assert ver.dev == 7
+        assert ver.local == ('ubuntu', 8)
+        assert ver.tag == 'rc5.post6.dev7'
+        assert ver.is_prerelease and ver.is_postrelease
+        assert ver.public == '1!2.0.3.4rc5.post6.dev7'
+        assert ver.base_version == '1!2.0.3.4'
+
+    def test_normalization(self):
+        cases = {
+            'v1.0': '1.0',
+            ' 1.0 ': '1.0',
+            '1.0-ALPHA.1': '1.0a1',
+            '1.0beta': '1.0b0',
+            '1.0c2': '1.0rc2',
+            '1.0-preview_3': '1.0rc3',
+            '1.0-1': '1.0.post1',
+            '1.0.rev2': '1.0.post2',
+            '1.0_r': '1.0.post0',
+            '1.0-dev': '1.0.dev0',
+            '1.0+Ubuntu-1_a': '1.0+ubuntu.1.a',
+            '0!1.0': '1.0',
+        }
+        for verstr, normalized in cases.items():
+            with self.subTest(verstr=verstr):
+                assert str(Version.parse(verstr)) == normalized
+                assert Version.parse(verstr) == Version.parse(normalized)
+
+    def test_invalid(self):
+        for verstr in ('1.0foo', '1.0+', '1.0+a..b', '1!', 'a1.0', '1.0-'):
+            with self.subTest(verstr=verstr):
+                with self.assertRaises(AssertionError):
+                    Version.parse(verstr)
+
+    def test_ordering(self):
+        # the example from PEP 440 (under "Summary of permitted suffixes and relative
+        # ordering"), with a few epochs and local versions thrown in.
+        verstrs = [
+            '1.dev0', '1.0.dev456', '1.0a1', '1.0a2.dev456', '1.0a12.dev456', '1.0a12',
+            '1.0b1.dev456', '1.0b2', '1.0b2.post345.dev456', '1.0b2.post345',
+            '1.0rc1.dev456', '1.0rc1', '1.0', '1.0+abc.5', '1.0+abc.7', '1.0+5',
+            '1.0.post456.dev34', '1.0.post456', '1.0.15', '1.1.dev1', '1!0.1',
+        ]
+        versions = [Version.parse(v) for v in verstrs]
+        assert sorted(reversed(versions)) == versions
+        assert [str(v) for v in sorted(reversed(versions))] == \
+            [str(v) for v in versions]
+
+    def test_constructor(self):
+        assert Version(1, 0, tag='a1.post2.dev3') == Version.parse('1.0a1.post2.dev3')
+        assert Version(1, 0, epoch=2, local='foo.1') == Version.parse('2!1.0+foo.1')
+        with self.assertRaises(AssertionError):
+            Version(1, 0, tag='foo')
+
+    def test_interned(self):
+        assert Version.parse('3.8.11') is Version.parse('3.8.11')
+
+    def test_pickle(self):
+        ver = Version.parse('1!2.0rc1.post2.dev3+foo.4')
+        assert pickle.loads(pickle.dumps(ver)) == ver
+        assert str(pickle.loads(pickle.dumps(ver))) == str(ver)
+
+class TestVersionArray(unittest.TestCase):
+
+    verstrs = ['1.0', '2.0rc1', '1!0.1', '1.0.0', '1.10', '1.2.post1', '1.2', '1.0+local']
+
+    def test_parse(self):
+        array = VersionArray.parse(self.verstrs)
+        assert len(array) == len(self.verstrs)
+        assert array.strings == self.verstrs
+        assert array[1] == Version.parse('2.0rc1')
+        assert list(array) == [Version.parse(v) for v in self.verstrs]
+
+    def test_parse_invalid(self):
+        with self.assertRaises(AssertionError):
+            VersionArray.parse(['1.0', 'latest'])
+        array = VersionArray.parse(['1.0', 'latest', '2.0'], strict=False)
+        assert array.strings == ['1.0', '2.0']
+
+    def test_sort(self):
+        array = VersionArray.parse(self.verstrs)
+        assert array.sort().strings == [
+            '1.0', '1.0.0', '1.0+local', '1.2', '1.2.post1', '1.10', '2.0rc1', '1!0.1']
+        assert array.argsort() == [0, 3, 7, 6, 5, 4, 1, 2]
+        assert [v for v in array.sort()] == sorted(array)
+
+    def test_unique(self):
+        array = VersionArray.parse(self.verstrs).unique()
+        assert array.strings == ['1.0', '1.0+local', '1.2', '1.2.post1', '1.10', '2.0rc1',
+                                 '1!0.1']
+
+    def test_max(self):
+        array = VersionArray.parse(['1.0', '3.0a1', '2.0'])
+        assert array.max() == Version.parse('3.0a1')
+        assert array.max(prereleases=False) == Version.parse('2.0')
+        assert VersionArray.parse([]).max() is None
+
+    def test_max_satisfying(self):
+        array = VersionArray.parse(['1.0', '1.5', '1.5.2', '1.9', '2.0b1', '2.0', '2.1'])
+        assert array.max_satisfying(SpecifierSet.parse('>=1.2,<2')) == \
+            Version.parse('1.9')
+        assert array.max_satisfying(SpecifierSet.parse('==1.5.*')) == \
+            Version.parse('1.5.2')
+        assert array.max_satisfying(SpecifierSet.parse('>2.1')) is None
+
+    def test_max_satisfying_prereleases(self):
+        array = VersionArray.parse(['1.0', '2.0b1'])
+        specset = SpecifierSet.parse('>=1.5')
+        # pre-releases are taken when no final release satisfies the specifiers.
+        assert array.max_satisfying(specset) == Version.parse('2.0b1')
+        assert array.max_satisfying(specset, prereleases=False) is None
+        assert array.max_satisfying(SpecifierSet.parse('>=0.5')) == Version.parse('1.0')